@@ -0,0 +1,84 @@
+"""
+Exportiert das Embedding-Modell des Transaction-Categorizers nach ONNX.
+
+Erzeugt in ai_models/embedding_onnx:
+  - model.onnx       (fp32, token embeddings als Output)
+  - model.int8.onnx  (dynamisch int8-quantisiert, optional)
+  - Tokenizer-Dateien
+
+Danach mit EMBEDDING_BACKEND=onnx starten.
+
+Ausführen mit: python ai_models/export_embedding_onnx.py [--model <id>] [--no-quantize]
+"""
+import argparse
+import os
+from pathlib import Path
+
+import torch
+from transformers import AutoModel, AutoTokenizer
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = BASE_DIR / "embedding_onnx"
+
+
+class _TokenEmbeddings(torch.nn.Module):
+    """Wrapper, damit der Export genau einen Output (last_hidden_state) hat."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    print(f"Zielverzeichnis: {output}")
+
+    print(f"Lade {args.model}...")
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModel.from_pretrained(args.model)
+    model.eval()
+
+    dummy = tokenizer(["Migros Zürich", "SBB CFF FFS"], padding=True, return_tensors="pt")
+    onnx_path = output / "model.onnx"
+
+    print("Exportiere ONNX...")
+    with torch.inference_mode():
+        torch.onnx.export(
+            _TokenEmbeddings(model),
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(onnx_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["token_embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_embeddings": {0: "batch", 1: "sequence"},
+            },
+            opset_version=args.opset,
+        )
+    tokenizer.save_pretrained(str(output))
+    print(f"✅ {onnx_path} ({onnx_path.stat().st_size / 1e6:.1f} MB)")
+
+    if not args.no_quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = output / "model.int8.onnx"
+        print("Quantisiere (dynamic int8)...")
+        quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QInt8)
+        print(f"✅ {int8_path} ({int8_path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
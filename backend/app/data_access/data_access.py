@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from pathlib import Path
 
@@ -19,6 +19,15 @@ engine = create_engine(
     connect_args={"check_same_thread": False}
 )
 
+@event.listens_for(engine, "connect")
+def _enable_wal(dbapi_connection, connection_record):
+    # WAL: Leser (z.B. ein langsamer Export-Download) halten nur einen Snapshot
+    # und blockieren keine Schreiber; im Default-Journal würde jeder Schreiber
+    # bis "database is locked" warten.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
@@ -73,6 +73,17 @@ def startup():
                         except OperationalError as e:
                             print(f"    ❌ Fehler beim Hinzufügen von '{col_name}': {e}")
                 
+                # Lege fehlende Indizes an (z.B. für neu hinzugefügte Spalten)
+                existing_indexes = {ix['name'] for ix in inspector.get_indexes(table_name)}
+                for index in model.__table__.indexes:
+                    if index.name in existing_indexes:
+                        continue
+                    try:
+                        index.create(bind=engine)
+                        print(f"    ✅ Index '{index.name}' wurde für '{table_name}' angelegt")
+                    except OperationalError as e:
+                        print(f"    ❌ Fehler beim Anlegen von Index '{index.name}': {e}")
+                
                 # Prüfe auf geänderte Spalten (optional - nur zur Information)
                 for col_name in set(existing_columns.keys()) & set(model_columns.keys()):
                     db_col = existing_columns[col_name]
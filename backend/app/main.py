@@ -1,9 +1,14 @@
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from data_access.data_access import SessionLocal, get_db
 from data_access.db_init import startup
 import password 
+from services.model_registry import model_registry
+from services.receipt_scanner import scanner, receipt_inference_pool, get_scan_cache, scan_jobs
+from services.transaction_categorizer import category_embedding_cache, get_description_store
+from services.category_memory import category_memory
 
 # Import Routers
 from routers import user, authentication, merchant, account, category, tag, transaction, receipt, ai_insights, receipt_line_item
@@ -16,6 +21,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(authentication.router)
@@ -33,6 +39,10 @@ app.include_router(ai_insights.router)
 @app.on_event("startup")
 def startup_event():
     startup()
+    # Modelle im Hintergrund laden, damit der Start nicht blockiert
+    model_registry.warm_up()
+    # Scan-Jobs aus dem letzten Lauf wieder aufnehmen
+    scan_jobs.start()
 
 
 @app.get("/")
@@ -44,4 +54,35 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/ready")
+def readiness_check():
+    required = model_registry.configured()
+    models = model_registry.status()
+    if model_registry.is_ready(required):
+        state = "ready"
+    elif any(models[name]["state"] == "failed" for name in required):
+        state = "failed"
+    else:
+        state = "loading"
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if state == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": state, "required": required, "models": models},
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    scan_cache = get_scan_cache()
+    return {
+        "receipt_scan": receipt_inference_pool.stats(),
+        "receipt_batching": scanner.batch_stats(),
+        "receipt_scan_stages": scanner.stage_stats(),
+        "receipt_scan_jobs": scan_jobs.stats(),
+        "receipt_scan_cache": scan_cache.stats() if scan_cache is not None else None,
+        "category_embedding_cache": category_embedding_cache.stats(),
+        "description_embedding_store": get_description_store().stats(),
+        "category_memory": category_memory.stats(),
+    }
@@ -9,6 +9,8 @@ class Receipt(Base):
     __tablename__ = "receipts"
     __table_args__ = (
         Index('idx_receipt_merchant', 'merchant_id'),
+        # Reference check before a shared content-addressed blob is deleted.
+        Index('idx_receipt_raw_file_path', 'raw_file_path'),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -27,7 +29,7 @@ class Receipt(Base):
     merchant = relationship("Merchant", back_populates="receipts")
     line_items = relationship("ReceiptLineItem", back_populates="receipt", cascade="all, delete-orphan")
 
-    def to_response(self):
+    def to_response(self, include_line_items: bool = True):
         return ReceiptResponse(
             id=self.id,
             user_id=self.user_id,
@@ -38,7 +40,7 @@ class Receipt(Base):
             raw_file_path=self.raw_file_path,
             ocr_text=self.ocr_text,
             created_at=self.created_at,
-            line_items=[item.to_response() for item in self.line_items]
+            line_items=[item.to_response() for item in self.line_items] if include_line_items else []
         )
 
 
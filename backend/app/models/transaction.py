@@ -10,6 +10,7 @@ class Transaction(Base):
         Index('idx_tx_user_date', 'user_id', 'date'),
         Index('idx_tx_category', 'category_id'),
         Index('idx_tx_account', 'account_id'),
+        Index('idx_tx_user_fingerprint', 'user_id', 'fingerprint'),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -21,6 +22,9 @@ class Transaction(Base):
     amount_cents = Column(Integer, nullable=False)  # negative = out, positive = in
     currency_code = Column(String, nullable=False, default='CHF')
     created_at = Column(String, nullable=False, default=lambda: datetime.utcnow().isoformat())
+    # Hash of account, date, amount and normalized description; see services.transaction_dedup.
+    # Not unique: two identical purchases on the same day are legitimate.
+    fingerprint = Column(String)
 
     # Relationships
     user = relationship("User", back_populates="transactions")
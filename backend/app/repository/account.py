@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from models.user import User
 from models.account import Account
 from models.transaction import Transaction
@@ -28,10 +28,19 @@ class AccountRepository:
         accounts = self.db.query(Account).filter(
             Account.user_id == current_user.id
         ).all()
-        
+
+        # One query for all accounts' transactions (plus one for their tags), grouped here.
+        transactions_by_account = {account.id: [] for account in accounts}
+        transactions = self.db.query(Transaction).options(selectinload(Transaction.tags)).filter(
+            Transaction.user_id == current_user.id
+        ).all()
+        for transaction in transactions:
+            if transaction.account_id in transactions_by_account:
+                transactions_by_account[transaction.account_id].append(transaction.to_response())
+
         account_responses = []
         for account in accounts:
-            transactions = self.get_transactions_by_account_id(current_user, account.id)
+            transactions = transactions_by_account[account.id]
             account_response = AccountResponse(
                 id=account.id,
                 user_id=account.user_id,
@@ -45,7 +54,9 @@ class AccountRepository:
         return account_responses
     
     def get_account(self, current_user: User, account_id: int):
-        account = self.db.query(Account).filter(
+        account = self.db.query(Account).options(
+            selectinload(Account.transactions).selectinload(Transaction.tags)
+        ).filter(
             Account.user_id == current_user.id, 
             Account.id == account_id
         ).first()
@@ -121,7 +132,7 @@ class AccountRepository:
         return InternalResponse(state=status.HTTP_409_CONFLICT, detail=f"Found no account with id {account_id} for user {current_user.id}")
     
     def get_transactions_by_account_id(self, current_user: User, account_id: int):
-        transactions = self.db.query(Transaction).filter(
+        transactions = self.db.query(Transaction).options(selectinload(Transaction.tags)).filter(
             Transaction.user_id == current_user.id,
             Transaction.account_id == account_id
         ).all()
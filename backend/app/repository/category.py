@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 from models.user import User
 from models.category import Category
 from schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
+from services.transaction_categorizer import category_embedding_cache
+from services.category_memory import category_memory
 
 class CategoryRepository:
     def __init__(self, db:Session):
@@ -44,6 +46,7 @@ class CategoryRepository:
         self.db.add(new_category)
         self.db.commit()
         self.db.refresh(new_category)
+        category_embedding_cache.invalidate_user(current_user.id)
         return new_category.to_response()
     
     def update_category(self, current_user:User, updated_category: CategoryUpdate):
@@ -66,6 +69,7 @@ class CategoryRepository:
                 setattr(category, field, value)
         self.db.commit()
         self.db.refresh(category)
+        category_embedding_cache.invalidate_user(current_user.id)
         return category.to_response()
     
     def delete_category(self, current_user: User, category_id: int):
@@ -85,6 +89,9 @@ class CategoryRepository:
         
         self.db.delete(category)
         self.db.commit()
+        category_embedding_cache.invalidate_user(current_user.id)
+        # Remembered choices may point at the deleted (sub)categories.
+        category_memory.invalidate_user(current_user.id)
         return True
     
     def _delete_subcategories_recursive(self, current_user: User, parent_id: int):
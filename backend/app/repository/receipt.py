@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
 from models.user import User
 from models.receipt import Receipt, ReceiptLineItem
 from models.tag import ReceiptLineItemTag
@@ -6,50 +8,45 @@ from schemas.receipt import ReceiptCreate, ReceiptUpdate, ReceiptResponse
 from repository.tag import TagRepository
 from InternalResponse import InternalResponse
 from fastapi import status
-import os
-from io import BytesIO
-from PIL import Image
-import torch
-from transformers import AutoProcessor, VisionEncoderDecoderModel 
 from models.merchant import Merchant
 from models.transaction import Transaction
 from models.category import Category
 from repository.transaction import TransactionRepository
 from schemas.transaction import TransactionCreate
+from services.receipt_blob_store import receipt_blob_store
+from services.category_memory import category_memory
 
 class ReceiptRepository:
     def __init__(self, db: Session):
         self.db = db
-        
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        backend_dir = os.path.dirname(os.path.dirname(current_dir))
-        LOCAL_MODEL_PATH = os.path.join(backend_dir, "ai_models", "donut_receipt_v1")
-        
-        if os.path.exists(LOCAL_MODEL_PATH):
-            try:
-                self.processor = AutoProcessor.from_pretrained(
-                    LOCAL_MODEL_PATH,
-                    local_files_only=True
-                )
-                self.model = VisionEncoderDecoderModel.from_pretrained(
-                    LOCAL_MODEL_PATH,
-                    local_files_only=True
-                )
-            except Exception as e:
-                print(f"Warning: Could not load AI model: {e}")
-                self.processor = None
-                self.model = None
-        else:
-            print(f"Warning: Model path does not exist: {LOCAL_MODEL_PATH}")
-            self.processor = None
-            self.model = None
-
-    def get_receipts(self, current_user: User):
-        receipts = self.db.query(Receipt).filter(Receipt.user_id == current_user.id).all()
-        return [r.to_response() for r in receipts]
+
+    @staticmethod
+    def _with_line_items(query):
+        # One SELECT ... IN per level instead of lazy loads per receipt, item and tag.
+        return query.options(
+            selectinload(Receipt.line_items)
+            .selectinload(ReceiptLineItem.tags)
+            .selectinload(ReceiptLineItemTag.tag)
+        )
+
+    def get_receipts(
+        self,
+        current_user: User,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include_line_items: bool = True,
+    ):
+        query = self.db.query(Receipt).filter(Receipt.user_id == current_user.id).order_by(Receipt.id)
+        if include_line_items:
+            query = self._with_line_items(query)
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return [r.to_response(include_line_items) for r in query.all()]
 
     def get_receipt(self, current_user: User, receipt_id: int):
-        receipt = self.db.query(Receipt).filter(
+        receipt = self._with_line_items(self.db.query(Receipt)).filter(
             Receipt.user_id == current_user.id,
             Receipt.id == receipt_id
         ).first()
@@ -100,7 +97,8 @@ class ReceiptRepository:
                     currency_code="CHF",
                     tags=[]
                 )
-                tx_response = tx_repo.create_transaction(current_user, tx_create)
+                # Flushed only; committed together with the receipt and its items below.
+                tx_response = tx_repo.create_transaction(current_user, tx_create, commit=False)
                 if hasattr(tx_response, 'id'):
                     transaction_id = tx_response.id
 
@@ -110,36 +108,52 @@ class ReceiptRepository:
             transaction_id=transaction_id,
             purchase_date=receipt_create.purchase_date,
             total_cents=receipt_create.total_cents,
-            raw_file_path=receipt_create.raw_file_path,
             ocr_text=receipt_create.ocr_text
         )
         self.db.add(new_receipt)
-        self.db.commit()
-        self.db.refresh(new_receipt)
+        self.db.flush()
 
         if receipt_create.line_items:
-            tag_repo = TagRepository(self.db)
-            for item in receipt_create.line_items:
-                line_item = ReceiptLineItem(
-                    receipt_id=new_receipt.id,
-                    product_name=item.product_name,
-                    quantity=item.quantity,
-                    unit_price_cents=item.unit_price_cents,
-                    total_price_cents=item.total_price_cents
-                )
-                self.db.add(line_item)
-                self.db.flush()
+            self._insert_line_items(current_user, new_receipt.id, receipt_create.line_items)
 
-                if item.tags:
-                    tags = tag_repo.internal_get_tags_by_id(current_user, item.tags)
-                    for tag in tags:
-                        assoc = ReceiptLineItemTag(line_item_id=line_item.id, tag_id=tag.id)
-                        self.db.add(assoc)
-            
-            self.db.commit()
-            self.db.refresh(new_receipt)
-        
-        return new_receipt.to_response()
+        self.db.commit()
+        if transaction_id is not None:
+            category_memory.add(current_user.id, tx_response.description, tx_response.amount_cents, tx_response.category_id)
+
+        return self.get_receipt(current_user, new_receipt.id)
+
+    def _insert_line_items(self, current_user: User, receipt_id: int, line_items):
+        """Bulk-inserts line items and their tag links: one tag lookup, one id lookup and two executemany INSERTs."""
+        requested_tags = {tag_id for item in line_items for tag_id in (item.tags or [])}
+        valid_tags = TagRepository(self.db).internal_get_tag_ids(current_user, requested_tags)
+
+        self.db.execute(
+            insert(ReceiptLineItem),
+            [
+                {
+                    "receipt_id": receipt_id,
+                    "product_name": item.product_name,
+                    "quantity": item.quantity,
+                    "unit_price_cents": item.unit_price_cents,
+                    "total_price_cents": item.total_price_cents,
+                }
+                for item in line_items
+            ],
+        )
+        # The receipt is new, so its items are exactly these rows, with ids in insert order.
+        # (SQLite only honours RETURNING order row by row, which would undo the batching.)
+        line_item_ids = self.db.scalars(
+            select(ReceiptLineItem.id).where(ReceiptLineItem.receipt_id == receipt_id).order_by(ReceiptLineItem.id)
+        ).all()
+
+        tag_links = [
+            {"line_item_id": line_item_id, "tag_id": tag_id}
+            for line_item_id, item in zip(line_item_ids, line_items)
+            for tag_id in dict.fromkeys(item.tags or [])
+            if tag_id in valid_tags
+        ]
+        if tag_links:
+            self.db.execute(insert(ReceiptLineItemTag), tag_links)
 
     def update_receipt(self, current_user: User, receipt_id: int, receipt_update: ReceiptUpdate):
         receipt = self.db.query(Receipt).filter(
@@ -155,8 +169,6 @@ class ReceiptRepository:
             receipt.purchase_date = receipt_update.purchase_date
         if receipt_update.total_cents is not None:
             receipt.total_cents = receipt_update.total_cents
-        if receipt_update.raw_file_path is not None:
-            receipt.raw_file_path = receipt_update.raw_file_path
         if receipt_update.ocr_text is not None:
             receipt.ocr_text = receipt_update.ocr_text
         
@@ -164,6 +176,49 @@ class ReceiptRepository:
         self.db.refresh(receipt)
         return receipt.to_response()
 
+    def attach_file(self, current_user: User, receipt_id: int, content: bytes):
+        """The only way to set `raw_file_path`: stores the file and points the receipt at its blob key."""
+        receipt = self.db.query(Receipt).filter(
+            Receipt.user_id == current_user.id,
+            Receipt.id == receipt_id
+        ).first()
+        if not receipt:
+            return InternalResponse(state=status.HTTP_404_NOT_FOUND, detail="Receipt not found")
+
+        old_key = receipt.raw_file_path
+        # Held until the new reference is committed, so a concurrent delete of the same
+        # blob cannot find it unreferenced in between.
+        with receipt_blob_store.lock:
+            blob = receipt_blob_store.put(content)
+            receipt.raw_file_path = blob.key
+            self.db.commit()
+            if old_key != blob.key:
+                self._release_blob(old_key)
+        self.db.refresh(receipt)
+        return receipt.to_response()
+
+    def _release_blob(self, key: Optional[str]):
+        """Deletes a stored file and its thumbnail once no receipt (of any user) references it.
+
+        Callers hold `receipt_blob_store.lock` and have committed the change that dropped the reference.
+        """
+        if not receipt_blob_store.is_key(key):
+            return
+        still_used = self.db.query(Receipt.id).filter(Receipt.raw_file_path == key).first()
+        if still_used is None:
+            receipt_blob_store.delete(key)
+
+    def get_file_key(self, current_user: User, receipt_id: int):
+        receipt = self.db.query(Receipt.raw_file_path).filter(
+            Receipt.user_id == current_user.id,
+            Receipt.id == receipt_id
+        ).first()
+        if not receipt:
+            return InternalResponse(state=status.HTTP_404_NOT_FOUND, detail="Receipt not found")
+        if not receipt_blob_store.is_key(receipt.raw_file_path):
+            return InternalResponse(state=status.HTTP_404_NOT_FOUND, detail="Receipt has no stored file")
+        return receipt.raw_file_path
+
     def delete_receipt(self, current_user: User, receipt_id: int):
         receipt = self.db.query(Receipt).filter(
             Receipt.user_id == current_user.id,
@@ -172,32 +227,19 @@ class ReceiptRepository:
         if not receipt:
             return InternalResponse(state=status.HTTP_404_NOT_FOUND, detail="Receipt not found")
         
+        key = receipt.raw_file_path
         self.db.delete(receipt)
-        self.db.commit()
+        with receipt_blob_store.lock:
+            self.db.commit()
+            self._release_blob(key)
         return InternalResponse(state=status.HTTP_200_OK, detail="Receipt deleted successfully")
 
     async def analyze_receipt(self, picture):
-        if not self.processor or not self.model:
-             return {"error": "AI model not loaded"}
+        # Shares the process-wide Donut model with /receipt/scan. Imported here so plain
+        # receipt CRUD never loads torch or transformers.
+        from services.receipt_scanner import DECODING_PROFILES, scanner, receipt_inference_pool
 
-        file_bytes = BytesIO(await picture.read())
-        image = Image.open(file_bytes).convert("RGB")
-        
-        task_prompt = "<s_cord-v2>" 
-        
-        inputs = self.processor(image, task_prompt, return_tensors="pt")
-        outputs = self.model.generate(
-            input_ids=inputs.input_ids,
-            pixel_values=inputs.pixel_values,
-            max_length=512,
-            pad_token_id=self.processor.tokenizer.pad_token_id,
-            eos_token_id=self.processor.tokenizer.eos_token_id,
-            use_cache=True,
-            bad_words_ids=[[self.processor.tokenizer.unk_token_id]],
+        file_bytes = await picture.read()
+        return await receipt_inference_pool.run(
+            scanner.extract_cord, file_bytes, picture.filename or "", DECODING_PROFILES["balanced"]
         )
-        
-        sequence = self.processor.batch_decode(outputs)[0]
-        sequence = sequence.replace(self.processor.tokenizer.eos_token, "").replace(self.processor.tokenizer.pad_token, "")
-        structured_data = self.processor.token2json(sequence)
-
-        return {"data": structured_data}
\ No newline at end of file
@@ -21,6 +21,17 @@ class TagRepository:
             ).all()
         return tags
 
+    def internal_get_tag_ids(self, current_user:User, tag_ids) -> set[int]:
+        """Subset of `tag_ids` that exist and belong to the user, in one query."""
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return set()
+        rows = self.db.query(Tag.id).filter(
+            Tag.id.in_(tag_ids),
+            Tag.user_id == current_user.id
+            ).all()
+        return {row.id for row in rows}
+
     def get_userspecific_tags(self, current_user:User):
         tags = self.db.query(Tag).filter(
             Tag.user_id == current_user.id
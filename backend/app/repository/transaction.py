@@ -1,17 +1,96 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, case, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session, selectinload
 from models.user import User
-from schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse, TransactionFilter
+from schemas.transaction import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, TransactionFilter, TransactionPage,
+    TransactionImportError, TransactionImportResponse, TransactionDuplicateGroup,
+)
+from models.account import Account
 from models.transaction import Transaction
 from repository.account import AccountRepository
 from repository.tag import TagRepository
 from InternalResponse import InternalResponse
 from fastapi import status
-from models.tag import TransactionTag
+from models.tag import Tag, TransactionTag
 from models.receipt import Receipt
 from repository.category import CategoryRepository
+import base64
+import binascii
 import os
+import time
+from collections import Counter
+from datetime import date as date_type, datetime
+from typing import Iterable, Iterator
+
+from services.transaction_categorizer import (
+    CategoryCandidate,
+    CategorySuggestion,
+    _normalize_for_match,
+    suggest_categories_batch,
+    suggest_category_for_transaction,
+)
+from services.category_memory import amount_sign, category_memory
+from services.statement_import import ParsedRow, RowError, StatementRow
+from services.transaction_dedup import transaction_fingerprint
+
+# Only the first errors of an import are returned; `failed` still counts all of them.
+IMPORT_MAX_REPORTED_ERRORS = 100
+# Fingerprints per IN (...) probe; stays below SQLite's historic 999 bound parameters.
+FINGERPRINT_PROBE_SIZE = 900
+# Duplicate groups listed in a dedup report; the counters cover all of them.
+DEDUP_REPORT_MAX_GROUPS = 500
+# Joins tag names in the export query; cannot occur in a tag name typed by a user.
+_TAG_SEPARATOR = '\x1f'
+
+# Accepted values for TransactionFilter.date_operation / amount_operation.
+_COMPARISONS = {
+    'eq': lambda column, value: column == value,
+    'ne': lambda column, value: column != value,
+    'lt': lambda column, value: column < value,
+    'le': lambda column, value: column <= value,
+    'gt': lambda column, value: column > value,
+    'ge': lambda column, value: column >= value,
+}
+_COMPARISON_ALIASES = {'=': 'eq', '==': 'eq', '!=': 'ne', '<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge'}
+
+
+def _comparison(operation: str|None):
+    key = (operation or 'eq').strip().lower()
+    return _COMPARISONS.get(_COMPARISON_ALIASES.get(key, key))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def encode_cursor(transaction: Transaction) -> str:
+    raw = f"{transaction.date.isoformat()}|{transaction.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[date_type, int]|None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        day, transaction_id = raw.split('|')
+        return date_type.fromisoformat(day), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _auto_category(suggestion: CategorySuggestion) -> int|None:
+    # Below the main threshold, still take the best match if it is strong and clear enough.
+    if suggestion.category_id is not None:
+        return suggestion.category_id
+    min_threshold = float(os.getenv('CATEGORY_AUTO_MIN_THRESHOLD', '0.35'))
+    min_margin = float(os.getenv('CATEGORY_AUTO_MIN_MARGIN', '0.03'))
+    if (
+        suggestion.best_category_id is not None
+        and suggestion.score >= min_threshold
+        and suggestion.margin >= min_margin
+    ):
+        return suggestion.best_category_id
+    return None
 
-from services.transaction_categorizer import CategoryCandidate, suggest_category_for_transaction
 
 class TransactionRepository:
     def __init__(self, db: Session):
@@ -24,10 +103,15 @@ class TransactionRepository:
             new_list.append(item.to_response())
         return new_list
 
+    @staticmethod
+    def _with_tags(query):
+        # to_response() reads Transaction.tags; load them for all rows in one SELECT ... IN.
+        return query.options(selectinload(Transaction.tags))
+
     def get_userspecific_transaction(self, current_user: User):
-        transactions = self.db.query(Transaction).filter(
+        transactions = self._with_tags(self.db.query(Transaction).filter(
             Transaction.user_id == current_user.id
-        ).all()
+        )).all()
         return self.convert_to_response(transactions)
     
     def get_transaction(self, current_user: User, transaction_id: int):
@@ -39,48 +123,50 @@ class TransactionRepository:
             return None
         return transaction.to_response()
     
-    def create_transaction(self, current_user: User, new_transaction:TransactionCreate):
+    def create_transaction(self, current_user: User, new_transaction:TransactionCreate, commit: bool = True):
+        """Creates (and categorizes) a transaction.
+
+        With commit=False the transaction is only flushed so callers can commit it together
+        with other rows; they should then call `category_memory.add` after their commit.
+        """
         account_response = AccountRepository(self.db).check_existing_account_id(current_user, new_transaction.account_id)
         if account_response.state == status.HTTP_409_CONFLICT:
             return account_response
 
         category_id = new_transaction.category_id
+        if category_id is None and os.getenv('CATEGORY_MEMORY_ENABLED', '1') == '1':
+            try:
+                # Most transactions come from merchants the user has categorized before;
+                # reusing that choice skips the embedding model entirely.
+                category_id = self._remembered_category(current_user, new_transaction.description, new_transaction.amount_cents)
+            except Exception:
+                category_id = None
+
         if category_id is None:
             try:
                 threshold = float(os.getenv('CATEGORY_AUTO_THRESHOLD', '0.5'))
-                min_threshold = float(os.getenv('CATEGORY_AUTO_MIN_THRESHOLD', '0.35'))
-                min_margin = float(os.getenv('CATEGORY_AUTO_MIN_MARGIN', '0.03'))
-                categories = CategoryRepository(self.db).get_userspecific_categories(current_user)
-                candidates = [
-                    CategoryCandidate(
-                        id=c.id,
-                        name=c.name,
-                        type=c.type,
-                        parent_id=c.parent_id,
-                        description=c.description,
-                    )
-                    for c in categories
-                ]
-
                 suggestion = suggest_category_for_transaction(
-                    categories=candidates,
+                    categories=self._category_candidates(current_user),
                     description=new_transaction.description,
                     amount_cents=new_transaction.amount_cents,
                     currency_code=new_transaction.currency_code,
                     threshold=threshold,
+                    user_id=current_user.id,
                 )
-                category_id = suggestion.category_id
-                if (
-                    category_id is None
-                    and suggestion.best_category_id is not None
-                    and suggestion.score >= min_threshold
-                    and suggestion.margin >= min_margin
-                ):
-                    category_id = suggestion.best_category_id
+                category_id = _auto_category(suggestion)
             except Exception:
                 # Categorization is best-effort; creating the transaction must still succeed.
                 category_id = None
 
+        fingerprint = transaction_fingerprint(
+            new_transaction.account_id, new_transaction.date, new_transaction.amount_cents, new_transaction.description
+        )
+        self.ensure_fingerprints(current_user, commit=commit)
+        duplicate_of = self.db.query(Transaction.id).filter(
+            Transaction.user_id == current_user.id,
+            Transaction.fingerprint == fingerprint
+        ).limit(1).scalar()
+
         transaction = Transaction(
             user_id = current_user.id,
             account_id = new_transaction.account_id,
@@ -88,23 +174,423 @@ class TransactionRepository:
             description = new_transaction.description,
             amount_cents = new_transaction.amount_cents,
             category_id = category_id,
-            currency_code = new_transaction.currency_code
+            currency_code = new_transaction.currency_code,
+            fingerprint = fingerprint
         )
         self.db.add(transaction)
-        self.db.commit()
-        self.db.refresh(transaction)
-        
         if new_transaction.tags is not None and len(new_transaction.tags) > 0:
             tags = TagRepository(self.db).internal_get_tags_by_id(current_user, new_transaction.tags)
             for tag in tags:
                 transaction.tags.append(tag)
+
+        if not commit:
+            self.db.flush()
+        else:
             self.db.commit()
             self.db.refresh(transaction)
-        
-        return transaction.to_response()
+            category_memory.add(current_user.id, transaction.description, transaction.amount_cents, transaction.category_id)
+        response = transaction.to_response()
+        # Created anyway (same-day repeat purchases are real); the client decides.
+        response.duplicate_of = duplicate_of
+        return response
     
-    def filter_transactions(self, current_user: User, transaction_filter: TransactionFilter)->list[Transaction]|InternalResponse:
-        return
+    def import_transactions(
+        self,
+        current_user: User,
+        account_id: int,
+        rows: Iterable[StatementRow],
+        chunk_size: int|None = None,
+        skip_duplicates: bool = True,
+    )->TransactionImportResponse|InternalResponse:
+        """Bulk-imports parsed statement rows into one account.
+
+        Rows are categorized and inserted chunk by chunk (one executemany per chunk) inside
+        a single database transaction, so a failed import leaves nothing behind. Rows that
+        cannot be parsed are skipped and reported with their line number. Rows whose
+        fingerprint already exists (e.g. from an overlapping statement) are skipped unless
+        `skip_duplicates` is False; either way they are counted in `duplicates`.
+        """
+        started = time.perf_counter()
+        currency_code = self.db.query(Account.currency_code).filter(
+            Account.user_id == current_user.id,
+            Account.id == account_id
+        ).scalar()
+        if currency_code is None:
+            return InternalResponse(state=status.HTTP_409_CONFLICT, detail=f"Found no account with id {account_id} for user {current_user.id}")
+
+        chunk_size = chunk_size or int(os.getenv('TRANSACTION_IMPORT_CHUNK_SIZE', '5000'))
+        context = {
+            'user_id': current_user.id,
+            'account_id': account_id,
+            'currency_code': currency_code,
+            'created_at': datetime.utcnow().isoformat(),
+            'candidates': self._category_candidates(current_user),
+            'suggested': {},
+            'skip_duplicates': skip_duplicates,
+            'inserted_fingerprints': set(),
+            'duplicates': 0,
+        }
+        learned = Counter()
+        imported, failed, errors = 0, 0, []
+        chunk: list[ParsedRow] = []
+        # Legacy rows need fingerprints before the probes below can match them; these
+        # chunks commit on their own, before the import's single transaction starts.
+        self.ensure_fingerprints(current_user)
+        try:
+            for row in rows:
+                if isinstance(row, RowError):
+                    failed += 1
+                    if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                        errors.append(TransactionImportError(line=row.line, message=row.message))
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    imported += self._insert_import_chunk(current_user, chunk, context, learned)
+                    chunk = []
+            if chunk:
+                imported += self._insert_import_chunk(current_user, chunk, context, learned)
+            self.db.commit()
+        except ValueError as e:
+            # The upload itself is broken (e.g. malformed XML); nothing is imported.
+            self.db.rollback()
+            return InternalResponse(state=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for (description, sign, category_id), count in learned.items():
+            category_memory.add(current_user.id, description, sign, category_id, count)
+
+        seconds = time.perf_counter() - started
+        return TransactionImportResponse(
+            imported=imported,
+            failed=failed,
+            duplicates=context['duplicates'],
+            errors=errors,
+            seconds=round(seconds, 3),
+            rows_per_second=round(imported / seconds, 1) if seconds > 0 else float(imported),
+        )
+
+    def _insert_import_chunk(self, current_user: User, chunk: list[ParsedRow], context: dict, learned: Counter) -> int:
+        fingerprints = [
+            transaction_fingerprint(context['account_id'], row.date, row.amount_cents, row.description)
+            for row in chunk
+        ]
+        # Rows inserted earlier in this import are not duplicates of themselves.
+        existing = self._existing_fingerprints(current_user, fingerprints) - context['inserted_fingerprints']
+        if existing:
+            context['duplicates'] += sum(1 for fingerprint in fingerprints if fingerprint in existing)
+            if context['skip_duplicates']:
+                kept = [(row, fp) for row, fp in zip(chunk, fingerprints) if fp not in existing]
+                chunk, fingerprints = [row for row, _ in kept], [fp for _, fp in kept]
+        if not chunk:
+            return 0
+        context['inserted_fingerprints'].update(fingerprints)
+
+        category_ids = self._categorize_import_chunk(current_user, chunk, context)
+        values = []
+        for row, category_id, fingerprint in zip(chunk, category_ids, fingerprints):
+            values.append({
+                'user_id': context['user_id'],
+                'account_id': context['account_id'],
+                'category_id': category_id,
+                'date': row.date,
+                'description': row.description,
+                'amount_cents': row.amount_cents,
+                'currency_code': row.currency_code or context['currency_code'],
+                'created_at': context['created_at'],
+                'fingerprint': fingerprint,
+            })
+            if category_id is not None and row.description:
+                learned[(row.description, amount_sign(row.amount_cents), category_id)] += 1
+        self.db.execute(insert(Transaction), values)
+        return len(values)
+
+    def _categorize_import_chunk(self, current_user: User, chunk: list[ParsedRow], context: dict) -> list[int|None]:
+        """Category memory first, then one embedding batch for the chunk's unseen descriptions.
+
+        Suggestions are cached per (normalized description, amount sign) for the whole
+        import, so a merchant that repeats across chunks is scored only once.
+        """
+        suggested: dict = context['suggested']
+        use_memory = os.getenv('CATEGORY_MEMORY_ENABLED', '1') == '1'
+        keys, category_ids = [], []
+        pending: dict[tuple[str, int], ParsedRow] = {}
+        for row in chunk:
+            category_id = None
+            if use_memory:
+                try:
+                    category_id = self._remembered_category(current_user, row.description, row.amount_cents)
+                except Exception:
+                    category_id = None
+            key = (_normalize_for_match(row.description), amount_sign(row.amount_cents))
+            if category_id is None and key not in suggested:
+                pending.setdefault(key, row)
+            keys.append(key)
+            category_ids.append(category_id)
+
+        if pending:
+            try:
+                suggestions = suggest_categories_batch(
+                    categories=context['candidates'],
+                    descriptions=[row.description for row in pending.values()],
+                    amount_cents_list=[row.amount_cents for row in pending.values()],
+                    currency_codes=[row.currency_code for row in pending.values()],
+                    threshold=float(os.getenv('CATEGORY_AUTO_THRESHOLD', '0.5')),
+                    user_id=current_user.id,
+                )
+                suggested.update(zip(pending, (_auto_category(s) for s in suggestions)))
+            except Exception:
+                # Categorization is best-effort; the rows are imported uncategorized.
+                suggested.update(dict.fromkeys(pending))
+
+        return [
+            category_id if category_id is not None else suggested.get(key)
+            for key, category_id in zip(keys, category_ids)
+        ]
+
+    def _existing_fingerprints(self, current_user: User, fingerprints: list[str]) -> set[str]:
+        # Batched index probes on idx_tx_user_fingerprint instead of one query per row.
+        unique = list(set(fingerprints))
+        existing = set()
+        for start in range(0, len(unique), FINGERPRINT_PROBE_SIZE):
+            existing.update(fingerprint for (fingerprint,) in self.db.query(Transaction.fingerprint).filter(
+                Transaction.user_id == current_user.id,
+                Transaction.fingerprint.in_(unique[start:start + FINGERPRINT_PROBE_SIZE])
+            ).distinct())
+        return existing
+
+    def ensure_fingerprints(self, current_user: User, commit: bool = True) -> int:
+        """Fingerprints the user's rows that predate the fingerprint column.
+
+        Runs before every duplicate lookup so re-imports and new transactions also match
+        legacy rows. Once a user is fully fingerprinted this is a single index probe.
+        """
+        pending = self.db.query(Transaction.id).filter(
+            Transaction.user_id == current_user.id,
+            Transaction.fingerprint.is_(None)
+        ).limit(1).scalar()
+        if pending is None:
+            return 0
+
+        chunk_size = int(os.getenv('TRANSACTION_DEDUP_CHUNK_SIZE', '5000'))
+        fingerprinted, after_id = 0, 0
+        while True:
+            updated, last_id = self.backfill_fingerprints(current_user, after_id, chunk_size, commit=commit)
+            if last_id is None:
+                return fingerprinted
+            fingerprinted += updated
+            after_id = last_id
+
+    def backfill_fingerprints(self, current_user: User, after_id: int, limit: int, commit: bool = True) -> tuple[int, int|None]:
+        """Fingerprints up to `limit` rows with id > `after_id` that have none yet.
+
+        Returns (rows updated, last id seen); the last id is None once nothing is left.
+        Each chunk is committed on its own so concurrent writers are never blocked long;
+        with commit=False the updates stay in the caller's transaction.
+        """
+        rows = self.db.query(
+            Transaction.id, Transaction.account_id, Transaction.date, Transaction.amount_cents, Transaction.description
+        ).filter(
+            Transaction.user_id == current_user.id,
+            Transaction.fingerprint.is_(None),
+            Transaction.id > after_id
+        ).order_by(Transaction.id).limit(limit).all()
+        if not rows:
+            return 0, None
+
+        self.db.execute(
+            update(Transaction.__table__).where(Transaction.__table__.c.id == bindparam('row_id')).values(
+                fingerprint=bindparam('row_fingerprint')
+            ),
+            [
+                {'row_id': row.id, 'row_fingerprint': transaction_fingerprint(row.account_id, row.date, row.amount_cents, row.description)}
+                for row in rows
+            ],
+        )
+        if commit:
+            self.db.commit()
+        return len(rows), rows[-1].id
+
+    def duplicate_groups(self, current_user: User) -> Iterable[TransactionDuplicateGroup]:
+        """Streams groups of transactions sharing a fingerprint, via idx_tx_user_fingerprint."""
+        duplicates = self.db.query(Transaction.fingerprint).filter(
+            Transaction.user_id == current_user.id,
+            Transaction.fingerprint.isnot(None)
+        ).group_by(Transaction.fingerprint).having(func.count(Transaction.id) > 1).subquery()
+
+        rows = self.db.query(
+            Transaction.fingerprint, Transaction.id, Transaction.account_id,
+            Transaction.date, Transaction.amount_cents, Transaction.description
+        ).join(duplicates, Transaction.fingerprint == duplicates.c.fingerprint).filter(
+            Transaction.user_id == current_user.id
+        ).order_by(Transaction.fingerprint, Transaction.id).yield_per(1000)
+
+        group = None
+        for row in rows:
+            if group is not None and group.fingerprint != row.fingerprint:
+                yield group
+                group = None
+            if group is None:
+                group = TransactionDuplicateGroup(
+                    fingerprint=row.fingerprint,
+                    account_id=row.account_id,
+                    date=row.date,
+                    amount_cents=row.amount_cents,
+                    description=row.description,
+                    transaction_ids=[],
+                )
+            group.transaction_ids.append(row.id)
+        if group is not None:
+            yield group
+
+    def build_dedup_report(self, current_user: User, on_progress, chunk_size: int|None = None) -> dict:
+        """Fingerprints legacy rows chunk by chunk, then collects the duplicate groups."""
+        chunk_size = chunk_size or int(os.getenv('TRANSACTION_DEDUP_CHUNK_SIZE', '5000'))
+        fingerprinted, after_id = 0, 0
+        while True:
+            updated, last_id = self.backfill_fingerprints(current_user, after_id, chunk_size)
+            if last_id is None:
+                break
+            fingerprinted += updated
+            after_id = last_id
+            on_progress(fingerprinted=fingerprinted)
+
+        groups, duplicate_groups, duplicate_transactions = [], 0, 0
+        for group in self.duplicate_groups(current_user):
+            duplicate_groups += 1
+            duplicate_transactions += len(group.transaction_ids) - 1
+            if len(groups) < DEDUP_REPORT_MAX_GROUPS:
+                groups.append(group)
+
+        scanned = self.db.query(func.count(Transaction.id)).filter(Transaction.user_id == current_user.id).scalar()
+        return {
+            'scanned': scanned,
+            'fingerprinted': fingerprinted,
+            'duplicate_groups': duplicate_groups,
+            'duplicate_transactions': duplicate_transactions,
+            'groups': groups,
+        }
+
+    def _category_candidates(self, current_user: User) -> list[CategoryCandidate]:
+        categories = CategoryRepository(self.db).get_userspecific_categories(current_user)
+        return [
+            CategoryCandidate(
+                id=c.id,
+                name=c.name,
+                type=c.type,
+                parent_id=c.parent_id,
+                description=c.description,
+            )
+            for c in categories
+        ]
+
+    def _remembered_category(self, current_user: User, description: str | None, amount_cents: int) -> int | None:
+        def load_rows():
+            sign = case((Transaction.amount_cents > 0, 1), (Transaction.amount_cents < 0, -1), else_=0)
+            return self.db.query(
+                Transaction.description,
+                sign,
+                Transaction.category_id,
+                func.count(Transaction.id),
+            ).filter(
+                Transaction.user_id == current_user.id,
+                Transaction.category_id.isnot(None)
+            ).group_by(
+                Transaction.description,
+                sign,
+                Transaction.category_id
+            ).all()
+
+        return category_memory.lookup(current_user.id, description, amount_cents, load_rows)
+
+    def filter_transactions(
+        self,
+        current_user: User,
+        transaction_filter: TransactionFilter,
+        limit: int|None = None,
+        cursor: str|None = None,
+    )->TransactionPage|InternalResponse:
+        """Filtered transactions, newest first, keyset-paged on (date, id).
+
+        `cursor` is the `next_cursor` of the previous page. Paging seeks directly to the
+        cursor position via idx_tx_user_date instead of skipping rows with OFFSET, so
+        deep pages cost the same as the first one.
+        """
+        query = self._filtered_query(self.db.query(Transaction), current_user, transaction_filter)
+        if isinstance(query, InternalResponse):
+            return query
+
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None:
+                return InternalResponse(status.HTTP_400_BAD_REQUEST, "invalid cursor")
+            query = query.filter(tuple_(Transaction.date, Transaction.id) < position)
+
+        query = self._with_tags(query.order_by(Transaction.date.desc(), Transaction.id.desc()))
+        if limit is None:
+            return TransactionPage(items=self.convert_to_response(query.all()))
+
+        # One extra row tells whether another page follows.
+        transactions = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            next_cursor = encode_cursor(transactions[-1])
+        return TransactionPage(items=self.convert_to_response(transactions), next_cursor=next_cursor)
+
+    def export_rows(
+        self,
+        current_user: User,
+        transaction_filter: TransactionFilter,
+        chunk_size: int = 1000,
+    )->Iterator[tuple]|InternalResponse:
+        """Filtered transactions as plain tuples in EXPORT_COLUMNS order, newest first.
+
+        Rows are fetched `chunk_size` at a time from one cursor (yield_per) and never
+        become ORM objects, so memory does not grow with the number of rows.
+        """
+        tag_names = select(func.group_concat(Tag.name, _TAG_SEPARATOR)).join(
+            TransactionTag, TransactionTag.tag_id == Tag.id
+        ).where(TransactionTag.transaction_id == Transaction.id).scalar_subquery()
+
+        query = self._filtered_query(self.db.query(
+            Transaction.id, Transaction.date, Transaction.account_id, Transaction.category_id,
+            Transaction.description, Transaction.amount_cents, Transaction.currency_code,
+            Transaction.created_at, tag_names
+        ), current_user, transaction_filter)
+        if isinstance(query, InternalResponse):
+            return query
+
+        rows = query.order_by(Transaction.date.desc(), Transaction.id.desc()).yield_per(chunk_size)
+        return ((*row[:-1], row[-1].split(_TAG_SEPARATOR) if row[-1] else []) for row in rows)
+
+    def _filtered_query(self, query, current_user: User, transaction_filter: TransactionFilter):
+        """Applies TransactionFilter as SQL predicates; InternalResponse for invalid operations."""
+        query = query.filter(Transaction.user_id == current_user.id)
+
+        f = transaction_filter
+        if f.account_id is not None:
+            query = query.filter(Transaction.account_id == f.account_id)
+        if f.category_id is not None:
+            query = query.filter(Transaction.category_id == f.category_id)
+        if f.currency_code is not None:
+            query = query.filter(Transaction.currency_code == f.currency_code.upper())
+        if f.description is not None:
+            query = query.filter(Transaction.description.ilike(f"%{_escape_like(f.description)}%", escape='\\'))
+        if f.created_at is not None:
+            query = query.filter(Transaction.created_at.like(f"{_escape_like(f.created_at)}%", escape='\\'))
+        if f.date is not None:
+            compare = _comparison(f.date_operation)
+            if compare is None:
+                return InternalResponse(status.HTTP_400_BAD_REQUEST, f"unknown date_operation '{f.date_operation}'")
+            query = query.filter(compare(Transaction.date, f.date))
+        if f.amount_cents is not None:
+            compare = _comparison(f.amount_operation)
+            if compare is None:
+                return InternalResponse(status.HTTP_400_BAD_REQUEST, f"unknown amount_operation '{f.amount_operation}'")
+            query = query.filter(compare(Transaction.amount_cents, f.amount_cents))
+        return query
     
     def update_transaction(self, current_user: User, transaction_id: int, transaction_update: TransactionUpdate)->Transaction|InternalResponse:
         transaction = self.db.query(Transaction).filter(
@@ -114,6 +600,10 @@ class TransactionRepository:
         
         if transaction == None:
             return InternalResponse(state=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+
+        old_description = transaction.description
+        old_amount_cents = transaction.amount_cents
+        old_category_id = transaction.category_id
         
         # Update transaction fields
         if transaction_update.date is not None:
@@ -142,9 +632,17 @@ class TransactionRepository:
             tags = TagRepository(self.db).internal_get_tags_by_id(current_user, transaction_update.tags)
             for tag in tags:
                 transaction.tags.append(tag)
-        
+
+        transaction.fingerprint = transaction_fingerprint(
+            transaction.account_id, transaction.date, transaction.amount_cents, transaction.description
+        )
         self.db.commit()
         self.db.refresh(transaction)
+
+        old = (old_description, amount_sign(old_amount_cents), old_category_id)
+        if old != (transaction.description, amount_sign(transaction.amount_cents), transaction.category_id):
+            category_memory.remove(current_user.id, old_description, old_amount_cents, old_category_id)
+            category_memory.add(current_user.id, transaction.description, transaction.amount_cents, transaction.category_id)
         return transaction.to_response()
     
     def delete_transaction(self, current_user: User, transaction_id: int)->InternalResponse:
@@ -156,6 +654,8 @@ class TransactionRepository:
         if transaction == None:
             return InternalResponse(state=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
         
+        description, amount_cents, category_id = transaction.description, transaction.amount_cents, transaction.category_id
         self.db.delete(transaction)
         self.db.commit()
+        category_memory.remove(current_user.id, description, amount_cents, category_id)
         return InternalResponse(state=status.HTTP_200_OK, detail="Transaction deleted successfully")
\ No newline at end of file
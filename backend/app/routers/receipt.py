@@ -1,5 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile
-from typing import List
+import asyncio
+import json
+from datetime import datetime
+import os
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional
 from sqlalchemy.orm import Session
 import oauth2 as oauth2
 from schemas.receipt import ReceiptCreate, ReceiptUpdate, ReceiptResponse
@@ -7,22 +14,120 @@ from models.user import User
 from InternalResponse import InternalResponse
 from repository.receipt import ReceiptRepository
 from data_access.data_access import get_db
-from services.receipt_scanner import scanner
+from services.receipt_scanner import receipt_inference_pool, get_decoding_profile, lookup_cached_scan, scan_and_cache, scan_jobs
+from services.scan_jobs import FINISHED
+from services.receipt_blob_store import receipt_blob_store
+from services.inference_pool import InferencePoolSaturated
 
 router = APIRouter(
     prefix = '/receipt',
     tags=['receipt']
 )
 
+def _scanner_busy(e: InferencePoolSaturated) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Receipt scanner is busy, please retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+def _job_response(job: dict) -> dict:
+    timestamps = {
+        key: datetime.utcfromtimestamp(job[key]).isoformat() if job[key] else None
+        for key in ("created_at", "started_at", "finished_at")
+    }
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "filename": job["filename"],
+        "profile": job["profile"],
+        "pages_done": job["pages_done"],
+        "pages_total": job["pages_total"],
+        "result": job["result"],
+        "error": job["error"],
+        **timestamps,
+    }
+
+def _get_user_job(job_id: str, current_user: User) -> dict:
+    job = scan_jobs.get(job_id)
+    if job is None or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scan job not found")
+    return job
+
+def _parse_range(header: str, size: int):
+    # Only single byte ranges ("bytes=0-99", "bytes=100-", "bytes=-100") are supported.
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or not spec:
+        return None
+    start_s, _, end_s = spec.split(",")[0].strip().partition("-")
+    try:
+        if start_s:
+            start = int(start_s)
+            end = min(int(end_s), size - 1) if end_s else size - 1
+        else:
+            start, end = max(0, size - int(end_s)), size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        return None
+    return start, end
+
+def _iter_file_range(path: Path, start: int, length: int, chunk_size: int = 64 * 1024):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def _blob_response(request: Request, path: Path, etag: str, media_type: str):
+    if not path.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    headers = {
+        "ETag": etag,
+        # Blobs are content-addressed, so a given URL+ETag never changes.
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        size = os.path.getsize(path)
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_file_range(path, start, end - start + 1),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=media_type,
+            headers=headers,
+        )
+    return FileResponse(path, media_type=media_type, headers=headers)
+
 def get_repository(db: Session = Depends(get_db)) -> ReceiptRepository:
     return ReceiptRepository(db)
 
 @router.get('/', response_model=List[ReceiptResponse])
 def get_receipts(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    include_line_items: bool = True,
     repo: ReceiptRepository = Depends(get_repository),
     current_user: User = Depends(oauth2.get_current_user)
 ):
-    return repo.get_receipts(current_user)
+    return repo.get_receipts(current_user, limit, offset, include_line_items)
 
 @router.get('/{receipt_id}', response_model=ReceiptResponse)
 def get_receipt(
@@ -55,6 +160,56 @@ def update_receipt(
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
+@router.post('/{receipt_id}/file', response_model=ReceiptResponse)
+def upload_receipt_file(
+    receipt_id: int,
+    file: UploadFile,
+    repo: ReceiptRepository = Depends(get_repository),
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    max_bytes = int(os.getenv("RECEIPT_BLOB_MAX_MB", "20")) * 1024 * 1024
+    content = file.file.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    result = repo.attach_file(current_user, receipt_id, content)
+    if isinstance(result, InternalResponse):
+        raise HTTPException(status_code=result.state, detail=result.detail)
+    return result
+
+@router.get('/{receipt_id}/file')
+def get_receipt_file(
+    receipt_id: int,
+    request: Request,
+    repo: ReceiptRepository = Depends(get_repository),
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    key = repo.get_file_key(current_user, receipt_id)
+    if isinstance(key, InternalResponse):
+        raise HTTPException(status_code=key.state, detail=key.detail)
+    return _blob_response(
+        request,
+        receipt_blob_store.path(key),
+        f'"{receipt_blob_store.sha256(key)}"',
+        receipt_blob_store.media_type(key),
+    )
+
+@router.get('/{receipt_id}/thumbnail')
+def get_receipt_thumbnail(
+    receipt_id: int,
+    request: Request,
+    repo: ReceiptRepository = Depends(get_repository),
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    key = repo.get_file_key(current_user, receipt_id)
+    if isinstance(key, InternalResponse):
+        raise HTTPException(status_code=key.state, detail=key.detail)
+    return _blob_response(
+        request,
+        receipt_blob_store.thumbnail_path(key),
+        f'"{receipt_blob_store.sha256(key)}-thumb"',
+        "image/webp",
+    )
+
 @router.delete('/{receipt_id}', status_code=status.HTTP_200_OK)
 def delete_receipt(
     receipt_id: int,
@@ -71,15 +226,90 @@ async def create_upload_file(
     file: UploadFile, 
     repo: ReceiptRepository = Depends(get_repository)
 ):
-    return await repo.analyze_receipt(file)
+    try:
+        return await repo.analyze_receipt(file)
+    except InferencePoolSaturated as e:
+        raise _scanner_busy(e)
 
 @router.post('/scan')
 async def scan_receipt(
     file: UploadFile,
+    profile: Optional[str] = None,
     current_user: User = Depends(oauth2.get_current_user)
 ):
+    try:
+        decoding = get_decoding_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     content = await file.read()
-    result = scanner.scan_image(content, file.filename)
+    # The cache is SQLite; keep its lookup off the event loop like the scan itself.
+    cached = await run_in_threadpool(lookup_cached_scan, content, decoding)
+    if cached is not None:
+        return cached
+    try:
+        result = await receipt_inference_pool.run(scan_and_cache, content, file.filename, decoding)
+    except InferencePoolSaturated as e:
+        raise _scanner_busy(e)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
-    return result
\ No newline at end of file
+    return result
+
+@router.post('/scan/jobs', status_code=status.HTTP_202_ACCEPTED)
+async def create_scan_job(
+    file: UploadFile,
+    profile: Optional[str] = None,
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    try:
+        decoding = get_decoding_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    max_bytes = int(os.getenv("RECEIPT_SCAN_JOB_MAX_MB", "20")) * 1024 * 1024
+    content = await file.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    # Stores the upload as a BLOB in the job database.
+    job = await run_in_threadpool(scan_jobs.submit, current_user.id, file.filename or "", decoding.name, content)
+    return _job_response(job)
+
+@router.get('/scan/jobs/{job_id}')
+def get_scan_job(
+    job_id: str,
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    return _job_response(_get_user_job(job_id, current_user))
+
+@router.get('/scan/jobs/{job_id}/events')
+async def stream_scan_job(
+    job_id: str,
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    await run_in_threadpool(_get_user_job, job_id, current_user)
+
+    async def events():
+        last_status = None
+        last_pages = 0
+        idle = 0.0
+        while True:
+            job = await run_in_threadpool(scan_jobs.get, job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status, last_pages = job["status"], job["pages_done"]
+                idle = 0.0
+                yield f"event: status\ndata: {json.dumps(_job_response(job), ensure_ascii=False)}\n\n"
+                if job["status"] in FINISHED:
+                    return
+            elif job["pages_done"] != last_pages:
+                last_pages = job["pages_done"]
+                idle = 0.0
+                progress = {"pages_done": job["pages_done"], "pages_total": job["pages_total"]}
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+            elif idle >= 15:
+                # Keep proxies from closing an idle connection.
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.5)
+            idle += 0.5
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
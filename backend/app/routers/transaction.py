@@ -1,12 +1,17 @@
 # Import Standard
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Optional
 from sqlalchemy.orm import Session
 import oauth2 as oauth2
 import os
 
 # Import Request
-from schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse, TransactionFilter
+from schemas.transaction import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, TransactionFilter, TransactionPage,
+    TransactionImportResponse, TransactionDedupReport,
+)
 
 # Import Model
 from models.user import User
@@ -28,17 +33,31 @@ from services.transaction_categorizer import (
     gemini_suggest_categories_batch,
 )
 
+from services.statement_import import FORMATS, detect_format, iter_statement_rows
+from services.transaction_dedup import dedup_reports
+from services.transaction_export import FORMAT_PARQUET, FORMATS as EXPORT_FORMATS, MEDIA_TYPES, parquet_available, stream_export
+
 # Import DataAccess
-from data_access.data_access import get_db
+from data_access.data_access import SessionLocal, get_db
 
 router = APIRouter(
     prefix = '/transaction',
     tags=['transaction']
 )
 
+# Keyset cursor of the next page; absent on the last page. Lists stay plain JSON arrays.
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
 def get_repository(db: Session = Depends(get_db))->TransactionRepository:
     return TransactionRepository(db)
 
+def _page_items(page: TransactionPage|InternalResponse, response: Response) -> list[TransactionResponse]:
+    if isinstance(page, InternalResponse):
+        raise HTTPException(status_code=page.state, detail=page.detail)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
 
 @router.post('/categorize/batch', response_model=List[TransactionCategorySuggestionResponse])
 def categorize_transactions_batch(
@@ -67,6 +86,7 @@ def categorize_transactions_batch(
         amount_cents_list=[i.amount_cents for i in items],
         currency_codes=[i.currency_code for i in items],
         threshold=threshold,
+        user_id=current_user.id,
     )
 
     # Local fallback: if primary threshold fails but match is still reasonably strong,
@@ -122,14 +142,56 @@ def categorize_transactions_batch(
 
 @router.get('/', response_model=List[TransactionResponse])
 def get_transactions(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
     repo: TransactionRepository = Depends(get_repository),
     current_user: User = Depends(oauth2.get_current_user)
 ):
-    transactions = repo.get_userspecific_transaction(current_user)
-    if transactions == []:
+    transactions = _page_items(repo.filter_transactions(current_user, TransactionFilter(), limit, cursor), response)
+    if transactions == [] and cursor is None:
         raise HTTPException(status_code=status.HTTP_200_OK, detail="No transactions found for this user")
     return transactions
 
+@router.get('/filter', response_model=List[TransactionResponse])
+def filter_transactions(
+    response: Response,
+    transaction_filter: TransactionFilter = Depends(),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    repo: TransactionRepository = Depends(get_repository),
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    return _page_items(repo.filter_transactions(current_user, transaction_filter, limit, cursor), response)
+
+@router.get('/export')
+def export_transactions(
+    transaction_filter: TransactionFilter = Depends(),
+    format: str = Query('csv', description=f"one of {', '.join(EXPORT_FORMATS)}"),
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if format == FORMAT_PARQUET and not parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="parquet export requires pyarrow")
+
+    # The body is streamed after this function returns (and after get_db has closed its
+    # session), so the export reads through a session of its own that lives as long as the stream.
+    # It is closed by a background task, which also runs when the client disconnects before
+    # the first chunk (the generator would then never reach a finally block).
+    db = SessionLocal()
+    rows = TransactionRepository(db).export_rows(current_user, transaction_filter)
+    if isinstance(rows, InternalResponse):
+        db.close()
+        raise HTTPException(status_code=rows.state, detail=rows.detail)
+
+    return StreamingResponse(
+        stream_export(rows, format),
+        background=BackgroundTask(db.close),
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="transactions.{format}"'},
+    )
+
 @router.get('/{transaction_id}', response_model=TransactionResponse)
 def get_transaction(
     transaction_id: int,
@@ -141,16 +203,52 @@ def get_transaction(
         raise HTTPException(status_code=status.HTTP_200_OK, detail="No transaction found for this user")
     return transaction
 
-@router.get('/filter', response_model=List[TransactionResponse])
-def filter_transactions(
-    transaction_filter: TransactionFilter = Depends(),
+@router.post('/import', response_model=TransactionImportResponse)
+def import_transactions(
+    account_id: int,
+    file: UploadFile,
+    format: Optional[str] = Query(None, description=f"one of {', '.join(FORMATS)}; detected from the file if omitted"),
+    skip_duplicates: bool = True,
     repo: TransactionRepository = Depends(get_repository),
     current_user: User = Depends(oauth2.get_current_user)
 ):
-    transactions = repo.filter_transactions(current_user, transaction_filter)
-    if type(transactions) == InternalResponse:
-        raise HTTPException(status_code=transactions.state, detail=transactions.detail)
-    return transactions
+    # The upload is spooled to disk by Starlette and parsed straight from there.
+    head = file.file.read(512)
+    file.file.seek(0)
+    fmt = format or detect_format(file.filename, head)
+    try:
+        rows = iter_statement_rows(file.file, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    result = repo.import_transactions(current_user, account_id, rows, skip_duplicates=skip_duplicates)
+    if isinstance(result, InternalResponse):
+        raise HTTPException(status_code=result.state, detail=result.detail)
+    return result
+
+def _run_dedup_report(user_id: int, on_progress) -> dict:
+    # Runs on the report thread after the request has finished, so it needs its own session.
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        return TransactionRepository(db).build_dedup_report(user, on_progress)
+    finally:
+        db.close()
+
+@router.post('/duplicates/report', response_model=TransactionDedupReport, status_code=status.HTTP_202_ACCEPTED)
+def start_dedup_report(
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    user_id = current_user.id
+    return dedup_reports.start(user_id, lambda on_progress: _run_dedup_report(user_id, on_progress))
+
+@router.get('/duplicates/report', response_model=TransactionDedupReport)
+def get_dedup_report(
+    current_user: User = Depends(oauth2.get_current_user)
+):
+    report = dedup_reports.get(current_user.id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No duplicate report started for this user")
+    return report
 
 @router.post('/', response_model=TransactionResponse)
 def create_transaction(
@@ -159,7 +257,7 @@ def create_transaction(
     current_user: User = Depends(oauth2.get_current_user)
 ):
     transaction = repo.create_transaction(current_user, new_transaction)
-    if type(transaction) == InternalResponse:
+    if isinstance(transaction, InternalResponse):
         raise HTTPException(status_code=transaction.state, detail=transaction.detail)
     if transaction == None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="unable to create transaction")
@@ -184,7 +282,7 @@ def add_tags(
     current_user: User = Depends(oauth2.get_current_user)
 ):
     result = repo.add_tags(current_user, transaction_id, tags_id)
-    if type(result) == InternalResponse:
+    if isinstance(result, InternalResponse):
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
@@ -196,7 +294,7 @@ def remove_tags(
     current_user: User = Depends(oauth2.get_current_user)
 ):
     result = repo.remove_tags(current_user, transaction_id, tags_id)
-    if type(result) == InternalResponse:
+    if isinstance(result, InternalResponse):
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
@@ -220,7 +318,7 @@ def change_category(
 ):
     update = TransactionUpdate(category_id=category_id)
     result = repo.update_transaction(current_user, transaction_id, update)
-    if type(result) == InternalResponse:
+    if isinstance(result, InternalResponse):
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
@@ -232,7 +330,7 @@ def remove_category(
     current_user: User = Depends(oauth2.get_current_user)
 ):
     result = repo.remove_category(current_user, transaction_id)
-    if type(result) == InternalResponse:
+    if isinstance(result, InternalResponse):
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
@@ -244,7 +342,7 @@ def set_receipt(
     current_user: User = Depends(oauth2.get_current_user)
 ):
     result = repo.set_receipt(current_user, transaction_id, receipt_id)
-    if type(result) == InternalResponse:
+    if isinstance(result, InternalResponse):
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
@@ -257,7 +355,7 @@ def update_transaction(
     current_user: User = Depends(oauth2.get_current_user)
 ):
     result = repo.update_transaction(current_user, transaction_id, transaction_update)
-    if type(result) == InternalResponse:
+    if isinstance(result, InternalResponse):
         raise HTTPException(status_code=result.state, detail=result.detail)
     return result
 
@@ -7,7 +7,6 @@ class ReceiptCreate(BaseModel):
     merchant_name: Optional[str] = None
     purchase_date: str
     total_cents: Optional[int] = None
-    raw_file_path: Optional[str] = None
     ocr_text: Optional[str] = None
     line_items: Optional[List[ReceiptLineItemCreate]] = []
     account_id: Optional[int] = None
@@ -18,7 +17,6 @@ class ReceiptUpdate(BaseModel):
     merchant_id: Optional[int] = None
     purchase_date: Optional[str] = None
     total_cents: Optional[int] = None
-    raw_file_path: Optional[str] = None
     ocr_text: Optional[str] = None
 
 class ReceiptResponse(BaseModel):
@@ -60,19 +60,21 @@ class TransactionResponse(BaseModel):
     currency_code: str
     created_at: str
     tags: Optional[list[TagResponse]]
+    # Set on create when a transaction with the same fingerprint already exists.
+    duplicate_of: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 class TransactionFilter(BaseModel):
-    account_id: Optional[int]
-    category_id: Optional[int]
-    date: Optional[date_type]
-    date_operation: Optional[str]
-    description: Optional[str]
-    amount_cents: Optional[int]
-    amount_operation: Optional[str]
-    currency_code: Optional[str]
-    created_at: Optional[str]
+    account_id: Optional[int] = None
+    category_id: Optional[int] = None
+    date: Optional[date_type] = None
+    date_operation: Optional[str] = None
+    description: Optional[str] = None
+    amount_cents: Optional[int] = None
+    amount_operation: Optional[str] = None
+    currency_code: Optional[str] = None
+    created_at: Optional[str] = None
 
     @field_validator('date', 'date_operation', 'description', 'amount_operation', 'currency_code', 'created_at')
     def empty_str_to_none(cls,item):
@@ -84,4 +86,39 @@ class TransactionFilter(BaseModel):
     def zero_to_none(cls, item):
         if item == 0:
             return None
-        return item
\ No newline at end of file
+        return item
+
+class TransactionPage(BaseModel):
+    items: list[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+class TransactionImportError(BaseModel):
+    line: int
+    message: str
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    failed: int
+    duplicates: int
+    errors: list[TransactionImportError]
+    seconds: float
+    rows_per_second: float
+
+class TransactionDuplicateGroup(BaseModel):
+    fingerprint: str
+    account_id: int
+    date: date_type
+    amount_cents: int
+    description: Optional[str]
+    transaction_ids: list[int]
+
+class TransactionDedupReport(BaseModel):
+    status: str
+    scanned: int = 0
+    fingerprinted: int = 0
+    duplicate_groups: int = 0
+    duplicate_transactions: int = 0
+    groups: list[TransactionDuplicateGroup] = []
+    error: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -0,0 +1,154 @@
+import threading
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+from services.transaction_categorizer import _normalize_for_match
+
+
+def amount_sign(amount_cents: int) -> int:
+    return (amount_cents > 0) - (amount_cents < 0)
+
+
+class CategoryMemory:
+    """Per-user "seen before" index: (normalized description, amount sign) -> category usage counts.
+
+    The amount sign is part of the key so a refund or credit from a familiar merchant is
+    not given the expense category of its purchases (see `_candidates_for_amount`).
+
+    A user's index is built lazily from their already-categorized transactions the first
+    time it is needed and then kept up to date incrementally by `TransactionRepository`.
+    Changes for users whose index is not loaded yet are ignored; they are picked up from
+    the database when the index is built.
+    """
+
+    # A build that keeps racing with writes gives up installing and is retried on the next lookup.
+    MAX_BUILD_ATTEMPTS = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_user: dict[int, dict[tuple[str, int], Counter]] = {}
+        # Bumped by every add/remove/invalidate, so a build can tell it raced with a write.
+        self._generation: dict[int, int] = {}
+        self._build_locks: dict[int, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        user_id: int,
+        description: Optional[str],
+        amount_cents: int,
+        load_rows: Callable[[], Iterable[tuple[Optional[str], int, int, int]]],
+    ) -> Optional[int]:
+        """Return the category the user picked most often for this description and sign, if any.
+
+        `load_rows` yields (description, amount sign, category_id, count) and is only called
+        when the user's index has not been built yet.
+        """
+        key = self._key(description, amount_cents)
+        if key is None:
+            return None
+
+        with self._lock:
+            index = self._by_user.get(user_id)
+        if index is None:
+            index = self._load(user_id, load_rows)
+
+        with self._lock:
+            counts = index.get(key)
+            if not counts:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return counts.most_common(1)[0][0]
+
+    def _load(
+        self,
+        user_id: int,
+        load_rows: Callable[[], Iterable[tuple[Optional[str], int, int, int]]],
+    ) -> dict[tuple[str, int], Counter]:
+        """Builds a user's index without holding the global lock, then installs it.
+
+        One build per user runs at a time; other users' lookups are not blocked by the
+        query. If an `add` or `remove` for the user lands while the rows are loaded, the
+        result may miss it, so it is discarded and built again instead of installed.
+        """
+        with self._lock:
+            build_lock = self._build_locks.setdefault(user_id, threading.Lock())
+        with build_lock:
+            index: dict[tuple[str, int], Counter] = {}
+            for _ in range(self.MAX_BUILD_ATTEMPTS):
+                with self._lock:
+                    installed = self._by_user.get(user_id)
+                    if installed is not None:
+                        return installed
+                    generation = self._generation.get(user_id, 0)
+                index = self._build(load_rows())
+                with self._lock:
+                    if self._generation.get(user_id, 0) == generation:
+                        self._by_user[user_id] = index
+                        return index
+            return index
+
+    def _bump(self, user_id: int) -> None:
+        # Caller holds self._lock.
+        self._generation[user_id] = self._generation.get(user_id, 0) + 1
+
+    @staticmethod
+    def _key(description: Optional[str], amount_cents: int) -> Optional[tuple[str, int]]:
+        normalized = _normalize_for_match(description)
+        return (normalized, amount_sign(amount_cents)) if normalized else None
+
+    @staticmethod
+    def _build(rows: Iterable[tuple[Optional[str], int, int, int]]) -> dict[tuple[str, int], Counter]:
+        index: dict[tuple[str, int], Counter] = {}
+        for description, sign, category_id, count in rows:
+            key = CategoryMemory._key(description, sign)
+            if key is not None and category_id is not None:
+                index.setdefault(key, Counter())[category_id] += count
+        return index
+
+    def add(
+        self,
+        user_id: int,
+        description: Optional[str],
+        amount_cents: int,
+        category_id: Optional[int],
+        count: int = 1,
+    ) -> None:
+        key = self._key(description, amount_cents)
+        if key is None or category_id is None:
+            return
+        with self._lock:
+            self._bump(user_id)
+            index = self._by_user.get(user_id)
+            if index is not None:
+                index.setdefault(key, Counter())[category_id] += count
+
+    def remove(self, user_id: int, description: Optional[str], amount_cents: int, category_id: Optional[int]) -> None:
+        key = self._key(description, amount_cents)
+        if key is None or category_id is None:
+            return
+        with self._lock:
+            self._bump(user_id)
+            index = self._by_user.get(user_id)
+            if index is None or key not in index:
+                return
+            counts = index[key]
+            counts[category_id] -= 1
+            if counts[category_id] <= 0:
+                del counts[category_id]
+            if not counts:
+                del index[key]
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._bump(user_id)
+            self._by_user.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "users": len(self._by_user)}
+
+
+category_memory = CategoryMemory()
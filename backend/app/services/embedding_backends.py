@@ -0,0 +1,129 @@
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+# Exported by `ai_models/export_embedding_onnx.py`.
+DEFAULT_ONNX_DIR = Path(__file__).resolve().parent.parent.parent / "ai_models" / "embedding_onnx"
+
+BACKEND_SENTENCE_TRANSFORMERS = "sentence-transformers"
+BACKEND_QUANTIZED = "quantized"
+BACKEND_ONNX = "onnx"
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into L2-normalized embeddings (cosine similarity == dot product)."""
+
+    name = ""
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+def onnx_model_path(model_dir: Optional[Path] = None, model_file: Optional[str] = None) -> Path:
+    """The ONNX file `OnnxBackend` loads: EMBEDDING_ONNX_FILE, else the unquantized export."""
+    model_dir = model_dir or Path(os.getenv("EMBEDDING_ONNX_DIR", str(DEFAULT_ONNX_DIR)))
+    model_path = model_dir / (model_file or os.getenv("EMBEDDING_ONNX_FILE", "model.int8.onnx"))
+    if not model_path.exists():
+        # Fall back to the unquantized export.
+        model_path = model_dir / "model.onnx"
+    return model_path
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Reference fp32 backend."""
+
+    name = BACKEND_SENTENCE_TRANSFORMERS
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True))
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """Same model with dynamic int8 quantization of all Linear layers (CPU only)."""
+
+    name = BACKEND_QUANTIZED
+
+    def __init__(self, model_name: str):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name, device="cpu")
+        model.eval()
+        self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            return super().encode(texts)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """ONNX Runtime backend for a model exported with `export_embedding_onnx.py`.
+
+    Reproduces the sentence-transformers pipeline for this model family:
+    tokenizer -> transformer -> attention-masked mean pooling -> L2 normalization.
+    """
+
+    name = BACKEND_ONNX
+
+    def __init__(self, model_dir: Path, model_file: Optional[str] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = onnx_model_path(model_dir, model_file)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"No ONNX embedding model in {model_dir}. Run ai_models/export_embedding_onnx.py first."
+            )
+
+        options = ort.SessionOptions()
+        threads = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.max_length = int(os.getenv("EMBEDDING_MAX_LENGTH", "128"))
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batch = self.tokenizer(
+            list(texts),
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        mask = batch["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def load_embedding_backend(backend: str, model_name: str) -> EmbeddingBackend:
+    backend = (backend or BACKEND_SENTENCE_TRANSFORMERS).strip().lower()
+    if backend == BACKEND_SENTENCE_TRANSFORMERS:
+        return SentenceTransformerBackend(model_name)
+    if backend == BACKEND_QUANTIZED:
+        return QuantizedTorchBackend(model_name)
+    if backend == BACKEND_ONNX:
+        return OnnxBackend(Path(os.getenv("EMBEDDING_ONNX_DIR", str(DEFAULT_ONNX_DIR))))
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'")
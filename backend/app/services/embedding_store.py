@@ -0,0 +1,171 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+
+class DescriptionEmbeddingStore:
+    """Persistent store for transaction description embeddings.
+
+    Vectors are keyed by (model name, normalized text) and kept in a local SQLite
+    file so they survive restarts. An in-process LRU sits in front of SQLite; both layers
+    are capped, the on-disk one evicting the least recently used rows.
+
+    Pass `path=None` to keep everything in memory (LRU only).
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        max_entries: int = 100_000,
+        lru_size: int = 4096,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.lru_size = lru_size
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS description_embeddings (
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, text)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_desc_emb_last_used ON description_embeddings (last_used)"
+            )
+            self._conn.commit()
+
+    def get_many(
+        self,
+        model: str,
+        keys: Sequence[str],
+        texts: Sequence[str],
+        encode: Callable[[Sequence[str]], np.ndarray],
+    ) -> np.ndarray:
+        """Return one embedding row per entry of `texts`.
+
+        `keys[i]` is the cache key for `texts[i]`; misses are encoded in a single call
+        using the original texts and written back to both layers.
+        """
+        if len(keys) != len(texts):
+            raise ValueError("keys and texts must have the same length")
+
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                vec = self._lru.get((model, key))
+                if vec is not None:
+                    self._lru.move_to_end((model, key))
+                    found[key] = vec
+            self.hits += sum(1 for k in keys if k in found)
+
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if missing and self._conn is not None:
+            from_disk = self._load(model, missing)
+            found.update(from_disk)
+            with self._lock:
+                self.disk_hits += sum(1 for k in keys if k in from_disk)
+                for key, vec in from_disk.items():
+                    self._remember(model, key, vec)
+            missing = [k for k in missing if k not in from_disk]
+
+        if missing:
+            text_by_key = {}
+            for key, text in zip(keys, texts):
+                text_by_key.setdefault(key, text)
+            vectors = np.asarray(encode([text_by_key[k] for k in missing]), dtype=np.float32)
+            new = dict(zip(missing, vectors))
+            found.update(new)
+            with self._lock:
+                self.misses += sum(1 for k in keys if k in new)
+                for key, vec in new.items():
+                    self._remember(model, key, vec)
+            if self._conn is not None:
+                self._save(model, new)
+
+        return np.stack([found[k] for k in keys])
+
+    def _remember(self, model: str, key: str, vec: np.ndarray) -> None:
+        self._lru[(model, key)] = vec
+        self._lru.move_to_end((model, key))
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _load(self, model: str, keys: Sequence[str]) -> dict[str, np.ndarray]:
+        out: dict[str, np.ndarray] = {}
+        now = time.time()
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                placeholders = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT text, dim, vector FROM description_embeddings "
+                    f"WHERE model = ? AND text IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for text, dim, blob in rows:
+                    out[text] = np.frombuffer(blob, dtype=np.float32, count=dim).copy()
+            if out:
+                self._conn.executemany(
+                    "UPDATE description_embeddings SET last_used = ? WHERE model = ? AND text = ?",
+                    [(now, model, k) for k in out],
+                )
+                self._conn.commit()
+        return out
+
+    def _save(self, model: str, vectors: dict[str, np.ndarray]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO description_embeddings (model, text, dim, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(model, k, int(v.shape[0]), v.astype(np.float32).tobytes(), now) for k, v in vectors.items()],
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM description_embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM description_embeddings WHERE rowid IN ("
+                    "SELECT rowid FROM description_embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM description_embeddings")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "lru_entries": len(self._lru),
+            }
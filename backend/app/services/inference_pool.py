@@ -0,0 +1,136 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class InferencePoolSaturated(Exception):
+    """Raised when the pool already holds `workers + max_queue` jobs."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class Timings:
+    """Rolling window of durations (seconds) for simple count/avg/percentile metrics."""
+
+    def __init__(self, window: int = 512):
+        self.count = 0
+        self.total = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self._recent.append(seconds)
+
+    def summary(self) -> dict:
+        recent = sorted(self._recent)
+
+        def pct(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 1)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+        }
+
+
+class InferencePool:
+    """Bounded thread pool for blocking model inference called from async handlers.
+
+    Keeps heavy `generate` calls off the event loop. At most `workers` jobs run at once
+    and at most `max_queue` more may wait; beyond that `run` raises
+    `InferencePoolSaturated` immediately instead of queueing without bound.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_queue: int = 4, torch_threads: int = 0):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.torch_threads = torch_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.queue_wait = Timings()
+        self.inference = Timings()
+
+    def _init_worker(self) -> None:
+        if self.torch_threads > 0:
+            import torch
+
+            # Intra-op threads are process-wide in torch; pin them so several
+            # workers do not oversubscribe the CPU.
+            torch.set_num_threads(self.torch_threads)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f"{self.name}-worker",
+                    initializer=self._init_worker,
+                )
+            return self._executor
+
+    def _retry_after(self) -> int:
+        avg = (self.inference.total / self.inference.count) if self.inference.count else 5.0
+        return max(1, math.ceil(avg * (self._pending / self.workers)))
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Hands `fn` to a worker; the caller has already counted it in `_pending`."""
+        executor = self._get_executor()
+        enqueued = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    # Released here rather than in `run`, so a cancelled request
+                    # keeps its slot until the model is actually free again.
+                    self._pending -= 1
+                    self.queue_wait.add(started - enqueued)
+                    self.inference.add(finished - started)
+
+        return executor.submit(job)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise InferencePoolSaturated(self._retry_after())
+            self._pending += 1
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def run_blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs `fn` on the pool's workers and waits for it, from a non-async thread.
+
+        For background jobs: they queue behind the running work instead of being rejected,
+        but still share the pool's workers, so model concurrency stays at `workers`.
+        """
+        with self._lock:
+            self._pending += 1
+        return self._submit(fn, *args).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "rejected": self.rejected,
+                "queue_wait": self.queue_wait.summary(),
+                "inference": self.inference.summary(),
+            }
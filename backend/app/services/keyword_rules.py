@@ -0,0 +1,104 @@
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "category_keyword_rules.json"
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    name: str
+    # Matched as substrings of the match-normalized description.
+    keywords: tuple[str, ...]
+    # Matched as substrings of the description with all spaces removed.
+    squashed_keywords: tuple[str, ...]
+    # Hint rules: restrict candidates to these names (lowercase) or their descendants.
+    category_names: frozenset[str] = frozenset()
+    ancestor_names: frozenset[str] = frozenset()
+    # Override rules: leaf names to assign, in order of preference.
+    targets: tuple[str, ...] = ()
+
+
+def _alternation(keywords: Sequence[str]) -> Optional[re.Pattern]:
+    if not keywords:
+        return None
+    # Longest first so the regex engine does not stop at a shorter prefix.
+    ordered = sorted(set(keywords), key=lambda k: (-len(k), k))
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+
+class CompiledKeywordRules:
+    """Keyword rules compiled into alternation regexes.
+
+    A single regex over every keyword of a table acts as a prefilter, so descriptions
+    without any known keyword (the common case) cost one `search` per table. Only when
+    it hits are the per-rule patterns evaluated, in table order.
+    """
+
+    def __init__(self, hints: Sequence[KeywordRule], overrides: Sequence[KeywordRule]):
+        self.hints = list(hints)
+        self.overrides = list(overrides)
+        self._compiled = {
+            "hints": self._compile_table(self.hints),
+            "overrides": self._compile_table(self.overrides),
+        }
+
+    @staticmethod
+    def _compile_table(rules: Sequence[KeywordRule]):
+        per_rule = [(r, _alternation(r.keywords), _alternation(r.squashed_keywords)) for r in rules]
+        any_plain = _alternation([k for r in rules for k in r.keywords])
+        any_squashed = _alternation([k for r in rules for k in r.squashed_keywords])
+        return any_plain, any_squashed, per_rule
+
+    def _iter_matches(self, table: str, normalized: str, squashed: str):
+        any_plain, any_squashed, per_rule = self._compiled[table]
+        if not (
+            (any_plain is not None and any_plain.search(normalized))
+            or (any_squashed is not None and any_squashed.search(squashed))
+        ):
+            return
+        for rule, plain, squashed_re in per_rule:
+            if (plain is not None and plain.search(normalized)) or (
+                squashed_re is not None and squashed_re.search(squashed)
+            ):
+                yield rule
+
+    def match_hint(self, normalized: str, squashed: str) -> Optional[KeywordRule]:
+        """Return the first hint rule whose keywords occur in the description."""
+        return next(self._iter_matches("hints", normalized, squashed), None)
+
+    def match_overrides(self, normalized: str, squashed: str) -> List[KeywordRule]:
+        """Return all override rules whose keywords occur in the description, in table order."""
+        return list(self._iter_matches("overrides", normalized, squashed))
+
+
+def load_keyword_rules(path: Path, normalize: Callable[[str], str]) -> CompiledKeywordRules:
+    """Load a rule table from JSON and compile it.
+
+    Keywords are passed through `normalize` (the same normalization applied to
+    descriptions), so the table can be written with natural spelling, e.g. "Gebühr".
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    def build(entry: dict) -> KeywordRule:
+        keywords = tuple(k for k in (normalize(k) for k in entry.get("keywords", [])) if k)
+        squashed = tuple(
+            k for k in (normalize(k).replace(" ", "") for k in entry.get("squashed_keywords", [])) if k
+        )
+        return KeywordRule(
+            name=str(entry.get("name", "")),
+            keywords=keywords,
+            squashed_keywords=squashed,
+            category_names=frozenset(n.lower() for n in entry.get("category_names", [])),
+            ancestor_names=frozenset(n.lower() for n in entry.get("ancestor_names", [])),
+            targets=tuple(entry.get("targets", [])),
+        )
+
+    return CompiledKeywordRules(
+        hints=[build(e) for e in data.get("hints", [])],
+        overrides=[build(e) for e in data.get("overrides", [])],
+    )
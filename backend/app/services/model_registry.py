@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+@dataclass
+class ModelStatus:
+    state: str = STATE_PENDING
+    load_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ModelRegistry:
+    """Keeps track of the AI models the API depends on and warms them up in the background.
+
+    Loaders are plain callables that make their model resident (and raise on failure).
+    Calling a loader for an already loaded model must be cheap, since requests may have
+    triggered the lazy load before the warm-up thread got to it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaders: dict[str, Callable[[], None]] = {}
+        self._status: dict[str, ModelStatus] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], None]) -> None:
+        with self._lock:
+            self._loaders[name] = loader
+            self._status.setdefault(name, ModelStatus())
+
+    def configured(self) -> list[str]:
+        """Models that must be resident for /health/ready (PRELOAD_MODELS, default: all)."""
+        raw = os.getenv("PRELOAD_MODELS")
+        with self._lock:
+            names = list(self._loaders)
+        if raw is None:
+            return names
+        wanted = [n.strip() for n in raw.split(",") if n.strip()]
+        return [n for n in wanted if n in names]
+
+    def load(self, name: str) -> None:
+        with self._lock:
+            loader = self._loaders[name]
+            status = self._status[name]
+            status.state = STATE_LOADING
+            status.error = None
+        start = time.perf_counter()
+        try:
+            loader()
+        except Exception as e:
+            with self._lock:
+                status.state = STATE_FAILED
+                status.error = str(e)
+            logger.error(f"Model '{name}' failed to load: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            status.state = STATE_READY
+            status.load_seconds = elapsed
+        logger.info(f"Model '{name}' ready after {elapsed:.1f}s")
+
+    def warm_up(self, names: Optional[Sequence[str]] = None) -> None:
+        """Load the given (default: configured) models one after another in a daemon thread."""
+        names = list(names) if names is not None else self.configured()
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            def run():
+                for name in names:
+                    self.load(name)
+
+            self._thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+            self._thread.start()
+
+    def status(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "state": s.state,
+                    "load_seconds": round(s.load_seconds, 3) if s.load_seconds is not None else None,
+                    "error": s.error,
+                }
+                for name, s in self._status.items()
+            }
+
+    def is_ready(self, names: Optional[Sequence[str]] = None) -> bool:
+        names = list(names) if names is not None else self.configured()
+        with self._lock:
+            return all(self._status[n].state == STATE_READY for n in names if n in self._status)
+
+
+model_registry = ModelRegistry()
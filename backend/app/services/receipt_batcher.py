@@ -0,0 +1,103 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Request:
+    item: Any
+    # Requests are only batched with others that share the same generate settings.
+    group: Hashable
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """Collects concurrent requests into batches for one model call.
+
+    A single daemon thread waits for the first request, then keeps collecting for up to
+    `max_wait_ms` or until `max_batch_size` requests are queued, and hands each group to
+    `run_batch(group, items) -> results` (one result per item, same order). If it raises or
+    returns a different number of results, every request of that batch fails with the error.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, Sequence[Any]], List[Any]],
+        max_batch_size: int = 4,
+        max_wait_ms: float = 50.0,
+        name: str = "micro-batcher",
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.name = name
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any, group: Hashable = None) -> Future:
+        self._ensure_thread()
+        request = _Request(item=item, group=group)
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            groups: dict[Hashable, List[_Request]] = {}
+            for request in batch:
+                groups.setdefault(request.group, []).append(request)
+
+            for group, requests in groups.items():
+                try:
+                    results = self.run_batch(group, [r.item for r in requests])
+                    if len(results) != len(requests):
+                        # Results cannot be matched to requests; fail them all rather than leave some hanging.
+                        raise RuntimeError(f"run_batch returned {len(results)} results for {len(requests)} items")
+                except Exception as e:
+                    logger.error(f"{self.name}: batch of {len(requests)} failed: {e}")
+                    for r in requests:
+                        r.future.set_exception(e)
+                    continue
+                with self._lock:
+                    self.batches += 1
+                    self.items += len(requests)
+                for r, result in zip(requests, results):
+                    r.future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            }
@@ -0,0 +1,162 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOB_DIR = Path(__file__).resolve().parent.parent.parent.parent / "db" / "receipt_blobs"
+
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_SUFFIX = ".thumb.webp"
+
+# Magic bytes -> (extension, media type) for the formats we accept as receipts.
+_FORMATS = [
+    (b"%PDF", ".pdf", "application/pdf"),
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"GIF8", ".gif", "image/gif"),
+]
+_MEDIA_TYPES = {ext: media_type for _, ext, media_type in _FORMATS}
+_MEDIA_TYPES.update({".webp": "image/webp", ".bin": "application/octet-stream"})
+
+# Keys are stored in Receipt.raw_file_path; anything else there is not served from the store.
+_KEY_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    key: str
+    sha256: str
+    size: int
+    media_type: str
+    has_thumbnail: bool
+    deduplicated: bool
+
+
+def _sniff(content: bytes) -> tuple[str, str]:
+    for magic, ext, media_type in _FORMATS:
+        if content.startswith(magic):
+            return ext, media_type
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return ".webp", "image/webp"
+    return ".bin", "application/octet-stream"
+
+
+class ReceiptBlobStore:
+    """Content-addressed store for uploaded receipt files.
+
+    Files live under `<root>/<h[0:2]>/<h[2:4]>/<sha256><ext>`, so identical uploads are
+    stored once. A small WebP thumbnail is written next to each original at upload time.
+    Blobs are shared between receipts; `ReceiptRepository` deletes one when the last
+    receipt referencing it goes away, holding `lock` against concurrent uploads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def is_key(key: Optional[str]) -> bool:
+        return bool(key) and _KEY_RE.match(key) is not None
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def thumbnail_path(self, key: str) -> Path:
+        return self.root / (key.rsplit(".", 1)[0] + THUMBNAIL_SUFFIX)
+
+    @staticmethod
+    def media_type(key: str) -> str:
+        return _MEDIA_TYPES.get(Path(key).suffix, "application/octet-stream")
+
+    @staticmethod
+    def sha256(key: str) -> str:
+        return Path(key).name.split(".", 1)[0]
+
+    def put(self, content: bytes) -> StoredBlob:
+        digest = hashlib.sha256(content).hexdigest()
+        ext, media_type = _sniff(content)
+        key = f"{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+        path = self.path(key)
+
+        deduplicated = path.exists()
+        if not deduplicated:
+            self._write_atomic(path, content)
+
+        thumbnail = self.thumbnail_path(key)
+        if not thumbnail.exists():
+            data = self._make_thumbnail(content, media_type)
+            if data is not None:
+                self._write_atomic(thumbnail, data)
+
+        return StoredBlob(
+            key=key,
+            sha256=digest,
+            size=len(content),
+            media_type=media_type,
+            has_thumbnail=thumbnail.exists(),
+            deduplicated=deduplicated,
+        )
+
+    def delete(self, key: str) -> None:
+        for path in (self.path(key), self.thumbnail_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        # Concurrent uploads of the same file must never expose a half-written blob.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _make_thumbnail(content: bytes, media_type: str) -> Optional[bytes]:
+        try:
+            from PIL import Image, ImageOps
+
+            if media_type == "application/pdf":
+                import pypdfium2 as pdfium
+
+                pdf = pdfium.PdfDocument(content)
+                try:
+                    page = pdf[0]
+                    scale = min(THUMBNAIL_SIZE[0] / page.get_width(), THUMBNAIL_SIZE[1] / page.get_height())
+                    image = page.render(scale=scale).to_pil()
+                finally:
+                    pdf.close()
+            elif media_type.startswith("image/"):
+                image = Image.open(io.BytesIO(content))
+                # Decode JPEGs at reduced size; thumbnails need only a fraction of the pixels.
+                image.draft("RGB", THUMBNAIL_SIZE)
+                image = ImageOps.exif_transpose(image)
+            else:
+                return None
+
+            image = image.convert("RGB")
+            image.thumbnail(THUMBNAIL_SIZE)
+            out = io.BytesIO()
+            image.save(out, format="WEBP", quality=75, method=4)
+            return out.getvalue()
+        except Exception as e:
+            logger.warning(f"Could not create receipt thumbnail: {e}")
+            return None
+
+
+receipt_blob_store = ReceiptBlobStore(Path(os.getenv("RECEIPT_BLOB_DIR", str(DEFAULT_BLOB_DIR))))
@@ -0,0 +1,235 @@
+"""Turns raw Donut CORD-v2 output into our receipt format.
+
+Pure functions without model state, so archived scans can be re-processed in bulk
+whenever the rules below change.
+"""
+
+import re
+
+# Lines that belong to the receipt header/footer (address, phone, server, table, ...).
+_HEADER_RE = re.compile("|".join([
+    r'^\d+\s+\w+\s+(st|street|rd|road|ave|avenue|blvd|dr|drive)',
+    r'tel[:\s]', r'phone', r'^server[:\s]', r'^order\s*#', r'^order#',
+    r'^guest', r'^reprint', r'^reg\s*$', r'^\d{5}$',
+    r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}', r'^for a chance', r'^see back',
+    r'ca\.\s*\d{5}', r'^south\s+gate', r'^lewnette',
+    r'^no sour cream$', r'^no cheese$', r'^khere$',
+    r'^waiter\s+\d+', r'^table\s+\d+', r'^check\s*#',
+    r'^qty.*name', r'^\w+,\s*(ca|ny|tx|fl)', r'^p\s*a\s*i\s*d',
+    r'^hermosa\s+beach', r'^serv\.?charge',
+]))
+
+# Words that make a line very likely a food/drink item.
+_FOOD_RE = re.compile("|".join([
+    r'bowl', r'plate', r'drink', r'coffee', r'tea', r'soda', r'water',
+    r'burger', r'sandwich', r'salad', r'soup', r'pizza', r'pasta',
+    r'chicken', r'beef', r'pork', r'fish', r'shrimp', r'lobster',
+    r'fries', r'rice', r'noodle', r'roll', r'taco', r'burrito',
+    r'cake', r'pie', r'ice cream', r'dessert',
+    r'beer', r'wine', r'margarita', r'cocktail', r'lite', r'light',
+    r'small', r'medium', r'large', r'\(s\)', r'\(m\)', r'\(l\)',
+    r'add\s', r'extra', r'side', r'combo', r'meal', r'special',
+    r'avocado', r'cheese', r'bacon', r'onion', r'lettuce',
+    r'pho', r'sushi', r'curry', r'masala', r'biryani',
+    r'buns', r'pancake', r'dumplings', r'wings',
+    r'sprouts', r'tender', r'grilled', r'vanilla', r'classic',
+    r'mac\s*&?\s*cheese', r'zucchini',
+]))
+
+_DATE_RE = re.compile(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})')
+_LONG_DATE_RE = re.compile(r'^\w+\s+\d{1,2},\s*\d{4}')
+
+
+def is_valid_price(price_str: str) -> bool:
+    if not price_str:
+        return False
+    cleaned = str(price_str).replace("$", "").replace(",", ".").strip()
+    try:
+        val = float(cleaned)
+        return val >= 0 and val < 10000
+    except ValueError:
+        return False
+
+
+def clean_price(price_str: str) -> str:
+    if not price_str:
+        return "0.00"
+    cleaned = str(price_str).replace("$", "").replace(",", ".").strip()
+    try:
+        return f"{float(cleaned):.2f}"
+    except ValueError:
+        return "0.00"
+
+
+def is_header_info(name: str) -> bool:
+    if not name:
+        return False
+    return _HEADER_RE.search(name.lower()) is not None
+
+
+def is_likely_menu_item(name: str, price: str) -> bool:
+    if not name or not is_valid_price(price):
+        return False
+
+    if isinstance(name, list):
+        return False
+
+    name_str = str(name)
+
+    try:
+        if float(str(price).replace("$", "").replace(",", ".").strip()) > 500:
+            return False
+    except ValueError:
+        pass
+
+    if _LONG_DATE_RE.match(name_str):
+        return False
+
+    if _FOOD_RE.search(name_str.lower()):
+        return True
+
+    return not is_header_info(name_str) and len(name_str) >= 2 and not name_str.replace(" ", "").isdigit()
+
+
+def _item_name(name: str, cnt) -> str:
+    if cnt and str(cnt).isdigit() and int(cnt) > 1:
+        return f"{cnt} {name}"
+    return name
+
+
+def extract_menu_items_from_sub(sub_dict: dict) -> list:
+    items = []
+    # Nested "sub" entries are followed iteratively instead of recursively.
+    while isinstance(sub_dict, dict):
+        name = sub_dict.get("nm", "")
+        price = sub_dict.get("price", "")
+
+        if isinstance(name, str) and is_valid_price(str(price)) and not is_header_info(name):
+            items.append({
+                "name": _item_name(name.strip(), sub_dict.get("cnt", "")),
+                "price": clean_price(str(price)),
+                "quantity": 1,
+            })
+
+        sub_dict = sub_dict.get("sub")
+    return items
+
+
+def convert_cord_to_custom(cord_output) -> dict:
+    """Converts CORD-v2 format to our custom format."""
+    custom_data = {
+        "merchant": "",
+        "date": "",
+        "total": "",
+        "currency": "CHF",
+        "items": []
+    }
+
+    if isinstance(cord_output, list):
+        if not cord_output:
+            return custom_data
+        cord_output = cord_output[0]
+
+    if not isinstance(cord_output, dict):
+        return custom_data
+
+    found_menu_items = []
+    merchant_candidate = ""
+
+    menu_items = cord_output.get("menu", [])
+    if isinstance(menu_items, dict):
+        menu_items = [menu_items]
+
+    for idx, item in enumerate(menu_items):
+        if not isinstance(item, dict):
+            continue
+
+        name = item.get("nm", "")
+        price = item.get("price", "")
+        num = item.get("num", "")
+
+        if isinstance(name, (dict, list)):
+            continue
+        name = str(name).strip()
+        if not name:
+            continue
+
+        if num and not custom_data["date"]:
+            date_match = _DATE_RE.search(str(num))
+            if date_match:
+                custom_data["date"] = date_match.group(1)
+
+        if isinstance(price, dict):
+            continue
+        price_str = str(price) if price else ""
+
+        if idx == 0 and not is_valid_price(price_str):
+            merchant_candidate = name
+            continue
+
+        if is_header_info(name):
+            continue
+
+        if is_valid_price(price_str):
+            found_menu_items.append({
+                "name": _item_name(name, item.get("cnt", "")),
+                "price": clean_price(price_str),
+                "quantity": 1
+            })
+
+        if "sub" in item:
+            found_menu_items.extend(extract_menu_items_from_sub(item["sub"]))
+
+    total_data = cord_output.get("total", {})
+    if isinstance(total_data, dict):
+        total_price = total_data.get("total_price", "") or total_data.get("cashprice", "")
+    elif isinstance(total_data, list) and total_data:
+        total_price = total_data[0].get("total_price", "") if isinstance(total_data[0], dict) else ""
+    else:
+        total_price = str(total_data) if total_data else ""
+
+    custom_data["total"] = clean_price(total_price)
+    if float(custom_data["total"]) > 10000:
+        custom_data["total"] = ""
+
+    sub_total = cord_output.get("sub_total", {})
+    if isinstance(sub_total, dict):
+        if not custom_data["total"] or custom_data["total"] == "0.00":
+            subtotal_price = sub_total.get("subtotal_price", "")
+            if is_valid_price(subtotal_price):
+                custom_data["total"] = clean_price(subtotal_price)
+
+        etc_items = sub_total.get("etc", [])
+        if isinstance(etc_items, list):
+            seen_names = {m["name"].lower() for m in found_menu_items}
+            for etc in etc_items:
+                if not isinstance(etc, dict):
+                    continue
+                nm = str(etc.get("nm", "")).strip()
+                price = etc.get("price", "")
+
+                date_match = _DATE_RE.search(nm)
+                if date_match and not custom_data["date"]:
+                    custom_data["date"] = date_match.group(1)
+                    continue
+
+                if not merchant_candidate and nm and not nm[0].isdigit():
+                    if not is_header_info(nm) and len(nm) > 2:
+                        if not is_valid_price(str(price)) or str(price) == nm:
+                            merchant_candidate = nm
+                            continue
+
+                if nm and is_likely_menu_item(nm, str(price)):
+                    artikel_name = _item_name(nm, etc.get("cnt", ""))
+                    if artikel_name.lower() not in seen_names:
+                        seen_names.add(artikel_name.lower())
+                        found_menu_items.append({
+                            "name": artikel_name,
+                            "price": clean_price(str(price)),
+                            "quantity": 1
+                        })
+
+    custom_data["merchant"] = merchant_candidate
+    custom_data["items"] = found_menu_items
+
+    return custom_data
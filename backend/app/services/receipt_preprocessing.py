@@ -0,0 +1,101 @@
+import io
+import logging
+from typing import Optional, Tuple
+
+from PIL import Image, ImageFilter
+
+logger = logging.getLogger(__name__)
+
+# Auto-crop works on a small grayscale thumbnail; the crop box is scaled back up.
+_CROP_PROBE_SIZE = 256
+# Crops that keep almost everything or almost nothing are most likely wrong.
+_MIN_CROP_AREA = 0.15
+_MAX_CROP_AREA = 0.95
+_CROP_MARGIN = 0.02
+
+
+def target_size(width: int, height: int, size: dict) -> Tuple[int, int]:
+    """Final (width, height) the Donut image processor would produce before padding.
+
+    Mirrors `DonutImageProcessor`: scale the shortest edge to min(size), then shrink to
+    fit into (size["width"], size["height"]) keeping the aspect ratio.
+    """
+    shortest = min(size["height"], size["width"])
+    scale = shortest / min(width, height)
+    w, h = width * scale, height * scale
+    fit = min(1.0, size["width"] / w, size["height"] / h)
+    return max(1, int(w * fit)), max(1, int(h * fit))
+
+
+def decode_image(file_bytes: bytes, size: dict) -> Image.Image:
+    """Decode an upload; JPEGs are decoded at reduced size via `draft()` where possible."""
+    image = Image.open(io.BytesIO(file_bytes))
+    if image.format == "JPEG":
+        # draft() picks the smallest DCT scale that still yields at least the requested size.
+        image.draft("RGB", (size["width"], size["height"]))
+    return image.convert("RGB")
+
+
+def _otsu_threshold(histogram: list) -> int:
+    total = sum(histogram)
+    sum_all = sum(i * h for i, h in enumerate(histogram))
+    sum_bg = weight_bg = 0
+    best, threshold = 0.0, 128
+    for i, h in enumerate(histogram):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
+
+
+def receipt_bbox(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """Bounding box of the bright paper region, or None if no plausible receipt is found."""
+    probe = image.convert("L")
+    probe.thumbnail((_CROP_PROBE_SIZE, _CROP_PROBE_SIZE))
+    threshold = _otsu_threshold(probe.histogram())
+    # Erode the mask so specks of bright background do not stretch the box.
+    mask = probe.point(lambda p: 255 if p > threshold else 0).filter(ImageFilter.MinFilter(5))
+    box = mask.getbbox()
+    if box is None:
+        return None
+
+    pw, ph = probe.size
+    area = (box[2] - box[0]) * (box[3] - box[1]) / (pw * ph)
+    if not _MIN_CROP_AREA <= area <= _MAX_CROP_AREA:
+        return None
+
+    sx, sy = image.width / pw, image.height / ph
+    mx, my = image.width * _CROP_MARGIN, image.height * _CROP_MARGIN
+    return (
+        max(0, int(box[0] * sx - mx)),
+        max(0, int(box[1] * sy - my)),
+        min(image.width, int(box[2] * sx + mx)),
+        min(image.height, int(box[3] * sy + my)),
+    )
+
+
+def prepare_image(image: Image.Image, size: dict, resample: int, auto_crop: bool = False) -> Image.Image:
+    """Crop to the receipt (optional) and resize once, straight to the processor's target size."""
+    if auto_crop:
+        box = receipt_bbox(image)
+        if box is not None:
+            image = image.crop(box)
+    final = target_size(image.width, image.height, size)
+    if final != image.size:
+        image = image.resize(final, resample)
+    return image
+
+
+def pdf_render_scale(page_width: float, page_height: float, size: dict, max_dpi: int) -> float:
+    """Render scale that yields the processor's target size, capped at `max_dpi` (PDF points are 1/72")."""
+    width, _ = target_size(page_width, page_height, size)
+    return min(width / page_width, max_dpi / 72)
@@ -1,15 +1,67 @@
 import re
 import torch
-from transformers import DonutProcessor, VisionEncoderDecoderModel
-from PIL import Image
-import io
+from transformers import DonutProcessor, StoppingCriteria, StoppingCriteriaList, VisionEncoderDecoderModel
 import logging
 import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from services.model_registry import model_registry
+from services.inference_pool import InferencePool, Timings
+from services.receipt_batcher import MicroBatcher
+from services.receipt_postprocessing import clean_price, convert_cord_to_custom, is_valid_price
+from services.receipt_preprocessing import decode_image, pdf_render_scale, prepare_image
+from services.scan_cache import ScanResultCache
+from services.scan_jobs import ScanJobRunner, ScanJobStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Scan results are cached next to the app database by default.
+DEFAULT_SCAN_CACHE_PATH = Path(__file__).resolve().parent.parent.parent.parent / "db" / "scan_cache.db"
+DEFAULT_SCAN_JOBS_PATH = DEFAULT_SCAN_CACHE_PATH.parent / "scan_jobs.db"
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """Settings for Donut `generate`; trades extraction quality for CPU latency."""
+    name: str
+    max_length: int
+    num_beams: int
+    # Stop decoding once the `total` field is closed; everything after it is rarely used.
+    stop_after_total: bool = False
+
+
+DECODING_PROFILES = {
+    "accurate": DecodingProfile("accurate", max_length=768, num_beams=4),
+    "balanced": DecodingProfile("balanced", max_length=512, num_beams=1),
+    "fast": DecodingProfile("fast", max_length=384, num_beams=1, stop_after_total=True),
+}
+
+
+def get_decoding_profile(name: Optional[str] = None) -> DecodingProfile:
+    """Profile by name, falling back to RECEIPT_SCAN_PROFILE (default: accurate)."""
+    name = name or os.getenv("RECEIPT_SCAN_PROFILE", "accurate")
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{name}', expected one of: {', '.join(DECODING_PROFILES)}")
+    return DECODING_PROFILES[name]
+
+
+class _StopAfterToken(StoppingCriteria):
+    """Marks a sequence as done once it contains `token_id`."""
+
+    def __init__(self, token_id: int):
+        self.token_id = token_id
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return (input_ids == self.token_id).any(dim=-1)
+
+
 class ReceiptScanner:
     _instance = None
     _model = None
@@ -19,29 +71,86 @@ class ReceiptScanner:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ReceiptScanner, cls).__new__(cls)
-            cls._instance._load_model()
+            # Weights are loaded on first use or by the startup warm-up, not at import time.
+            cls._instance._load_lock = threading.Lock()
+            cls._instance._batcher = cls._instance._create_batcher()
+            cls._instance._stats_lock = threading.Lock()
+            cls._instance._stages = {"decode": Timings(), "preprocess": Timings(), "inference": Timings()}
         return cls._instance
 
-    def _load_model(self):
-        logger.info("📥 Loading Receipt Scanner Model...")
-        self._device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"   Device: {self._device}")
+    def _create_batcher(self):
+        # Concurrent scans are merged into one batched `generate` call when enabled.
+        batch_size = int(os.getenv("RECEIPT_SCAN_BATCH_SIZE", "1"))
+        if batch_size <= 1:
+            return None
+        return MicroBatcher(
+            lambda profile, items: self.generate_batch(torch.cat(list(items)), profile),
+            max_batch_size=batch_size,
+            max_wait_ms=float(os.getenv("RECEIPT_SCAN_BATCH_WAIT_MS", "50")),
+            name="receipt-batcher",
+        )
+
+    def batch_stats(self):
+        return self._batcher.stats() if self._batcher is not None else None
+
+    def stage_stats(self):
+        """Per-scan stage timings: file decode/PDF render, crop+resize, Donut generate (PDFs summed over pages)."""
+        with self._stats_lock:
+            return {name: t.summary() for name, t in self._stages.items()}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._processor is not None and self._model is not None
 
+    def ensure_loaded(self):
+        if self.is_loaded:
+            return
+        with self._load_lock:
+            if not self.is_loaded:
+                self._load_model()
+        if not self.is_loaded:
+            raise RuntimeError("AI model not loaded")
+
+    @staticmethod
+    def _model_source():
         current_dir = os.path.dirname(os.path.abspath(__file__))
         backend_dir = os.path.dirname(os.path.dirname(current_dir))
         local_model_path = os.path.join(backend_dir, "ai_models", "donut_receipt_v1")
+        if os.path.exists(local_model_path):
+            return local_model_path, True
+        return "naver-clova-ix/donut-base-finetuned-cord-v2", False
+
+    @cached_property
+    def model_id(self) -> str:
+        """Identifies the weights in use; part of the scan cache key."""
+        model_name_or_path, local = self._model_source()
+        model_id = model_name_or_path
+        if local:
+            # A retrained local model replaces the files in place, so include their mtime.
+            weights = [os.path.join(model_name_or_path, f) for f in os.listdir(model_name_or_path)]
+            mtime = max((os.path.getmtime(f) for f in weights), default=0)
+            model_id = f"{os.path.basename(model_name_or_path)}@{int(mtime)}"
+        if self._quantization() == "int8":
+            model_id += "+int8"
+        return model_id
 
-        model_name_or_path = local_model_path if os.path.exists(local_model_path) else "naver-clova-ix/donut-base-finetuned-cord-v2"
+    def _load_model(self):
+        logger.info("📥 Loading Receipt Scanner Model...")
+        self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info(f"   Device: {self._device}")
+
+        model_name_or_path, local_files_only = self._model_source()
         try:
             self._processor = DonutProcessor.from_pretrained(
                 model_name_or_path,
-                local_files_only=os.path.exists(local_model_path),
+                local_files_only=local_files_only,
             )
             self._model = VisionEncoderDecoderModel.from_pretrained(
                 model_name_or_path,
-                local_files_only=os.path.exists(local_model_path),
+                local_files_only=local_files_only,
             ).to(self._device)
             self._model.eval()
+            self._apply_cpu_tuning()
             logger.info(" Model loaded successfully")
         except Exception as e:
             logger.error(f" Failed to load model: {e}")
@@ -49,68 +158,259 @@ class ReceiptScanner:
             self._model = None
             logger.warning("Receipt scanner will be unavailable until the model loads correctly.")
 
-    def scan_image(self, file_bytes: bytes, filename: str = ""):
+    @staticmethod
+    def _quantization() -> str:
+        return os.getenv("RECEIPT_SCAN_QUANTIZE", "none").lower()
+
+    def _apply_cpu_tuning(self):
+        threads = int(os.getenv("RECEIPT_SCAN_TORCH_THREADS", "0"))
+        if threads > 0:
+            torch.set_num_threads(threads)
+        if self._quantization() != "int8":
+            return
+        if self._device != "cpu":
+            logger.warning("RECEIPT_SCAN_QUANTIZE=int8 is only supported on CPU, keeping fp32 weights")
+            return
+        # The autoregressive decoder dominates CPU latency; the Swin encoder runs once per image.
+        self._model.decoder = torch.quantization.quantize_dynamic(
+            self._model.decoder, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("   Decoder quantized to dynamic int8")
+
+    def scan_image(self, file_bytes: bytes, filename: str = "", profile: Optional[DecodingProfile] = None):
+        """Scan a receipt image/PDF and return it in our custom format."""
+        result = self.extract_cord(file_bytes, filename, profile)
+        if "error" in result:
+            return result
+        return self._convert_to_custom_format(result["data"])
+
+    def scan_document(
+        self,
+        file_bytes: bytes,
+        filename: str = "",
+        profile: Optional[DecodingProfile] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """Like `scan_image`, but scans every page of a PDF and merges the results.
+
+        Pages are rendered and decoded in small batches (RECEIPT_SCAN_PDF_PAGE_BATCH), so
+        memory stays bounded regardless of the page count. `on_progress(done, total)` is
+        called once per page as soon as it is decoded; pages of one batch finish together.
+        """
+        if not self._is_pdf(file_bytes, filename):
+            result = self.scan_image(file_bytes, filename, profile)
+            if on_progress is not None and "error" not in result:
+                on_progress(1, 1)
+            return result
+
+        profile = profile or get_decoding_profile()
+        batch_size = max(1, int(os.getenv("RECEIPT_SCAN_PDF_PAGE_BATCH", "2")))
         try:
-            if not self._processor or not self._model:
-                return {"error": "AI model not loaded"}
+            self.ensure_loaded()
+            page_count, pages = self._iter_pdf_pages(file_bytes)
+            if not page_count:
+                return {"error": "Could not process file. Please upload a valid image or PDF."}
 
-            image = None
-            
-            # Check if PDF
-            if filename.lower().endswith('.pdf') or (file_bytes.startswith(b'%PDF')):
-                image = self._convert_pdf_to_image(file_bytes)
-            else:
-                image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
-            
+            page_results = []
+            batch = []
+            seconds = dict.fromkeys(self._stages, 0.0)
+            started = time.perf_counter()
+            for index, image in enumerate(pages, start=1):
+                decoded = time.perf_counter()
+                batch.append(self._preprocess(image))
+                preprocessed = time.perf_counter()
+                seconds["decode"] += decoded - started
+                seconds["preprocess"] += preprocessed - decoded
+                if len(batch) == batch_size or index == page_count:
+                    cords = self._generate(batch, profile)
+                    seconds["inference"] += time.perf_counter() - preprocessed
+                    for cord in cords:
+                        page_results.append(self._convert_to_custom_format(cord))
+                        if on_progress is not None:
+                            on_progress(len(page_results), page_count)
+                    batch = []
+                started = time.perf_counter()
+            self._record_stages(**seconds)
+            return self._merge_pages(page_results)
+
+        except Exception as e:
+            logger.error(f"Error scanning receipt: {e}")
+            return {"error": str(e)}
+
+    @staticmethod
+    def _merge_pages(pages: list) -> dict:
+        """Merges per-page results: header fields from the first page that has them,
+        all line items, and the total from the last page that shows one."""
+        merged = {"merchant": "", "date": "", "total": "", "currency": "CHF", "items": [], "pages": len(pages)}
+        for page in pages:
+            for key in ("merchant", "date"):
+                if not merged[key] and page.get(key):
+                    merged[key] = page[key]
+            merged["items"].extend(page.get("items", []))
+            if page.get("total") and page["total"] != "0.00":
+                merged["total"] = page["total"]
+        if pages:
+            merged["currency"] = pages[0].get("currency", merged["currency"])
+        if not merged["total"] and merged["items"]:
+            # Prices are model output; skip any that do not parse instead of failing the document.
+            prices = [str(i.get("price", "")) for i in merged["items"]]
+            merged["total"] = f"{sum(float(clean_price(p)) for p in prices if is_valid_price(p)):.2f}"
+        return merged
+
+    def extract_cord(self, file_bytes: bytes, filename: str = "", profile: Optional[DecodingProfile] = None):
+        """Run Donut and return the raw CORD-v2 structure as {"data": ...} (or {"error": ...})."""
+        profile = profile or get_decoding_profile()
+        try:
+            self.ensure_loaded()
+
+            started = time.perf_counter()
+            image = self._load_image(file_bytes, filename)
             if image is None:
                 return {"error": "Could not process file. Please upload a valid image or PDF."}
 
-            pixel_values = self._processor(image, return_tensors="pt").pixel_values.to(self._device)
-
-            task_prompt = "<s_cord-v2>"
-            decoder_input_ids = self._processor.tokenizer(
-                task_prompt, 
-                add_special_tokens=False, 
-                return_tensors="pt"
-            ).input_ids.to(self._device)
-
-            with torch.no_grad():
-                outputs = self._model.generate(
-                    pixel_values,
-                    decoder_input_ids=decoder_input_ids,
-                    max_length=768,
-                    pad_token_id=self._processor.tokenizer.pad_token_id,
-                    eos_token_id=self._processor.tokenizer.eos_token_id,
-                    use_cache=True,
-                    num_beams=4,
-                    bad_words_ids=[[self._processor.tokenizer.unk_token_id]],
-                    return_dict_in_generate=True,
-                )
-
-            sequence = self._processor.batch_decode(outputs.sequences)[0]
-            sequence = sequence.replace(self._processor.tokenizer.eos_token, "").replace(self._processor.tokenizer.pad_token, "")
-            sequence = re.sub(r"<.*?>", "", sequence, count=1).strip()
-            
-            cord_json = self._processor.token2json(sequence)
-            return self._convert_to_custom_format(cord_json)
+            decoded = time.perf_counter()
+            pixel_values = self._preprocess(image)
+            preprocessed = time.perf_counter()
+            cord = self._generate([pixel_values], profile)[0]
+            self._record_stages(
+                decode=decoded - started,
+                preprocess=preprocessed - decoded,
+                inference=time.perf_counter() - preprocessed,
+            )
+            return {"data": cord}
             
         except Exception as e:
             logger.error(f"Error scanning receipt: {e}")
             return {"error": str(e)}
 
+    def _record_stages(self, decode: float, preprocess: float, inference: float):
+        with self._stats_lock:
+            self._stages["decode"].add(decode)
+            self._stages["preprocess"].add(preprocess)
+            self._stages["inference"].add(inference)
+
+    def _generate(self, pixel_values: list, profile: DecodingProfile) -> list:
+        """One CORD dict per preprocessed image, through the micro-batcher when it is enabled."""
+        if self._batcher is not None:
+            futures = [self._batcher.submit(p, profile) for p in pixel_values]
+            return [future.result() for future in futures]
+        return self.generate_batch(torch.cat(pixel_values), profile)
+
+    def _stopping_criteria(self, profile: DecodingProfile):
+        if not profile.stop_after_total:
+            return None
+        tokenizer = self._processor.tokenizer
+        token_id = tokenizer.convert_tokens_to_ids("</s_total>")
+        if token_id is None or token_id == tokenizer.unk_token_id:
+            return None
+        return StoppingCriteriaList([_StopAfterToken(token_id)])
+
+    def generate_batch(self, pixel_values, profile: Optional[DecodingProfile] = None) -> list:
+        """Run one `generate` over stacked pixel values (B, C, H, W); returns one CORD dict per image."""
+        profile = profile or get_decoding_profile()
+        self.ensure_loaded()
+        pixel_values = pixel_values.to(self._device)
+
+        task_prompt = "<s_cord-v2>"
+        decoder_input_ids = self._processor.tokenizer(
+            task_prompt, 
+            add_special_tokens=False, 
+            return_tensors="pt"
+        ).input_ids.repeat(pixel_values.shape[0], 1).to(self._device)
+
+        with torch.inference_mode():
+            outputs = self._model.generate(
+                pixel_values,
+                decoder_input_ids=decoder_input_ids,
+                max_length=profile.max_length,
+                pad_token_id=self._processor.tokenizer.pad_token_id,
+                eos_token_id=self._processor.tokenizer.eos_token_id,
+                use_cache=True,
+                num_beams=profile.num_beams,
+                bad_words_ids=[[self._processor.tokenizer.unk_token_id]],
+                stopping_criteria=self._stopping_criteria(profile),
+                return_dict_in_generate=True,
+            )
+
+        results = []
+        for sequence in self._processor.batch_decode(outputs.sequences):
+            sequence = sequence.replace(self._processor.tokenizer.eos_token, "").replace(self._processor.tokenizer.pad_token, "")
+            sequence = re.sub(r"<.*?>", "", sequence, count=1).strip()
+            results.append(self._processor.token2json(sequence))
+        return results
+
+    def _target_size(self) -> dict:
+        size = self._processor.image_processor.size
+        return {"height": size["height"], "width": size["width"]}
+
+    def _preprocess(self, image):
+        """Pixel values for Donut, resizing the (possibly cropped) image only once."""
+        image_processor = self._processor.image_processor
+        if getattr(image_processor, "do_align_long_axis", False):
+            # Rotation depends on the original orientation; leave it to the processor.
+            return self._processor(image, return_tensors="pt").pixel_values
+        image = prepare_image(
+            image,
+            self._target_size(),
+            image_processor.resample,
+            auto_crop=os.getenv("RECEIPT_SCAN_AUTOCROP", "0") == "1",
+        )
+        return self._processor(image, do_resize=False, do_thumbnail=False, return_tensors="pt").pixel_values
+
+    @staticmethod
+    def _is_pdf(file_bytes: bytes, filename: str = "") -> bool:
+        return filename.lower().endswith('.pdf') or file_bytes.startswith(b'%PDF')
+
+    def _load_image(self, file_bytes: bytes, filename: str = ""):
+        if self._is_pdf(file_bytes, filename):
+            return self._convert_pdf_to_image(file_bytes)
+        return decode_image(file_bytes, self._target_size())
+
+    def _render_pdf_page(self, page):
+        # Render just large enough for the processor instead of a fixed scale=2.
+        max_dpi = int(os.getenv("RECEIPT_SCAN_PDF_MAX_DPI", "144"))
+        scale = pdf_render_scale(page.get_width(), page.get_height(), self._target_size(), max_dpi)
+        bitmap = page.render(scale=scale)
+        try:
+            return bitmap.to_pil().convert("RGB")
+        finally:
+            bitmap.close()
+            page.close()
+
+    def _iter_pdf_pages(self, pdf_bytes: bytes) -> tuple[int, Iterator]:
+        """(page count, generator rendering one page at a time), capped at RECEIPT_SCAN_PDF_MAX_PAGES."""
+        try:
+            import pypdfium2 as pdfium
+        except ImportError:
+            image = self._convert_pdf_to_image(pdf_bytes)
+            return (1, iter([image])) if image is not None else (0, iter([]))
+
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        page_count = min(len(pdf), int(os.getenv("RECEIPT_SCAN_PDF_MAX_PAGES", "20")))
+
+        def pages():
+            try:
+                for index in range(page_count):
+                    yield self._render_pdf_page(pdf[index])
+            finally:
+                pdf.close()
+
+        return page_count, pages()
+
     def _convert_pdf_to_image(self, pdf_bytes):
+        max_dpi = int(os.getenv("RECEIPT_SCAN_PDF_MAX_DPI", "144"))
         try:
             import pypdfium2 as pdfium
             pdf = pdfium.PdfDocument(pdf_bytes)
-            page = pdf[0] # Get first page
-            bitmap = page.render(scale=2) # Render with higher resolution
-            pil_image = bitmap.to_pil()
-            return pil_image.convert("RGB")
+            try:
+                return self._render_pdf_page(pdf[0]) # Get first page
+            finally:
+                pdf.close()
         except ImportError:
             logger.warning("pypdfium2 not installed. Trying to use pdf2image or failing.")
             try:
                 from pdf2image import convert_from_bytes
-                images = convert_from_bytes(pdf_bytes)
+                images = convert_from_bytes(pdf_bytes, dpi=max_dpi, first_page=1, last_page=1)
                 if images:
                     return images[0].convert("RGB")
             except ImportError:
@@ -120,242 +420,86 @@ class ReceiptScanner:
             logger.error(f"Error converting PDF: {e}")
             return None
 
-    def _is_valid_price(self, price_str: str) -> bool:
-        if not price_str:
-            return False
-        cleaned = str(price_str).replace("$", "").replace(",", ".").strip()
-        try:
-            val = float(cleaned)
-            return val >= 0 and val < 10000
-        except:
-            return False
-
-    def _clean_price(self, price_str: str) -> str:
-        if not price_str:
-            return "0.00"
-        cleaned = str(price_str).replace("$", "").replace(",", ".").strip()
-        try:
-            return f"{float(cleaned):.2f}"
-        except:
-            return "0.00"
-
-    def _is_header_info(self, name: str) -> bool:
-        if not name:
-            return False
-        name_lower = name.lower()
-        
-        header_patterns = [
-            r'^\d+\s+\w+\s+(st|street|rd|road|ave|avenue|blvd|dr|drive)',
-            r'tel[:\s]', r'phone', r'^server[:\s]', r'^order\s*#', r'^order#',
-            r'^guest', r'^reprint', r'^reg\s*$', r'^\d{5}$',
-            r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}', r'^for a chance', r'^see back',
-            r'ca\.\s*\d{5}', r'^south\s+gate', r'^lewnette',
-            r'^no sour cream$', r'^no cheese$', r'^khere$',
-            r'^waiter\s+\d+', r'^table\s+\d+', r'^check\s*#',
-            r'^qty.*name', r'^\w+,\s*(ca|ny|tx|fl)', r'^p\s*a\s*i\s*d',
-            r'^hermosa\s+beach', r'^serv\.?charge',
-        ]
-        
-        for pattern in header_patterns:
-            if re.search(pattern, name_lower):
-                return True
-        return False
-
-    def _is_likely_menu_item(self, name: str, price: str) -> bool:
-        if not name or not self._is_valid_price(price):
-            return False
-        
-        if isinstance(name, list):
-            return False
-        
-        name_str = str(name)
-        name_lower = name_str.lower()
-        
-        try:
-            price_val = float(str(price).replace("$", "").replace(",", ".").strip())
-            if price_val > 500:
-                return False
-        except:
-            pass
-        
-        if re.match(r'^\w+\s+\d{1,2},\s*\d{4}', name_str):
-            return False
-        
-        food_indicators = [
-            r'bowl', r'plate', r'drink', r'coffee', r'tea', r'soda', r'water',
-            r'burger', r'sandwich', r'salad', r'soup', r'pizza', r'pasta',
-            r'chicken', r'beef', r'pork', r'fish', r'shrimp', r'lobster',
-            r'fries', r'rice', r'noodle', r'roll', r'taco', r'burrito',
-            r'cake', r'pie', r'ice cream', r'dessert',
-            r'beer', r'wine', r'margarita', r'cocktail', r'lite', r'light',
-            r'small', r'medium', r'large', r'\(s\)', r'\(m\)', r'\(l\)',
-            r'add\s', r'extra', r'side', r'combo', r'meal', r'special',
-            r'avocado', r'cheese', r'bacon', r'onion', r'lettuce',
-            r'pho', r'sushi', r'curry', r'masala', r'biryani',
-            r'buns', r'pancake', r'dumplings', r'wings',
-            r'sprouts', r'tender', r'grilled', r'vanilla', r'classic',
-            r'mac\s*&?\s*cheese', r'zucchini',
-        ]
-        
-        for pattern in food_indicators:
-            if re.search(pattern, name_lower):
-                return True
-        
-        if self._is_valid_price(price) and not self._is_header_info(name_str):
-            if len(name_str) >= 2 and not name_str.replace(" ", "").isdigit():
-                return True
-        
-        return False
-
-    def _extract_menu_item_from_sub(self, sub_dict: dict) -> list:
-        items = []
-        if not isinstance(sub_dict, dict):
-            return items
-        
-        name = sub_dict.get("nm", "")
-        price = sub_dict.get("price", "")
-        cnt = sub_dict.get("cnt", "")
-        
-        if isinstance(name, str) and self._is_valid_price(str(price)):
-            if not self._is_header_info(name):
-                artikel_name = name.strip()
-                if cnt and str(cnt).isdigit() and int(cnt) > 1:
-                    artikel_name = f"{cnt} {artikel_name}"
-                items.append({
-                    "name": artikel_name,
-                    "price": self._clean_price(str(price)),
-                    "quantity": 1
-                })
-        
-        if "sub" in sub_dict:
-            items.extend(self._extract_menu_item_from_sub(sub_dict["sub"]))
-        
-        return items
-
     def _convert_to_custom_format(self, cord_output):
         """Converts CORD-v2 format to our custom format."""
-        custom_data = {
-            "merchant": "",
-            "date": "",
-            "total": "",
-            "currency": "CHF",
-            "items": []
-        }
-
-        if isinstance(cord_output, list):
-            if not cord_output: return custom_data
-            cord_output = cord_output[0]
-        
-        if not isinstance(cord_output, dict):
-            return custom_data
-        
-        found_menu_items = []
-        merchant_candidate = ""
-        
-        menu_items = cord_output.get("menu", [])
-        if isinstance(menu_items, dict):
-            menu_items = [menu_items]
-        
-        for idx, item in enumerate(menu_items):
-            if not isinstance(item, dict): continue
-                
-            name = item.get("nm", "")
-            price = item.get("price", "")
-            cnt = item.get("cnt", "")
-            num = item.get("num", "")
-            
-            if isinstance(name, (dict, list)): continue
-            name = str(name).strip()
-            
-            if not name: continue
-            
-            if num:
-                date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', str(num))
-                if date_match and not custom_data["date"]:
-                    custom_data["date"] = date_match.group(1)
-            
-            if isinstance(price, dict): continue
-            price_str = str(price) if price else ""
-            
-            if idx == 0 and not self._is_valid_price(price_str):
-                merchant_candidate = name
-                continue
-            
-            if self._is_header_info(name): continue
-            
-            if self._is_valid_price(price_str):
-                artikel_name = name
-                if cnt and str(cnt).isdigit() and int(cnt) > 1:
-                    artikel_name = f"{cnt} {artikel_name}"
-                
-                found_menu_items.append({
-                    "name": artikel_name,
-                    "price": self._clean_price(price_str),
-                    "quantity": 1
-                })
-            
-            if "sub" in item:
-                sub_items = self._extract_menu_item_from_sub(item["sub"])
-                found_menu_items.extend(sub_items)
-        
-        total_data = cord_output.get("total", {})
-        if isinstance(total_data, dict):
-            total_price = total_data.get("total_price", "") or total_data.get("cashprice", "")
-        elif isinstance(total_data, list) and total_data:
-            total_price = total_data[0].get("total_price", "") if isinstance(total_data[0], dict) else ""
-        else:
-            total_price = str(total_data) if total_data else ""
-        
-        custom_data["total"] = self._clean_price(total_price)
-        
-        try:
-            total_val = float(custom_data["total"]) if custom_data["total"] else 0
-            if total_val > 10000: custom_data["total"] = ""
-        except: pass
-        
-        sub_total = cord_output.get("sub_total", {})
-        if isinstance(sub_total, dict):
-            if not custom_data["total"] or custom_data["total"] == "0.00":
-                subtotal_price = sub_total.get("subtotal_price", "")
-                if self._is_valid_price(subtotal_price):
-                    custom_data["total"] = self._clean_price(subtotal_price)
-            
-            etc_items = sub_total.get("etc", [])
-            if isinstance(etc_items, list):
-                for etc in etc_items:
-                    if not isinstance(etc, dict): continue
-                    nm = str(etc.get("nm", "")).strip()
-                    price = etc.get("price", "")
-                    cnt = etc.get("cnt", "")
-                    
-                    date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', nm)
-                    if date_match and not custom_data["date"]:
-                        custom_data["date"] = date_match.group(1)
-                        continue
-                    
-                    if not merchant_candidate and nm and not nm[0].isdigit():
-                        if not self._is_header_info(nm) and len(nm) > 2:
-                            if not self._is_valid_price(str(price)) or str(price) == nm:
-                                merchant_candidate = nm
-                                continue
-                    
-                    if self._is_valid_price(str(price)) and nm:
-                        if self._is_likely_menu_item(nm, str(price)):
-                            artikel_name = nm
-                            if cnt and str(cnt).isdigit() and int(cnt) > 1:
-                                artikel_name = f"{cnt} {artikel_name}"
-                            
-                            already_exists = any(m["name"].lower() == artikel_name.lower() for m in found_menu_items)
-                            if not already_exists:
-                                found_menu_items.append({
-                                    "name": artikel_name,
-                                    "price": self._clean_price(str(price)),
-                                    "quantity": 1
-                                })
-
-        custom_data["merchant"] = merchant_candidate
-        custom_data["items"] = found_menu_items
-        
-        return custom_data
+        return convert_cord_to_custom(cord_output)
 
 scanner = ReceiptScanner()
+model_registry.register("receipt_scanner", scanner.ensure_loaded)
+
+# All Donut calls from async endpoints go through this pool so they never block the event loop.
+receipt_inference_pool = InferencePool(
+    "receipt-scan",
+    # With micro-batching, enough workers must wait concurrently to fill a batch.
+    workers=int(os.getenv("RECEIPT_SCAN_WORKERS", os.getenv("RECEIPT_SCAN_BATCH_SIZE", "1"))),
+    max_queue=int(os.getenv("RECEIPT_SCAN_QUEUE_DEPTH", "4")),
+    torch_threads=int(os.getenv("RECEIPT_SCAN_TORCH_THREADS", "0")),
+)
+
+_scan_cache: Optional[ScanResultCache] = None
+_scan_cache_lock = threading.Lock()
+
+
+def get_scan_cache() -> Optional[ScanResultCache]:
+    """Shared scan-result cache, or None when RECEIPT_SCAN_CACHE_ENABLED=0."""
+    global _scan_cache
+    if os.getenv("RECEIPT_SCAN_CACHE_ENABLED", "1") != "1":
+        return None
+    if _scan_cache is None:
+        with _scan_cache_lock:
+            if _scan_cache is None:
+                _scan_cache = ScanResultCache(
+                    Path(os.getenv("RECEIPT_SCAN_CACHE_PATH", str(DEFAULT_SCAN_CACHE_PATH))),
+                    max_entries=int(os.getenv("RECEIPT_SCAN_CACHE_MAX_ENTRIES", "5000")),
+                    max_age_seconds=int(float(os.getenv("RECEIPT_SCAN_CACHE_MAX_AGE_DAYS", "30")) * 86400),
+                )
+    return _scan_cache
+
+
+def _scan_cache_key(profile: DecodingProfile) -> str:
+    # Different profiles can yield different results for the same file.
+    return f"{scanner.model_id}|{profile.name}"
+
+
+def lookup_cached_scan(content: bytes, profile: DecodingProfile) -> Optional[dict]:
+    """Cached `scan_image` result for these bytes, flagged with "cached": True."""
+    cache = get_scan_cache()
+    cached = cache.get(content, _scan_cache_key(profile)) if cache is not None else None
+    if cached is None:
+        return None
+    return {**cached, "cached": True, "profile": profile.name}
+
+
+def scan_and_cache(
+    content: bytes,
+    filename: str,
+    profile: DecodingProfile,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """Blocking `scan_document` that stores successful results in the scan cache."""
+    result = scanner.scan_document(content, filename, profile, on_progress)
+    if "error" in result:
+        return result
+    cache = get_scan_cache()
+    if cache is not None:
+        cache.put(content, _scan_cache_key(profile), result)
+    return {**result, "cached": False, "profile": profile.name}
+
+
+def _run_scan_job(job: dict, content: bytes, on_progress: Callable[[int, int], None]) -> dict:
+    profile = get_decoding_profile(job["profile"])
+    cached = lookup_cached_scan(content, profile)
+    if cached is not None:
+        return cached
+    # Same workers as the interactive endpoints, so jobs never add Donut concurrency.
+    return receipt_inference_pool.run_blocking(scan_and_cache, content, job["filename"], profile, on_progress)
+
+
+# Background scans for POST /receipt/scan/jobs; queued jobs survive a restart.
+scan_jobs = ScanJobRunner(
+    lambda: ScanJobStore(Path(os.getenv("RECEIPT_SCAN_JOBS_PATH", str(DEFAULT_SCAN_JOBS_PATH)))),
+    _run_scan_job,
+    workers=int(os.getenv("RECEIPT_SCAN_JOB_WORKERS", "1")),
+    per_user_limit=int(os.getenv("RECEIPT_SCAN_JOBS_PER_USER", "1")),
+    retention_seconds=float(os.getenv("RECEIPT_SCAN_JOB_RETENTION_HOURS", "24")) * 3600,
+)
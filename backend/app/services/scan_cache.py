@@ -0,0 +1,89 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ScanResultCache:
+    """Local cache of receipt scan results keyed by SHA-256(file bytes) + model identifier.
+
+    Re-uploads of the same photo/PDF return the stored result instead of running Donut
+    again. Entries expire after `max_age_seconds`, and the cache holds at most
+    `max_entries` rows, evicting the least recently used ones first.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 5000, max_age_seconds: int = 30 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scan_results (
+                content_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (content_hash, model)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_results_last_used ON scan_results (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, content: bytes, model: str) -> Optional[dict]:
+        key = self.content_hash(content)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM scan_results WHERE content_hash = ? AND model = ?",
+                (key, model),
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE scan_results SET last_used = ? WHERE content_hash = ? AND model = ?",
+                (now, key, model),
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, content: bytes, model: str, result: dict) -> None:
+        key = self.content_hash(content)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scan_results (content_hash, model, result, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(result, ensure_ascii=False), now, now),
+            )
+            self._conn.execute("DELETE FROM scan_results WHERE created_at < ?", (now - self.max_age_seconds,))
+            count = self._conn.execute("SELECT COUNT(*) FROM scan_results").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM scan_results WHERE rowid IN ("
+                    "SELECT rowid FROM scan_results ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM scan_results").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
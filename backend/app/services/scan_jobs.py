@@ -0,0 +1,245 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+FINISHED = (STATUS_DONE, STATUS_FAILED)
+
+_COLUMNS = (
+    "id, user_id, filename, profile, status, result, error, pages_done, pages_total, "
+    "created_at, started_at, finished_at"
+)
+
+
+class ScanJobStore:
+    """SQLite-persisted scan jobs; the upload is kept until the job has finished."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scan_jobs (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                status TEXT NOT NULL,
+                content BLOB,
+                result TEXT,
+                error TEXT,
+                pages_done INTEGER NOT NULL DEFAULT 0,
+                pages_total INTEGER,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status, created_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, user_id: int, filename: str, profile: str, content: bytes) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO scan_jobs (id, user_id, filename, profile, status, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, user_id, filename, profile, STATUS_QUEUED, content, time.time()),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM scan_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def queued(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM scan_jobs WHERE status = ? ORDER BY created_at", (STATUS_QUEUED,)
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def start(self, job_id: str) -> bytes:
+        """Marks the job as running and returns its upload."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scan_jobs SET status = ?, started_at = ? WHERE id = ?",
+                (STATUS_RUNNING, time.time(), job_id),
+            )
+            self._conn.commit()
+            return self._conn.execute("SELECT content FROM scan_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def set_progress(self, job_id: str, pages_done: int, pages_total: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scan_jobs SET pages_done = ?, pages_total = ? WHERE id = ?", (pages_done, pages_total, job_id)
+            )
+            self._conn.commit()
+
+    def finish(self, job_id: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scan_jobs SET status = ?, result = ?, error = ?, content = NULL, finished_at = ? WHERE id = ?",
+                (
+                    STATUS_FAILED if error else STATUS_DONE,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+            self._conn.commit()
+
+    def requeue_running(self) -> int:
+        """Jobs left running by a previous process go back to the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE scan_jobs SET status = ?, started_at = NULL, pages_done = 0 WHERE status = ?",
+                (STATUS_QUEUED, STATUS_RUNNING),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def purge_finished(self, older_than_seconds: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM scan_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (*FINISHED, time.time() - older_than_seconds),
+            )
+            self._conn.commit()
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM scan_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class ScanJobRunner:
+    """Runs queued scan jobs on a local thread pool, at most `per_user_limit` at once per user.
+
+    A dispatcher thread hands queued jobs (oldest first) to free workers, skipping users
+    that already have `per_user_limit` jobs running. Job state lives in `ScanJobStore`,
+    so jobs queued or interrupted before a restart are picked up again by `start()`.
+    """
+
+    def __init__(
+        self,
+        store_factory: Callable[[], ScanJobStore],
+        run_job: Callable[[dict, bytes, Callable[[int, int], None]], dict],
+        workers: int = 1,
+        per_user_limit: int = 1,
+        retention_seconds: float = 86400,
+    ):
+        self._store_factory = store_factory
+        self._store: Optional[ScanJobStore] = None
+        self.run_job = run_job
+        self.workers = max(1, workers)
+        self.per_user_limit = max(1, per_user_limit)
+        self.retention_seconds = retention_seconds
+        self._wakeup = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._running: dict[int, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def store(self) -> ScanJobStore:
+        with self._wakeup:
+            if self._store is None:
+                self._store = self._store_factory()
+            return self._store
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            requeued = self.store.requeue_running()
+            if requeued:
+                logger.info(f"Re-queued {requeued} scan job(s) interrupted by a restart")
+            self.store.purge_finished(self.retention_seconds)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan-job")
+            self._thread = threading.Thread(target=self._dispatch, name="scan-job-dispatcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, user_id: int, filename: str, profile: str, content: bytes) -> dict:
+        job = self.store.create(user_id, filename, profile, content)
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def _next_job(self) -> Optional[dict]:
+        for job in self.store.queued():
+            if self._running.get(job["user_id"], 0) < self.per_user_limit:
+                return job
+        return None
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._wakeup:
+                job = None
+                if sum(self._running.values()) < self.workers:
+                    job = self._next_job()
+                if job is None:
+                    # Woken by submit/completion; the timeout is only a safety net.
+                    self._wakeup.wait(timeout=5)
+                    continue
+                self._running[job["user_id"]] = self._running.get(job["user_id"], 0) + 1
+                content = self.store.start(job["id"])
+            self._executor.submit(self._execute, job, content)
+
+    def _execute(self, job: dict, content: bytes) -> None:
+        try:
+            result = self.run_job(
+                job, content, lambda done, total: self.store.set_progress(job["id"], done, total)
+            )
+            if "error" in result:
+                self.store.finish(job["id"], error=result["error"])
+            else:
+                self.store.finish(job["id"], result=result)
+        except Exception as e:
+            logger.error(f"Scan job {job['id']} failed: {e}")
+            self.store.finish(job["id"], error=str(e))
+        finally:
+            with self._wakeup:
+                self._running[job["user_id"]] -= 1
+                if not self._running[job["user_id"]]:
+                    del self._running[job["user_id"]]
+                self._wakeup.notify()
+
+    def stats(self) -> dict:
+        with self._wakeup:
+            running_users = len(self._running)
+        return {
+            "workers": self.workers,
+            "per_user_limit": self.per_user_limit,
+            "running_users": running_users,
+            "jobs": self.store.counts(),
+        }
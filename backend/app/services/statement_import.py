@@ -0,0 +1,258 @@
+"""Streaming parsers for bank statement uploads (CSV and ISO 20022 camt.053).
+
+Both parsers read from a binary file object and yield one `ParsedRow` or `RowError`
+per booking, so an upload is never held in memory as a whole.
+"""
+
+import csv
+import io
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import BinaryIO, Iterator, Optional, Union
+
+FORMAT_CSV = "csv"
+FORMAT_CAMT053 = "camt053"
+FORMATS = (FORMAT_CSV, FORMAT_CAMT053)
+
+
+@dataclass(frozen=True)
+class ParsedRow:
+    line: int
+    date: date
+    description: Optional[str]
+    amount_cents: int
+    currency_code: Optional[str]
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    message: str
+
+
+StatementRow = Union[ParsedRow, RowError]
+
+
+def detect_format(filename: Optional[str], head: bytes) -> str:
+    if (filename or "").lower().endswith(".xml") or head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<"):
+        return FORMAT_CAMT053
+    return FORMAT_CSV
+
+
+def iter_statement_rows(stream: BinaryIO, fmt: str) -> Iterator[StatementRow]:
+    """Raises ValueError for an unknown format or a CSV without the required columns."""
+    if fmt == FORMAT_CSV:
+        return iter_csv_rows(stream)
+    if fmt == FORMAT_CAMT053:
+        return iter_camt053_rows(stream)
+    raise ValueError(f"unknown import format '{fmt}'")
+
+
+def parse_amount_cents(text: str) -> int:
+    """Parses '1234.50', '-12,30', "1'234.50", '1.234,50' or '12.30-' into cents."""
+    value = re.sub(r"[\s'’ ]", "", text or "")
+    negative = value.startswith("-") or value.endswith("-")
+    value = value.strip("+-")
+    if not value:
+        raise ValueError("empty amount")
+
+    comma, dot = value.rfind(","), value.rfind(".")
+    if comma >= 0 and dot >= 0:
+        decimal_sep = "," if comma > dot else "."
+    elif comma >= 0:
+        # "12,30" is a decimal comma, "1,234" a thousands separator.
+        decimal_sep = "," if len(value) - comma - 1 <= 2 else None
+    elif dot >= 0:
+        decimal_sep = "." if len(value) - dot - 1 <= 2 else None
+    else:
+        decimal_sep = None
+
+    thousands_sep = {",": ".", ".": ",", None: ",."}[decimal_sep]
+    for sep in thousands_sep:
+        value = value.replace(sep, "")
+    if decimal_sep:
+        value = value.replace(decimal_sep, ".")
+
+    try:
+        cents = int((Decimal(value) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount '{text}'")
+    return -cents if negative else cents
+
+
+_DMY_RE = re.compile(r"^(\d{1,2})[./](\d{1,2})[./](\d{4}|\d{2})$")
+
+
+def parse_date(text: str) -> date:
+    """Parses ISO dates/datetimes, 'dd.mm.yyyy', 'dd.mm.yy' and 'dd/mm/yyyy'."""
+    value = (text or "").strip()
+    # strptime is far too slow for 100k-row statements; ISO is the common case.
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    match = _DMY_RE.match(value)
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        try:
+            return date(year + 2000 if year < 100 else year, month, day)
+        except ValueError:
+            pass
+    raise ValueError(f"invalid date '{text}'")
+
+
+# Header aliases (lower-case) of the CSV columns we understand.
+_CSV_COLUMNS = {
+    "date": ("date", "datum", "booking_date", "buchungsdatum", "transaction_date", "valuta", "value_date"),
+    "description": (
+        "description", "beschreibung", "text", "buchungstext", "verwendungszweck", "details", "payee", "memo",
+    ),
+    "amount_cents": ("amount_cents",),
+    "amount": ("amount", "betrag"),
+    "credit": ("credit", "gutschrift"),
+    "debit": ("debit", "belastung", "lastschrift"),
+    "currency": ("currency", "currency_code", "währung", "waehrung"),
+}
+
+
+def _csv_columns(fieldnames: list[str]) -> dict[str, str]:
+    by_alias = {name.strip().lower(): name for name in fieldnames}
+    columns = {}
+    for key, aliases in _CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in by_alias:
+                columns[key] = by_alias[alias]
+                break
+    if "date" not in columns:
+        raise ValueError("CSV has no date column")
+    if not ({"amount_cents", "amount"} & columns.keys() or {"credit", "debit"} & columns.keys()):
+        raise ValueError("CSV has no amount column")
+    return columns
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[StatementRow]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    header = text.readline()
+    if not header.strip():
+        raise ValueError("CSV is empty")
+    delimiter = max((";", ",", "\t"), key=header.count)
+    fieldnames = next(csv.reader([header], delimiter=delimiter))
+    columns = _csv_columns(fieldnames)
+    reader = csv.DictReader(text, fieldnames=fieldnames, delimiter=delimiter)
+    return _csv_rows(reader, columns)
+
+
+def _csv_amount_cents(record: dict, columns: dict[str, str]) -> int:
+    if "amount_cents" in columns:
+        return int(record[columns["amount_cents"]])
+    if "amount" in columns and (record.get(columns["amount"]) or "").strip():
+        return parse_amount_cents(record[columns["amount"]])
+    credit = (record.get(columns.get("credit", "")) or "").strip()
+    debit = (record.get(columns.get("debit", "")) or "").strip()
+    if not credit and not debit:
+        raise ValueError("missing amount")
+    return (parse_amount_cents(credit) if credit else 0) - (abs(parse_amount_cents(debit)) if debit else 0)
+
+
+def _csv_rows(reader: csv.DictReader, columns: dict[str, str]) -> Iterator[StatementRow]:
+    for record in reader:
+        # +1 for the header line that was consumed before the reader started.
+        line = reader.line_num + 1
+        if not any((value or "").strip() for value in record.values() if isinstance(value, str)):
+            continue
+        try:
+            description = (record.get(columns.get("description", "")) or "").strip() or None
+            currency = (record.get(columns.get("currency", "")) or "").strip().upper() or None
+            yield ParsedRow(
+                line=line,
+                date=parse_date(record[columns["date"]]),
+                description=description,
+                amount_cents=_csv_amount_cents(record, columns),
+                currency_code=currency,
+            )
+        except (ValueError, TypeError) as e:
+            yield RowError(line=line, message=str(e))
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child(elem: Optional[ET.Element], *path: str) -> Optional[ET.Element]:
+    for name in path:
+        if elem is None:
+            return None
+        elem = next((c for c in elem if _local(c.tag) == name), None)
+    return elem
+
+
+def _text(elem: Optional[ET.Element], *path: str) -> Optional[str]:
+    found = _child(elem, *path)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip() or None
+
+
+def _camt_description(entry: ET.Element, credit: bool) -> Optional[str]:
+    remittance = [
+        e.text.strip() for e in entry.iter() if _local(e.tag) == "Ustrd" and e.text and e.text.strip()
+    ]
+    if remittance:
+        return " ".join(remittance)
+    details = _child(entry, "NtryDtls", "TxDtls")
+    text = _text(details, "AddtlTxInf") or _text(entry, "AddtlNtryInf")
+    if text:
+        return text
+    # Fall back to the counterparty: the debtor pays us, we pay the creditor.
+    party = _child(details, "RltdPties", "Dbtr" if credit else "Cdtr")
+    return _text(party, "Nm") or _text(party, "Pty", "Nm")
+
+
+def _camt_entry(entry: ET.Element, line: int) -> StatementRow:
+    try:
+        amount = _child(entry, "Amt")
+        if amount is None or not amount.text:
+            raise ValueError("missing Amt")
+        indicator = _text(entry, "CdtDbtInd")
+        if indicator not in ("CRDT", "DBIT"):
+            raise ValueError(f"invalid CdtDbtInd '{indicator}'")
+        credit = indicator == "CRDT"
+        booked = (
+            _text(entry, "BookgDt", "Dt") or _text(entry, "BookgDt", "DtTm")
+            or _text(entry, "ValDt", "Dt") or _text(entry, "ValDt", "DtTm")
+        )
+        if booked is None:
+            raise ValueError("missing BookgDt")
+        cents = parse_amount_cents(amount.text)
+        return ParsedRow(
+            line=line,
+            date=parse_date(booked),
+            description=_camt_description(entry, credit),
+            amount_cents=abs(cents) if credit else -abs(cents),
+            currency_code=(amount.get("Ccy") or "").upper() or None,
+        )
+    except ValueError as e:
+        return RowError(line=line, message=str(e))
+
+
+def iter_camt053_rows(stream: BinaryIO) -> Iterator[StatementRow]:
+    """Yields one row per <Ntry>; `line` is the entry's position in the file (1-based)."""
+    stack: list[ET.Element] = []
+    index = 0
+    try:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            if _local(elem.tag) == "Ntry":
+                index += 1
+                yield _camt_entry(elem, index)
+                # Detach the processed entry so memory stays flat for large statements.
+                if stack:
+                    stack[-1].remove(elem)
+    except ET.ParseError as e:
+        raise ValueError(f"invalid camt.053 XML: {e}")
@@ -1,17 +1,34 @@
 import os
 import json
 import re
+import hashlib
+import threading
 import unicodedata
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from services.embedding_backends import BACKEND_ONNX, EmbeddingBackend, load_embedding_backend, onnx_model_path
+from services.embedding_store import DescriptionEmbeddingStore
+from services.model_registry import model_registry
+from services.keyword_rules import (
+    DEFAULT_RULES_PATH,
+    CompiledKeywordRules,
+    KeywordRule,
+    load_keyword_rules,
+)
 
 
 DEFAULT_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 # Default chosen to work well with short, manual descriptions (e.g., "Coop", "Migros").
 # Can be overridden via CATEGORY_AUTO_THRESHOLD env var.
 DEFAULT_AUTO_THRESHOLD = 0.5
+# Description embeddings are persisted next to the app database by default.
+# Set EMBEDDING_STORE_PATH to an empty string to keep them in memory only.
+DEFAULT_EMBEDDING_STORE_PATH = Path(__file__).resolve().parent.parent.parent.parent / "db" / "embedding_store.db"
 
 
 @dataclass(frozen=True)
@@ -38,6 +55,7 @@ def _desc_lower(description: Optional[str]) -> str:
     return _normalize_for_match(description)
 
 
+@lru_cache(maxsize=8192)
 def _normalize_for_match(text: Optional[str]) -> str:
     """Normalize text for keyword matching.
 
@@ -71,18 +89,26 @@ def _has_ancestor_named(candidate: CategoryCandidate, by_id: dict[int, CategoryC
     return False
 
 
-def _is_food_category(candidate: CategoryCandidate, by_id: dict[int, CategoryCandidate]) -> bool:
-    name = (candidate.name or '').lower()
-    if name in {"food & drinks", "groceries", "restaurants & cafés", "restaurants & cafes", "takeaway & delivery"}:
-        return True
-    return _has_ancestor_named(candidate, by_id, {"food & drinks"})
+_keyword_rules: Optional[CompiledKeywordRules] = None
+
+
+def _get_keyword_rules() -> CompiledKeywordRules:
+    # Rules live in a JSON table so new merchants can be added without code changes.
+    global _keyword_rules
+    if _keyword_rules is None:
+        path = os.getenv("CATEGORY_RULES_PATH") or DEFAULT_RULES_PATH
+        _keyword_rules = load_keyword_rules(Path(path), _normalize_for_match)
+    return _keyword_rules
 
 
-def _is_finance_category(candidate: CategoryCandidate, by_id: dict[int, CategoryCandidate]) -> bool:
-    name = (candidate.name or '').lower()
-    if name in {"finance", "bank fees", "interest & charges", "taxes"}:
-        return True
-    return _has_ancestor_named(candidate, by_id, {"finance"})
+@lru_cache(maxsize=256)
+def _rule_family(candidates: tuple[CategoryCandidate, ...], rule: KeywordRule) -> tuple[CategoryCandidate, ...]:
+    by_id = {c.id: c for c in candidates}
+    return tuple(
+        c for c in candidates
+        if (c.name or '').lower() in rule.category_names
+        or _has_ancestor_named(c, by_id, rule.ancestor_names)
+    )
 
 
 def _apply_keyword_hints(
@@ -90,45 +116,37 @@ def _apply_keyword_hints(
     description: Optional[str],
 ) -> List[CategoryCandidate]:
     # Lightweight heuristics to avoid obviously wrong matches for short descriptions.
+    # If a description clearly belongs to a family (e.g. food, finance), restrict to that tree.
     d = _desc_lower(description)
     if not d:
         return list(candidates)
 
-    d_squashed = _squash(d)
+    rule = _get_keyword_rules().match_hint(d, _squash(d))
+    if rule is None:
+        return list(candidates)
+
+    family = _rule_family(tuple(candidates), rule)
+    return list(family) if family else list(candidates)
+
+
+@dataclass(frozen=True)
+class _LeafIndex:
+    # normalized name / parent-qualified path -> position of the first matching leaf
+    leaves: tuple[CategoryCandidate, ...]
+    by_name: dict
+    by_path: dict
 
-    by_id = {c.id: c for c in candidates}
 
-    food_keywords = {
-        "doner", "kebab", "pizza", "burger", "restaurant", "cafe", "bar",
-        "takeaway", "take away", "delivery", "liefer", "lieferung", "imbiss", "bistro",
-    }
-    # Match variants that often come with spaces/hyphens.
-    food_squashed_keywords = {
-        "takeaway",
-        "mcdonalds",
-        "mcd",
-    }
-    groceries_keywords = {"migros", "coop", "aldi", "lidl", "denner"}
-
-    finance_keywords = {
-        "bank", "gebühr", "gebuehr", "fee", "fees", "zins", "interest", "tax", "taxes", "steuer", "charges",
-    }
-
-    # If it clearly looks like food, restrict to Food & Drinks tree.
-    if (
-        any(k in d for k in food_keywords)
-        or any(k in d for k in groceries_keywords)
-        or any(k in d_squashed for k in food_squashed_keywords)
-    ):
-        food = [c for c in candidates if _is_food_category(c, by_id)]
-        return food if food else list(candidates)
-
-    # If it clearly looks like finance/banking, restrict to Finance tree.
-    if any(k in d for k in finance_keywords):
-        fin = [c for c in candidates if _is_finance_category(c, by_id)]
-        return fin if fin else list(candidates)
-
-    return list(candidates)
+@lru_cache(maxsize=256)
+def _leaf_index(categories: tuple[CategoryCandidate, ...]) -> _LeafIndex:
+    by_id = {c.id: c for c in categories}
+    leaves = tuple(_leaf_categories(list(categories)))
+    by_name: dict[str, int] = {}
+    by_path: dict[str, int] = {}
+    for pos, c in enumerate(leaves):
+        by_name.setdefault(_normalize_for_match(c.name), pos)
+        by_path.setdefault(_normalize_for_match(_build_category_path(c, by_id)), pos)
+    return _LeafIndex(leaves=leaves, by_name=by_name, by_path=by_path)
 
 
 def _find_leaf_by_name(
@@ -137,19 +155,14 @@ def _find_leaf_by_name(
 ) -> Optional[int]:
     if not categories:
         return None
-    by_id = {c.id: c for c in categories}
-    leaves = _leaf_categories(list(categories))
+    index = _leaf_index(tuple(categories))
 
     wanted = {_normalize_for_match(n) for n in target_names if (n or '').strip()}
-    for c in leaves:
-        if _normalize_for_match(c.name) in wanted:
-            return c.id
-
-    # Fallback: try parent-qualified names (helps if only parent is present as leaf)
-    for c in leaves:
-        path = _build_category_path(c, by_id)
-        if _normalize_for_match(path) in wanted:
-            return c.id
+    for lookup in (index.by_name, index.by_path):
+        # Fallback to parent-qualified names helps if only the parent is present as leaf.
+        positions = [lookup[w] for w in wanted if w in lookup]
+        if positions:
+            return index.leaves[min(positions)].id
     return None
 
 
@@ -167,53 +180,88 @@ def _rule_based_override(
     d = _normalize_for_match(description)
     if not d:
         return None
-    d_squashed = _squash(d)
-
-    groceries_kw = {"migros", "coop", "aldi", "lidl", "denner"}
-    takeaway_kw = {
-        "take away",
-        "takeaway",
-        "delivery",
-        "liefer",
-        "lieferung",
-        "imbiss",
-        "doner",
-        "kebab",
-        "duner",
-        "doener",
-    }
-    restaurant_kw = {"restaurant", "cafe", "bar", "bistro"}
-    fastfood_squashed = {"mcdonalds", "mcd"}
-
-    if any(k in d for k in groceries_kw):
-        cid = _find_leaf_by_name(categories, ["Groceries"])
-        if cid is not None:
-            return CategorySuggestion(category_id=cid, score=1.0, best_category_id=cid, margin=1.0)
-
-    if any(k in d for k in takeaway_kw) or any(k in d_squashed for k in fastfood_squashed):
-        cid = _find_leaf_by_name(categories, ["Takeaway & Delivery", "Restaurants & Cafés", "Restaurants & Cafes"])
-        if cid is not None:
-            return CategorySuggestion(category_id=cid, score=1.0, best_category_id=cid, margin=1.0)
 
-    if any(k in d for k in restaurant_kw):
-        cid = _find_leaf_by_name(categories, ["Restaurants & Cafés", "Restaurants & Cafes", "Takeaway & Delivery"])
+    for rule in _get_keyword_rules().match_overrides(d, _squash(d)):
+        cid = _find_leaf_by_name(categories, rule.targets)
         if cid is not None:
             return CategorySuggestion(category_id=cid, score=1.0, best_category_id=cid, margin=1.0)
 
     return None
 
 
-_model: Optional[SentenceTransformer] = None
+_model: Optional[EmbeddingBackend] = None
+_model_lock = threading.Lock()
 
 
-def _get_model() -> SentenceTransformer:
+def _get_model() -> EmbeddingBackend:
     global _model
     if _model is None:
-        model_name = os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
-        _model = SentenceTransformer(model_name)
+        # The startup warm-up and the first request may race for the model.
+        with _model_lock:
+            if _model is None:
+                _model = load_embedding_backend(_get_backend_name(), _get_model_name())
     return _model
 
 
+model_registry.register("categorizer", _get_model)
+
+
+def _get_model_name() -> str:
+    return os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+
+def _get_backend_name() -> str:
+    # sentence-transformers (fp32, default) | quantized (torch dynamic int8) | onnx
+    return os.getenv("EMBEDDING_BACKEND", "sentence-transformers").strip().lower()
+
+
+def _embedding_key() -> str:
+    # Backends produce slightly different vectors, so caches are keyed by both;
+    # for ONNX also by the file in use (fp32 and int8 exports differ as well).
+    backend = _get_backend_name()
+    if backend == BACKEND_ONNX:
+        return f"{_get_model_name()}|{backend}|{onnx_model_path().name}"
+    return f"{_get_model_name()}|{backend}"
+
+
+def _encode(texts: Sequence[str]) -> np.ndarray:
+    # Backends return normalized embeddings -> cosine similarity equals dot product
+    return _get_model().encode(list(texts))
+
+
+_description_store: Optional[DescriptionEmbeddingStore] = None
+_description_store_lock = threading.Lock()
+
+
+def get_description_store() -> DescriptionEmbeddingStore:
+    global _description_store
+    if _description_store is None:
+        with _description_store_lock:
+            if _description_store is None:
+                path = os.getenv("EMBEDDING_STORE_PATH", str(DEFAULT_EMBEDDING_STORE_PATH))
+                _description_store = DescriptionEmbeddingStore(
+                    Path(path) if path else None,
+                    max_entries=int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", "100000")),
+                    lru_size=int(os.getenv("EMBEDDING_LRU_SIZE", "4096")),
+                )
+    return _description_store
+
+
+def _description_key(text: str) -> str:
+    """Store key for a description: NFC with collapsed whitespace, letters and case intact.
+
+    The key is also the text that gets encoded, so a vector never depends on which
+    spelling of a description happened to be stored first.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _encode_descriptions(texts: Sequence[str]) -> np.ndarray:
+    # Bank feeds repeat the same merchants over and over; reuse their vectors.
+    keys = [_description_key(t) for t in texts]
+    return get_description_store().get_many(f"{_embedding_key()}|text", keys, keys, _encode)
+
+
 def _normalize(text: Optional[str]) -> str:
     return (text or "").strip()
 
@@ -259,6 +307,77 @@ def build_category_label_text(candidate: CategoryCandidate, by_id: dict[int, Cat
     return description if description else candidate.name
 
 
+def category_fingerprint(categories: Sequence[CategoryCandidate]) -> str:
+    """Stable hash over everything that influences category label embeddings."""
+    rows = sorted(
+        (c.id, c.name or "", c.description or "", c.parent_id if c.parent_id is not None else -1)
+        for c in categories
+    )
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class CategoryEmbeddingCache:
+    """In-process cache of category label embeddings.
+
+    Entries are keyed by user id and hold the embeddings for the most recent category
+    fingerprint of that user, so stale category sets are replaced instead of piling up.
+    `CategoryRepository` invalidates a user's entry whenever categories change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[Optional[int], tuple[str, dict[int, np.ndarray]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        user_id: Optional[int],
+        categories: Sequence[CategoryCandidate],
+        scored: Sequence[CategoryCandidate],
+        encode: Callable[[Sequence[str]], np.ndarray],
+    ) -> dict[int, np.ndarray]:
+        """Return {category_id: normalized label embedding} covering `scored`.
+
+        `categories` is the user's full set (it keys the entry and provides parent paths);
+        only the `scored` ones are encoded, missing ones are added to the cached entry.
+        """
+        key = f"{_embedding_key()}:{category_fingerprint(categories)}"
+        with self._lock:
+            entry = self._entries.get(user_id)
+            cached = entry[1] if entry is not None and entry[0] == key else {}
+            missing = list({c.id: c for c in scored if c.id not in cached}.values())
+            if not missing:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        by_id = {c.id: c for c in categories}
+        embeddings = encode([build_category_label_text(c, by_id) for c in missing])
+        by_category = {**cached, **{c.id: emb for c, emb in zip(missing, embeddings)}}
+
+        with self._lock:
+            self._entries[user_id] = (key, by_category)
+        return by_category
+
+    def invalidate_user(self, user_id: Optional[int]) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "users": len(self._entries)}
+
+
+category_embedding_cache = CategoryEmbeddingCache()
+
+
 def suggest_category_for_transaction(
     *,
     categories: Sequence[CategoryCandidate],
@@ -266,6 +385,7 @@ def suggest_category_for_transaction(
     amount_cents: int,
     currency_code: Optional[str] = None,
     threshold: float = DEFAULT_AUTO_THRESHOLD,
+    user_id: Optional[int] = None,
 ) -> CategorySuggestion:
     text = build_transaction_text(description, amount_cents, currency_code)
     if not text:
@@ -284,15 +404,12 @@ def suggest_category_for_transaction(
     if override is not None:
         return override
 
-    by_id = {c.id: c for c in filtered}
     leaves = _leaf_categories(filtered)
 
-    label_texts = [build_category_label_text(c, by_id) for c in leaves]
-
-    model = _get_model()
-    # encode with normalization -> cosine similarity equals dot product
-    label_embeddings = model.encode(label_texts, normalize_embeddings=True)
-    tx_embedding = model.encode([text], normalize_embeddings=True)[0]
+    # Label embeddings are computed once per user/category set and reused across calls.
+    embeddings_by_id = category_embedding_cache.get(user_id, categories, leaves, _encode)
+    label_embeddings = [embeddings_by_id[c.id] for c in leaves]
+    tx_embedding = _encode_descriptions([text])[0]
 
     # dot product for normalized vectors
     best_idx = -1
@@ -323,6 +440,7 @@ def suggest_categories_batch(
     amount_cents_list: Sequence[int],
     currency_codes: Optional[Sequence[Optional[str]]] = None,
     threshold: float = DEFAULT_AUTO_THRESHOLD,
+    user_id: Optional[int] = None,
 ) -> List[CategorySuggestion]:
     if currency_codes is None:
         currency_codes = [None] * len(descriptions)
@@ -330,23 +448,100 @@ def suggest_categories_batch(
     if len(descriptions) != len(amount_cents_list) or len(descriptions) != len(currency_codes):
         raise ValueError("Batch inputs must have the same length")
 
-    # Per-transaction filtering by amount type; for simplicity with small category sets,
-    # we run the single-item implementation per tx.
-    suggestions: List[CategorySuggestion] = []
-    for desc, amt, cur in zip(descriptions, amount_cents_list, currency_codes):
-        suggestions.append(
-            suggest_category_for_transaction(
-                categories=categories,
-                description=desc,
-                amount_cents=amt,
-                currency_code=cur,
-                threshold=threshold,
-            )
-        )
+    empty = CategorySuggestion(category_id=None, score=0.0, best_category_id=None, margin=0.0)
+    suggestions: List[CategorySuggestion] = [empty] * len(descriptions)
+    if not categories:
+        return suggestions
+
+    # Same pre-filtering as the single-item path. Items that survive it are grouped by
+    # their candidate subset (amount sign x keyword hints), so each group shares one
+    # label matrix and is scored with a single matrix product.
+    by_sign = {sign: _candidates_for_amount(categories, sign) for sign in (-1, 0, 1)}
+    groups: dict[tuple[int, ...], tuple[List[CategoryCandidate], List[int]]] = {}
+    texts: List[str] = []
+    row_by_index: dict[int, int] = {}
+
+    for idx, (desc, amt, cur) in enumerate(zip(descriptions, amount_cents_list, currency_codes)):
+        text = build_transaction_text(desc, amt, cur)
+        if not text:
+            continue
+
+        filtered = by_sign[(amt > 0) - (amt < 0)]
+        if not filtered:
+            continue
+
+        filtered = _apply_keyword_hints(filtered, desc)
+
+        override = _rule_based_override(filtered, desc)
+        if override is not None:
+            suggestions[idx] = override
+            continue
+
+        key = tuple(c.id for c in filtered)
+        groups.setdefault(key, (filtered, []))[1].append(idx)
+        row_by_index[idx] = len(texts)
+        texts.append(text)
+
+    if not texts:
+        return suggestions
+
+    leaves_by_group = [(_leaf_categories(filtered), indices) for filtered, indices in groups.values()]
+    embeddings_by_id = category_embedding_cache.get(
+        user_id, categories, [c for leaves, _ in leaves_by_group for c in leaves], _encode
+    )
+    tx_matrix = _encode_descriptions(texts)
+
+    for leaves, indices in leaves_by_group:
+        label_matrix = np.stack([embeddings_by_id[c.id] for c in leaves])
+        scores = tx_matrix[[row_by_index[i] for i in indices]] @ label_matrix.T
+        for idx, suggestion in zip(indices, _best_matches(scores, leaves, threshold)):
+            suggestions[idx] = suggestion
 
     return suggestions
 
 
+def _best_matches(
+    scores: np.ndarray,
+    leaves: Sequence[CategoryCandidate],
+    threshold: float,
+) -> List[CategorySuggestion]:
+    """Vectorized equivalent of the best/second-best scan in `suggest_category_for_transaction`.
+
+    `scores` has one row per transaction and one column per leaf.
+    """
+    n_items, n_leaves = scores.shape
+    # argmax returns the first maximum, matching the strict `>` of the scalar loop.
+    best_idx = np.argmax(scores, axis=1)
+    best_scores = scores[np.arange(n_items), best_idx]
+    if n_leaves > 1:
+        top2 = np.argpartition(scores, n_leaves - 2, axis=1)[:, n_leaves - 2:]
+        second_scores = np.take_along_axis(scores, top2, axis=1).min(axis=1)
+        # The scalar loop starts at -1.0 and only tracks scores above it.
+        second_scores = np.maximum(second_scores, -1.0)
+    else:
+        second_scores = np.full(n_items, -1.0)
+
+    out: List[CategorySuggestion] = []
+    for i in range(n_items):
+        best_score = float(best_scores[i])
+        if not best_score > -1.0:
+            out.append(CategorySuggestion(category_id=None, score=0.0, best_category_id=None, margin=0.0))
+            continue
+        second_best_score = float(second_scores[i])
+        best_category_id = leaves[int(best_idx[i])].id
+        category_id = best_category_id if best_score >= threshold else None
+        margin = (best_score - second_best_score) if second_best_score >= 0 else best_score
+        out.append(
+            CategorySuggestion(
+                category_id=category_id,
+                score=best_score,
+                best_category_id=best_category_id,
+                margin=margin,
+            )
+        )
+    return out
+
+
 def _strip_code_fences(text: str) -> str:
     text = (text or "").strip()
     if text.startswith("```json"):
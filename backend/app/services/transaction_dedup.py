@@ -0,0 +1,70 @@
+import hashlib
+import logging
+import threading
+from datetime import date, datetime
+from typing import Callable, Optional
+
+from services.transaction_categorizer import _normalize_for_match
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def transaction_fingerprint(account_id: int, day: date, amount_cents: int, description: Optional[str]) -> str:
+    """Identifies "the same booking" across imports and manual entries.
+
+    The description is normalized (case, diacritics, punctuation, whitespace), so exports
+    of one statement from different tools produce the same fingerprint.
+    """
+    key = f"{account_id}|{day.isoformat()}|{amount_cents}|{_normalize_for_match(description)}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+class DedupReportRunner:
+    """Builds duplicate reports for existing transactions in a background thread.
+
+    One report per user is kept in memory; starting a new one while the previous is still
+    running returns the running one. `run` receives a progress callback and returns the
+    final report fields; it must open its own database session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reports: dict[int, dict] = {}
+
+    def start(self, user_id: int, run: Callable[[Callable[..., None]], dict]) -> dict:
+        with self._lock:
+            report = self._reports.get(user_id)
+            if report is not None and report["status"] == STATUS_RUNNING:
+                return dict(report)
+            report = {"status": STATUS_RUNNING, "started_at": datetime.utcnow().isoformat()}
+            self._reports[user_id] = report
+
+        thread = threading.Thread(
+            target=self._execute, args=(user_id, report, run), name=f"dedup-report-{user_id}", daemon=True
+        )
+        thread.start()
+        return dict(report)
+
+    def get(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            report = self._reports.get(user_id)
+            return dict(report) if report is not None else None
+
+    def _execute(self, user_id: int, report: dict, run: Callable[[Callable[..., None]], dict]) -> None:
+        def progress(**fields):
+            with self._lock:
+                report.update(fields)
+
+        try:
+            fields = {**run(progress), "status": STATUS_DONE}
+        except Exception as e:
+            logger.error(f"Duplicate report for user {user_id} failed: {e}")
+            fields = {"status": STATUS_FAILED, "error": str(e)}
+        progress(**fields, finished_at=datetime.utcnow().isoformat())
+
+
+dedup_reports = DedupReportRunner()
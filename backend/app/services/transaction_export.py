@@ -0,0 +1,159 @@
+"""Streaming writers for transaction exports (CSV, NDJSON, Parquet).
+
+Each writer consumes an iterator of rows in `EXPORT_COLUMNS` order and yields encoded
+chunks, so an export is never built in memory as a whole.
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterable, Iterator
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMAT_PARQUET = "parquet"
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON, FORMAT_PARQUET)
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = (
+    "id", "date", "account_id", "category_id", "description", "amount_cents", "currency_code", "created_at", "tags",
+)
+_TAGS = EXPORT_COLUMNS.index("tags")
+
+# Rows per yielded chunk (and per Parquet row group).
+DEFAULT_CHUNK_ROWS = 1000
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_export(rows: Iterable[tuple], fmt: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+    if fmt == FORMAT_CSV:
+        return iter_csv(rows, chunk_rows)
+    if fmt == FORMAT_NDJSON:
+        return iter_ndjson(rows, chunk_rows)
+    if fmt == FORMAT_PARQUET:
+        return iter_parquet(rows, chunk_rows)
+    raise ValueError(f"unknown export format '{fmt}'")
+
+
+def iter_csv(rows: Iterable[tuple], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        row = list(row)
+        row[_TAGS] = "|".join(row[_TAGS])
+        writer.writerow(row)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_ndjson(rows: Iterable[tuple], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=_json_default))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _DrainableSink:
+    """Append-only file object for ParquetWriter whose written bytes can be taken out.
+
+    `tell()` keeps counting across drains, so the offsets Parquet records in the
+    footer stay correct while only one row group is buffered at a time.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_parquet(rows: Iterable[tuple], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("date", pa.date32()),
+        ("account_id", pa.int64()),
+        ("category_id", pa.int64()),
+        ("description", pa.string()),
+        ("amount_cents", pa.int64()),
+        ("currency_code", pa.string()),
+        ("created_at", pa.string()),
+        ("tags", pa.list_(pa.string())),
+    ])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def write(batch: list[tuple]) -> bytes:
+        columns = list(zip(*batch))
+        writer.write_batch(pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+        ))
+        return sink.drain()
+
+    try:
+        batch = []
+        for row in rows:
+            batch.append(tuple(row))
+            if len(batch) >= chunk_rows:
+                yield write(batch)
+                batch = []
+        if batch:
+            yield write(batch)
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,24 @@
+"""Shared fixtures for the categorizer benchmarks."""
+
+from services.standard_categories import STANDARD_CATEGORIES
+from services.transaction_categorizer import CategoryCandidate
+
+SAMPLE_DESCRIPTIONS = [
+    "Migros", "Coop Pronto", "SBB CFF FFS", "TWINT an Max Muster", "Döner Kebab Haus",
+    "McDonald's", "Swisscom Rechnung", "Miete Januar", "Lohn", "Zalando", "Netflix",
+    "Kontoführungsgebühr", "Steuern Kanton Zürich", "Apotheke", "Spotify", "Denner",
+    "Restaurant Bären", "Krankenkasse CSS", "Tankstelle Shell", "Galaxus", "",
+]
+
+
+def build_candidates() -> list[CategoryCandidate]:
+    candidates: list[CategoryCandidate] = []
+    next_id = 1
+    for entry in STANDARD_CATEGORIES:
+        parent_id = next_id
+        candidates.append(CategoryCandidate(parent_id, entry["name"], entry["type"], None, None))
+        next_id += 1
+        for sub in entry.get("subcategories", []):
+            candidates.append(CategoryCandidate(next_id, str(sub), entry["type"], parent_id, None))
+            next_id += 1
+    return candidates
@@ -0,0 +1,62 @@
+"""
+Timing of the vectorized batch categorizer with the real embedding model.
+
+Runs the same synthetic batch through `suggest_category_for_transaction` (one call per
+item) and `suggest_categories_batch` (one encode + matrix scoring). Parity of both paths
+is covered by tests/test_categorizer_batch.py.
+
+Ausführen mit: python benchmarks/categorizer_batch.py [--items 500]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from benchmarks_common import SAMPLE_DESCRIPTIONS, build_candidates
+from services.transaction_categorizer import (
+    suggest_categories_batch,
+    suggest_category_for_transaction,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    candidates = build_candidates()
+    descriptions = [rng.choice(SAMPLE_DESCRIPTIONS) for _ in range(args.items)]
+    amounts = [rng.choice([-1, -1, -1, 1, 0]) * rng.randint(100, 50000) for _ in range(args.items)]
+
+    # Warm model and category embedding cache so both paths are measured hot.
+    suggest_category_for_transaction(categories=candidates, description="warmup", amount_cents=-100)
+
+    start = time.perf_counter()
+    for d, a in zip(descriptions, amounts):
+        suggest_category_for_transaction(categories=candidates, description=d, amount_cents=a)
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    suggest_categories_batch(
+        categories=candidates,
+        descriptions=descriptions,
+        amount_cents_list=amounts,
+    )
+    batch_s = time.perf_counter() - start
+
+    print(f"Items:       {args.items}")
+    print(f"Per-item:    {single_s:.3f}s ({single_s / args.items * 1000:.2f} ms/item)")
+    print(f"Batch:       {batch_s:.3f}s ({batch_s / args.items * 1000:.2f} ms/item)")
+    print(f"Speedup:     {single_s / batch_s:.1f}x" if batch_s else "Speedup: n/a")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""In-memory SQLite fixtures for the repository benchmarks and query-count checks."""
+
+import warnings
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SAWarning
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  registriert alle Tabellen in Base.metadata
+import models.ai_insights  # noqa: F401
+from data_access.data_access import Base
+from models.user import User
+
+# Die überlappenden Tag-Relationships warnen bei jedem Mapper-Setup; für Messungen irrelevant.
+warnings.filterwarnings("ignore", category=SAWarning)
+
+
+def memory_session() -> Session:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+
+
+def make_user(db: Session, email: str = "bench@example.com") -> User:
+    user = User(email=email, name="Bench")
+    db.add(user)
+    db.commit()
+    return user
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+
+@contextmanager
+def count_statements(db: Session):
+    """Counts SQL statements executed on the session's engine inside the block."""
+    counter = StatementCounter()
+    engine = db.get_bind()
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.count += 1
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
@@ -0,0 +1,113 @@
+"""
+Compares the categorizer embedding backends (EMBEDDING_BACKEND) against the fp32
+sentence-transformers reference: load time, per-call latency, peak RSS and top-1
+category agreement.
+
+Each backend runs in its own subprocess so RSS numbers are not mixed up.
+
+Ausführen mit: python benchmarks/embedding_backends.py [--backends sentence-transformers,quantized,onnx]
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from benchmarks_common import SAMPLE_DESCRIPTIONS, build_candidates
+
+REFERENCE = "sentence-transformers"
+
+
+def measure(backend_name: str, repeats: int) -> dict:
+    from services.embedding_backends import load_embedding_backend
+    from services.transaction_categorizer import (
+        _get_model_name,
+        _leaf_categories,
+        build_category_label_text,
+    )
+
+    start = time.perf_counter()
+    backend = load_embedding_backend(backend_name, _get_model_name())
+    load_s = time.perf_counter() - start
+
+    candidates = build_candidates()
+    by_id = {c.id: c for c in candidates}
+    leaves = _leaf_categories(candidates)
+    descriptions = [d for d in SAMPLE_DESCRIPTIONS if d]
+
+    label_matrix = backend.encode([build_category_label_text(c, by_id) for c in leaves])
+
+    # Single-description latency, as paid by POST /transaction/.
+    latencies = []
+    for _ in range(repeats):
+        for d in descriptions:
+            t0 = time.perf_counter()
+            backend.encode([d])
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    scores = backend.encode(descriptions) @ label_matrix.T
+    top1 = [leaves[int(i)].id for i in scores.argmax(axis=1)]
+
+    latencies.sort()
+    return {
+        "backend": backend_name,
+        "load_s": load_s,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "top1": top1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="sentence-transformers,quantized,onnx")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.repeats)))
+        return
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if REFERENCE not in backends:
+        backends.insert(0, REFERENCE)
+
+    results = {}
+    for name in backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", name, "--repeats", str(args.repeats)],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        if proc.returncode != 0:
+            print(f"❌ {name}: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}")
+            continue
+        results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    reference = results.get(REFERENCE)
+    print(f"{'backend':<22}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}{'top-1':>8}")
+    for name, r in results.items():
+        agreement = "n/a"
+        if reference:
+            same = sum(a == b for a, b in zip(r["top1"], reference["top1"]))
+            agreement = f"{same / len(reference['top1']):.0%}"
+        print(
+            f"{name:<22}{r['load_s']:>8.2f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+            f"{r['peak_rss_mb']:>9.0f}{agreement:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Micro-benchmark for the categorizer keyword heuristics.
+
+Compares the previous per-call set scans (reproduced below as `legacy_*`) with the
+compiled rule table used by `_apply_keyword_hints` / `_rule_based_override`, and reports
+how often both agree.
+
+Ausführen mit: python benchmarks/keyword_rules.py [--rounds 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from benchmarks_common import SAMPLE_DESCRIPTIONS, build_candidates
+from services.transaction_categorizer import (
+    _apply_keyword_hints,
+    _build_category_path,
+    _leaf_categories,
+    _normalize_for_match,
+    _rule_based_override,
+    _squash,
+)
+
+
+def legacy_has_ancestor_named(candidate, by_id, names):
+    cur = candidate
+    while cur.parent_id and cur.parent_id in by_id:
+        parent = by_id[cur.parent_id]
+        if parent.name.lower() in names:
+            return True
+        cur = parent
+    return False
+
+
+def legacy_apply_keyword_hints(candidates, description):
+    d = _normalize_for_match(description)
+    if not d:
+        return list(candidates)
+    d_squashed = _squash(d)
+    by_id = {c.id: c for c in candidates}
+    food_keywords = {
+        "doner", "kebab", "pizza", "burger", "restaurant", "cafe", "bar",
+        "takeaway", "take away", "delivery", "liefer", "lieferung", "imbiss", "bistro",
+    }
+    food_squashed_keywords = {"takeaway", "mcdonalds", "mcd"}
+    groceries_keywords = {"migros", "coop", "aldi", "lidl", "denner"}
+    finance_keywords = {
+        "bank", "gebühr", "gebuehr", "fee", "fees", "zins", "interest", "tax", "taxes", "steuer", "charges",
+    }
+    food_names = {"food & drinks", "groceries", "restaurants & cafés", "restaurants & cafes", "takeaway & delivery"}
+    finance_names = {"finance", "bank fees", "interest & charges", "taxes"}
+    if (
+        any(k in d for k in food_keywords)
+        or any(k in d for k in groceries_keywords)
+        or any(k in d_squashed for k in food_squashed_keywords)
+    ):
+        food = [
+            c for c in candidates
+            if (c.name or '').lower() in food_names or legacy_has_ancestor_named(c, by_id, {"food & drinks"})
+        ]
+        return food if food else list(candidates)
+    if any(k in d for k in finance_keywords):
+        fin = [
+            c for c in candidates
+            if (c.name or '').lower() in finance_names or legacy_has_ancestor_named(c, by_id, {"finance"})
+        ]
+        return fin if fin else list(candidates)
+    return list(candidates)
+
+
+def legacy_find_leaf_by_name(categories, target_names):
+    if not categories:
+        return None
+    by_id = {c.id: c for c in categories}
+    leaves = _leaf_categories(list(categories))
+    wanted = {_normalize_for_match(n) for n in target_names if (n or '').strip()}
+    for c in leaves:
+        if _normalize_for_match(c.name) in wanted:
+            return c.id
+    for c in leaves:
+        if _normalize_for_match(_build_category_path(c, by_id)) in wanted:
+            return c.id
+    return None
+
+
+def legacy_rule_based_override(categories, description):
+    d = _normalize_for_match(description)
+    if not d:
+        return None
+    d_squashed = _squash(d)
+    groceries_kw = {"migros", "coop", "aldi", "lidl", "denner"}
+    takeaway_kw = {
+        "take away", "takeaway", "delivery", "liefer", "lieferung", "imbiss",
+        "doner", "kebab", "duner", "doener",
+    }
+    restaurant_kw = {"restaurant", "cafe", "bar", "bistro"}
+    fastfood_squashed = {"mcdonalds", "mcd"}
+    if any(k in d for k in groceries_kw):
+        cid = legacy_find_leaf_by_name(categories, ["Groceries"])
+        if cid is not None:
+            return cid
+    if any(k in d for k in takeaway_kw) or any(k in d_squashed for k in fastfood_squashed):
+        cid = legacy_find_leaf_by_name(categories, ["Takeaway & Delivery", "Restaurants & Cafés", "Restaurants & Cafes"])
+        if cid is not None:
+            return cid
+    if any(k in d for k in restaurant_kw):
+        cid = legacy_find_leaf_by_name(categories, ["Restaurants & Cafés", "Restaurants & Cafes", "Takeaway & Delivery"])
+        if cid is not None:
+            return cid
+    return None
+
+
+def run(fn, candidates, descriptions, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for d in descriptions:
+            fn(candidates, d)
+    return (time.perf_counter() - start) / (rounds * len(descriptions))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    candidates = build_candidates()
+    descriptions = SAMPLE_DESCRIPTIONS
+
+    def legacy(c, d):
+        return legacy_rule_based_override(legacy_apply_keyword_hints(c, d), d)
+
+    def compiled(c, d):
+        return _rule_based_override(_apply_keyword_hints(c, d), d)
+
+    disagreements = 0
+    for d in descriptions:
+        old = legacy(candidates, d)
+        new = compiled(candidates, d)
+        new = new.category_id if new is not None else None
+        if old != new:
+            disagreements += 1
+            print(f"≠ {d!r}: legacy={old} compiled={new}")
+
+    legacy_s = run(legacy, candidates, descriptions, args.rounds)
+    compiled_s = run(compiled, candidates, descriptions, args.rounds)
+    print(f"Descriptions:  {len(descriptions)} x {args.rounds} rounds")
+    print(f"Legacy:        {legacy_s * 1e6:.2f} µs/description")
+    print(f"Compiled:      {compiled_s * 1e6:.2f} µs/description")
+    print(f"Speedup:       {legacy_s / compiled_s:.1f}x")
+    print(f"Disagreements: {disagreements}")
+
+
+if __name__ == "__main__":
+    main()
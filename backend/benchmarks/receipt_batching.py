@@ -0,0 +1,57 @@
+"""
+Throughput of Donut receipt inference (receipts/sec) for different batch sizes.
+
+Pre-processes test receipts once, then times `ReceiptScanner.generate_batch` on stacked
+pixel values, i.e. exactly what the micro-batcher (RECEIPT_SCAN_BATCH_SIZE) runs.
+
+Ausführen mit: python benchmarks/receipt_batching.py [--batch-sizes 1,2,4,8] [--images 16] [--profile accurate]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+import torch
+
+from services.receipt_scanner import DECODING_PROFILES, scanner
+
+TEST_IMAGE_DIR = Path(__file__).resolve().parent.parent / "ai_models" / "data" / "test" / "images"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", default="1,2,4,8")
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--profile", default="accurate", choices=list(DECODING_PROFILES))
+    args = parser.parse_args()
+
+    scanner.ensure_loaded()
+    paths = sorted(p for p in TEST_IMAGE_DIR.iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png"})
+    paths = paths[: args.images]
+    profile = DECODING_PROFILES[args.profile]
+    print(f"📷 {len(paths)} Testbilder, Profil {profile}")
+
+    pixel_values = [
+        scanner._preprocess(scanner._load_image(p.read_bytes(), p.name))
+        for p in paths
+    ]
+
+    # Warm-up, damit Lazy-Init nicht mitgemessen wird
+    scanner.generate_batch(pixel_values[0], profile)
+
+    print(f"{'batch':>6}{'seconds':>10}{'receipts/s':>12}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        start = time.perf_counter()
+        for i in range(0, len(pixel_values), batch_size):
+            scanner.generate_batch(torch.cat(pixel_values[i:i + batch_size]), profile)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>6}{elapsed:>10.1f}{len(pixel_values) / elapsed:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Receipt creation with many line items: previous per-item add/flush + tag query
+(reproduced below as `legacy_create_receipt`) versus the bulk path of
+`ReceiptRepository.create_receipt`. Reports SQL statements and milliseconds for
+10/100/1000 items on an in-memory SQLite database.
+
+Ausführen mit: python benchmarks/receipt_bulk_insert.py [--sizes 10,100,1000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from db_fixtures import count_statements, make_user, memory_session
+from models.receipt import Receipt, ReceiptLineItem
+from models.tag import ReceiptLineItemTag, Tag
+from repository.receipt import ReceiptRepository
+from repository.tag import TagRepository
+from schemas.receipt import ReceiptCreate
+from schemas.receipt_line_item import ReceiptLineItemCreate
+
+
+def legacy_create_receipt(db, current_user, receipt_create):
+    new_receipt = Receipt(
+        user_id=current_user.id,
+        purchase_date=receipt_create.purchase_date,
+        total_cents=receipt_create.total_cents,
+    )
+    db.add(new_receipt)
+    db.commit()
+    db.refresh(new_receipt)
+
+    tag_repo = TagRepository(db)
+    for item in receipt_create.line_items:
+        line_item = ReceiptLineItem(
+            receipt_id=new_receipt.id,
+            product_name=item.product_name,
+            quantity=item.quantity,
+            unit_price_cents=item.unit_price_cents,
+            total_price_cents=item.total_price_cents
+        )
+        db.add(line_item)
+        db.flush()
+        if item.tags:
+            for tag in tag_repo.internal_get_tags_by_id(current_user, item.tags):
+                db.add(ReceiptLineItemTag(line_item_id=line_item.id, tag_id=tag.id))
+    db.commit()
+    db.refresh(new_receipt)
+    return new_receipt.to_response()
+
+
+def build_receipt(size: int, tag_ids: list[int]) -> ReceiptCreate:
+    return ReceiptCreate(
+        purchase_date="2024-01-01",
+        total_cents=size * 250,
+        line_items=[
+            ReceiptLineItemCreate(
+                product_name=f"Artikel {i}",
+                unit_price_cents=250,
+                total_price_cents=250,
+                tags=[tag_ids[i % len(tag_ids)]] if i % 2 == 0 else [],
+            )
+            for i in range(size)
+        ],
+    )
+
+
+def run(variant: str, size: int) -> tuple[int, float, int]:
+    db = memory_session()
+    user = make_user(db)
+    tags = [Tag(user_id=user.id, name=f"tag-{i}", color="#888888") for i in range(5)]
+    db.add_all(tags)
+    db.commit()
+    receipt_create = build_receipt(size, [t.id for t in tags])
+
+    with count_statements(db) as counter:
+        start = time.perf_counter()
+        if variant == "legacy":
+            response = legacy_create_receipt(db, user, receipt_create)
+        else:
+            response = ReceiptRepository(db).create_receipt(user, receipt_create)
+        elapsed = (time.perf_counter() - start) * 1000
+    tagged = sum(len(item.tags) for item in response.line_items)
+    assert len(response.line_items) == size and tagged == (size + 1) // 2
+    return counter.count, elapsed, tagged
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,100,1000")
+    args = parser.parse_args()
+
+    print(f"{'items':>6}{'legacy stmts':>14}{'legacy ms':>11}{'bulk stmts':>12}{'bulk ms':>9}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        legacy_stmts, legacy_ms, _ = run("legacy", size)
+        bulk_stmts, bulk_ms, _ = run("bulk", size)
+        print(f"{size:>6}{legacy_stmts:>14}{legacy_ms:>11.1f}{bulk_stmts:>12}{bulk_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
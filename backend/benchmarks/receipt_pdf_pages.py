@@ -0,0 +1,53 @@
+"""
+Multi-page PDF scanning: per-page progress, total time and peak RSS of
+`ReceiptScanner.scan_document` for a given PDF.
+
+Peak RSS should stay roughly flat with growing page count, because pages are rendered
+and decoded in batches of RECEIPT_SCAN_PDF_PAGE_BATCH instead of all at once.
+
+Ausführen mit: python benchmarks/receipt_pdf_pages.py rechnung.pdf [--profile fast]
+"""
+
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from services.receipt_scanner import DECODING_PROFILES, scanner
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdf", type=Path)
+    parser.add_argument("--profile", default="fast", choices=list(DECODING_PROFILES))
+    args = parser.parse_args()
+
+    scanner.ensure_loaded()
+    print(f"📦 Modell geladen, Peak-RSS {peak_rss_mb():.0f} MB")
+
+    start = time.perf_counter()
+
+    def progress(done: int, total: int):
+        print(f"   Seite {done}/{total} nach {time.perf_counter() - start:.1f}s, Peak-RSS {peak_rss_mb():.0f} MB")
+
+    result = scanner.scan_document(args.pdf.read_bytes(), args.pdf.name, DECODING_PROFILES[args.profile], progress)
+    if "error" in result:
+        print(f"❌ {result['error']}")
+        return
+    print(
+        f"✅ {result.get('pages', 1)} Seiten in {time.perf_counter() - start:.1f}s: "
+        f"{len(result['items'])} Positionen, Total {result['total']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
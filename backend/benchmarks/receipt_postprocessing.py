@@ -0,0 +1,317 @@
+"""
+Micro-benchmark for the receipt post-processing (CORD-v2 -> our receipt format).
+
+Compares the previous `ReceiptScanner` methods with per-pattern `re.search` loops and the
+O(n²) duplicate scan (reproduced below as `LegacyPostProcessor`) with the compiled
+`convert_cord_to_custom`, and checks that both produce identical results.
+
+Input are recorded Donut outputs: a JSONL file with one CORD dict per line (e.g. collected
+from `ReceiptScanner.extract_cord`). Without --recorded, CORD dicts are built from the
+labelled test split.
+
+Ausführen mit: python benchmarks/receipt_postprocessing.py [--recorded outputs.jsonl] [--rounds 200]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from receipt_testset import load_test_set
+from services.receipt_postprocessing import convert_cord_to_custom
+
+
+class LegacyPostProcessor:
+    def _is_valid_price(self, price_str: str) -> bool:
+        if not price_str:
+            return False
+        cleaned = str(price_str).replace("$", "").replace(",", ".").strip()
+        try:
+            val = float(cleaned)
+            return val >= 0 and val < 10000
+        except:
+            return False
+
+    def _clean_price(self, price_str: str) -> str:
+        if not price_str:
+            return "0.00"
+        cleaned = str(price_str).replace("$", "").replace(",", ".").strip()
+        try:
+            return f"{float(cleaned):.2f}"
+        except:
+            return "0.00"
+
+    def _is_header_info(self, name: str) -> bool:
+        if not name:
+            return False
+        name_lower = name.lower()
+        
+        header_patterns = [
+            r'^\d+\s+\w+\s+(st|street|rd|road|ave|avenue|blvd|dr|drive)',
+            r'tel[:\s]', r'phone', r'^server[:\s]', r'^order\s*#', r'^order#',
+            r'^guest', r'^reprint', r'^reg\s*$', r'^\d{5}$',
+            r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}', r'^for a chance', r'^see back',
+            r'ca\.\s*\d{5}', r'^south\s+gate', r'^lewnette',
+            r'^no sour cream$', r'^no cheese$', r'^khere$',
+            r'^waiter\s+\d+', r'^table\s+\d+', r'^check\s*#',
+            r'^qty.*name', r'^\w+,\s*(ca|ny|tx|fl)', r'^p\s*a\s*i\s*d',
+            r'^hermosa\s+beach', r'^serv\.?charge',
+        ]
+        
+        for pattern in header_patterns:
+            if re.search(pattern, name_lower):
+                return True
+        return False
+
+    def _is_likely_menu_item(self, name: str, price: str) -> bool:
+        if not name or not self._is_valid_price(price):
+            return False
+        
+        if isinstance(name, list):
+            return False
+        
+        name_str = str(name)
+        name_lower = name_str.lower()
+        
+        try:
+            price_val = float(str(price).replace("$", "").replace(",", ".").strip())
+            if price_val > 500:
+                return False
+        except:
+            pass
+        
+        if re.match(r'^\w+\s+\d{1,2},\s*\d{4}', name_str):
+            return False
+        
+        food_indicators = [
+            r'bowl', r'plate', r'drink', r'coffee', r'tea', r'soda', r'water',
+            r'burger', r'sandwich', r'salad', r'soup', r'pizza', r'pasta',
+            r'chicken', r'beef', r'pork', r'fish', r'shrimp', r'lobster',
+            r'fries', r'rice', r'noodle', r'roll', r'taco', r'burrito',
+            r'cake', r'pie', r'ice cream', r'dessert',
+            r'beer', r'wine', r'margarita', r'cocktail', r'lite', r'light',
+            r'small', r'medium', r'large', r'\(s\)', r'\(m\)', r'\(l\)',
+            r'add\s', r'extra', r'side', r'combo', r'meal', r'special',
+            r'avocado', r'cheese', r'bacon', r'onion', r'lettuce',
+            r'pho', r'sushi', r'curry', r'masala', r'biryani',
+            r'buns', r'pancake', r'dumplings', r'wings',
+            r'sprouts', r'tender', r'grilled', r'vanilla', r'classic',
+            r'mac\s*&?\s*cheese', r'zucchini',
+        ]
+        
+        for pattern in food_indicators:
+            if re.search(pattern, name_lower):
+                return True
+        
+        if self._is_valid_price(price) and not self._is_header_info(name_str):
+            if len(name_str) >= 2 and not name_str.replace(" ", "").isdigit():
+                return True
+        
+        return False
+
+    def _extract_menu_item_from_sub(self, sub_dict: dict) -> list:
+        items = []
+        if not isinstance(sub_dict, dict):
+            return items
+        
+        name = sub_dict.get("nm", "")
+        price = sub_dict.get("price", "")
+        cnt = sub_dict.get("cnt", "")
+        
+        if isinstance(name, str) and self._is_valid_price(str(price)):
+            if not self._is_header_info(name):
+                artikel_name = name.strip()
+                if cnt and str(cnt).isdigit() and int(cnt) > 1:
+                    artikel_name = f"{cnt} {artikel_name}"
+                items.append({
+                    "name": artikel_name,
+                    "price": self._clean_price(str(price)),
+                    "quantity": 1
+                })
+        
+        if "sub" in sub_dict:
+            items.extend(self._extract_menu_item_from_sub(sub_dict["sub"]))
+        
+        return items
+
+    def _convert_to_custom_format(self, cord_output):
+        """Converts CORD-v2 format to our custom format."""
+        custom_data = {
+            "merchant": "",
+            "date": "",
+            "total": "",
+            "currency": "CHF",
+            "items": []
+        }
+
+        if isinstance(cord_output, list):
+            if not cord_output: return custom_data
+            cord_output = cord_output[0]
+        
+        if not isinstance(cord_output, dict):
+            return custom_data
+        
+        found_menu_items = []
+        merchant_candidate = ""
+        
+        menu_items = cord_output.get("menu", [])
+        if isinstance(menu_items, dict):
+            menu_items = [menu_items]
+        
+        for idx, item in enumerate(menu_items):
+            if not isinstance(item, dict): continue
+                
+            name = item.get("nm", "")
+            price = item.get("price", "")
+            cnt = item.get("cnt", "")
+            num = item.get("num", "")
+            
+            if isinstance(name, (dict, list)): continue
+            name = str(name).strip()
+            
+            if not name: continue
+            
+            if num:
+                date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', str(num))
+                if date_match and not custom_data["date"]:
+                    custom_data["date"] = date_match.group(1)
+            
+            if isinstance(price, dict): continue
+            price_str = str(price) if price else ""
+            
+            if idx == 0 and not self._is_valid_price(price_str):
+                merchant_candidate = name
+                continue
+            
+            if self._is_header_info(name): continue
+            
+            if self._is_valid_price(price_str):
+                artikel_name = name
+                if cnt and str(cnt).isdigit() and int(cnt) > 1:
+                    artikel_name = f"{cnt} {artikel_name}"
+                
+                found_menu_items.append({
+                    "name": artikel_name,
+                    "price": self._clean_price(price_str),
+                    "quantity": 1
+                })
+            
+            if "sub" in item:
+                sub_items = self._extract_menu_item_from_sub(item["sub"])
+                found_menu_items.extend(sub_items)
+        
+        total_data = cord_output.get("total", {})
+        if isinstance(total_data, dict):
+            total_price = total_data.get("total_price", "") or total_data.get("cashprice", "")
+        elif isinstance(total_data, list) and total_data:
+            total_price = total_data[0].get("total_price", "") if isinstance(total_data[0], dict) else ""
+        else:
+            total_price = str(total_data) if total_data else ""
+        
+        custom_data["total"] = self._clean_price(total_price)
+        
+        try:
+            total_val = float(custom_data["total"]) if custom_data["total"] else 0
+            if total_val > 10000: custom_data["total"] = ""
+        except: pass
+        
+        sub_total = cord_output.get("sub_total", {})
+        if isinstance(sub_total, dict):
+            if not custom_data["total"] or custom_data["total"] == "0.00":
+                subtotal_price = sub_total.get("subtotal_price", "")
+                if self._is_valid_price(subtotal_price):
+                    custom_data["total"] = self._clean_price(subtotal_price)
+            
+            etc_items = sub_total.get("etc", [])
+            if isinstance(etc_items, list):
+                for etc in etc_items:
+                    if not isinstance(etc, dict): continue
+                    nm = str(etc.get("nm", "")).strip()
+                    price = etc.get("price", "")
+                    cnt = etc.get("cnt", "")
+                    
+                    date_match = re.search(r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', nm)
+                    if date_match and not custom_data["date"]:
+                        custom_data["date"] = date_match.group(1)
+                        continue
+                    
+                    if not merchant_candidate and nm and not nm[0].isdigit():
+                        if not self._is_header_info(nm) and len(nm) > 2:
+                            if not self._is_valid_price(str(price)) or str(price) == nm:
+                                merchant_candidate = nm
+                                continue
+                    
+                    if self._is_valid_price(str(price)) and nm:
+                        if self._is_likely_menu_item(nm, str(price)):
+                            artikel_name = nm
+                            if cnt and str(cnt).isdigit() and int(cnt) > 1:
+                                artikel_name = f"{cnt} {artikel_name}"
+                            
+                            already_exists = any(m["name"].lower() == artikel_name.lower() for m in found_menu_items)
+                            if not already_exists:
+                                found_menu_items.append({
+                                    "name": artikel_name,
+                                    "price": self._clean_price(str(price)),
+                                    "quantity": 1
+                                })
+
+        custom_data["merchant"] = merchant_candidate
+        custom_data["items"] = found_menu_items
+        
+        return custom_data
+
+
+
+def cord_from_ground_truth(truth: dict) -> dict:
+    """CORD-like Donut output for a labelled receipt, incl. header noise and repeated items."""
+    menu = [{"nm": truth.get("merchant", "")}]
+    menu += [{"nm": "Tel: 555-123-4567"}, {"nm": "Server: Anna", "num": truth.get("date", "")}]
+    menu += [{"nm": m.get("Artikel", ""), "price": m.get("Total", ""), "cnt": "1"} for m in truth.get("menu", [])]
+    etc = [{"nm": m.get("Artikel", ""), "price": m.get("Total", "")} for m in truth.get("menu", [])]
+    etc += [{"nm": "Table 12"}, {"nm": "Side Salad", "price": "3.50"}, {"nm": "Side Salad", "price": "3.50"}]
+    return {
+        "menu": menu,
+        "sub_total": {"subtotal_price": truth.get("total", ""), "etc": etc},
+        "total": {"total_price": truth.get("total", "")},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recorded", type=Path)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.recorded:
+        with open(args.recorded, encoding="utf-8") as f:
+            outputs = [json.loads(line) for line in f if line.strip()]
+    else:
+        outputs = [cord_from_ground_truth(truth) for _, truth in load_test_set()]
+    print(f"🧾 {len(outputs)} Donut-Ausgaben, {args.rounds} Runden")
+
+    legacy = LegacyPostProcessor()
+    mismatches = sum(legacy._convert_to_custom_format(o) != convert_cord_to_custom(o) for o in outputs)
+
+    timings = {}
+    for name, fn in (("legacy", legacy._convert_to_custom_format), ("compiled", convert_cord_to_custom)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for o in outputs:
+                fn(o)
+        timings[name] = (time.perf_counter() - start) / (args.rounds * len(outputs)) * 1e6
+
+    for name, us in timings.items():
+        print(f"{name:<10}{us:>10.1f} µs/Beleg")
+    print(f"Speedup: {timings['legacy'] / timings['compiled']:.1f}x, Abweichungen: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Image pre-processing cost before Donut inference: legacy full-resolution decode + processor
+resize versus the draft()/auto-crop/single-resize pipeline of the receipt scanner.
+
+Reports decode and resize time per image separately. With --accuracy, additionally runs
+the full scan with and without auto-crop (RECEIPT_SCAN_AUTOCROP) on the labelled test split.
+
+Ausführen mit: python benchmarks/receipt_preprocessing.py [--images 20] [--accuracy] [--profile fast]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from PIL import Image
+
+from receipt_testset import load_test_set, score, summarize
+from services.receipt_scanner import DECODING_PROFILES, scanner
+
+
+def legacy(file_bytes: bytes):
+    t0 = time.perf_counter()
+    image = Image.open(io.BytesIO(file_bytes)).convert("RGB")
+    t1 = time.perf_counter()
+    pixel_values = scanner._processor(image, return_tensors="pt").pixel_values
+    return t1 - t0, time.perf_counter() - t1, image.size, pixel_values
+
+
+def pipeline(file_bytes: bytes, name: str):
+    t0 = time.perf_counter()
+    image = scanner._load_image(file_bytes, name)
+    t1 = time.perf_counter()
+    pixel_values = scanner._preprocess(image)
+    return t1 - t0, time.perf_counter() - t1, image.size, pixel_values
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20, help="0 = ganzer Test-Split")
+    parser.add_argument("--accuracy", action="store_true")
+    parser.add_argument("--profile", default="fast", choices=list(DECODING_PROFILES))
+    args = parser.parse_args()
+
+    scanner.ensure_loaded()
+    samples = load_test_set(args.images or None)
+    print(f"📷 {len(samples)} Testbelege")
+
+    print(f"{'variant':<10}{'decode ms':>11}{'resize ms':>11}{'decoded px':>14}")
+    for variant, run in (("legacy", lambda b, n: legacy(b)), ("pipeline", pipeline)):
+        decode, resize, pixels = [], [], []
+        for path, _ in samples:
+            d, r, size, _ = run(path.read_bytes(), path.name)
+            decode.append(d * 1000)
+            resize.append(r * 1000)
+            pixels.append(size[0] * size[1])
+        print(
+            f"{variant:<10}{statistics.median(decode):>11.1f}{statistics.median(resize):>11.1f}"
+            f"{statistics.median(pixels):>14,.0f}"
+        )
+
+    if not args.accuracy:
+        return
+
+    profile = DECODING_PROFILES[args.profile]
+    print(f"\n{'auto-crop':<10}{'merchant':>10}{'date':>8}{'total':>8}{'items':>8}")
+    for autocrop in ("0", "1"):
+        os.environ["RECEIPT_SCAN_AUTOCROP"] = autocrop
+        scores = []
+        for path, truth in samples:
+            result = scanner.scan_image(path.read_bytes(), path.name, profile)
+            scores.append(score(result if "error" not in result else {}, truth))
+        acc = summarize(scores)
+        print(f"{autocrop:<10}{acc['merchant']:>10.0%}{acc['date']:>8.0%}{acc['total']:>8.0%}{acc['items']:>8.0%}")
+    print("\nStufen-Zeiten (decode / preprocess / inference):", scanner.stage_stats())
+
+
+if __name__ == "__main__":
+    main()
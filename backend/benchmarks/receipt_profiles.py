@@ -0,0 +1,55 @@
+"""
+Latency and field accuracy of the receipt decoding profiles (accurate/balanced/fast).
+
+Runs `ReceiptScanner.scan_image` with every profile over the labelled test split
+(ai_models/data/test) and compares merchant, date, total and item prices with the ground truth.
+
+Ausführen mit: python benchmarks/receipt_profiles.py [--profiles accurate,balanced,fast] [--images 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from receipt_testset import load_test_set, score, summarize
+from services.receipt_scanner import DECODING_PROFILES, scanner
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", default=",".join(DECODING_PROFILES))
+    parser.add_argument("--images", type=int, default=0, help="0 = ganzer Test-Split")
+    args = parser.parse_args()
+
+    scanner.ensure_loaded()
+    samples = load_test_set(args.images or None)
+    print(f"📷 {len(samples)} Testbelege")
+
+    # Warm-up, damit Lazy-Init nicht mitgemessen wird
+    scanner.scan_image(samples[0][0].read_bytes(), samples[0][0].name, DECODING_PROFILES["fast"])
+
+    print(f"{'profile':>10}{'avg s':>8}{'p95 s':>8}{'merchant':>10}{'date':>8}{'total':>8}{'items':>8}")
+    for name in args.profiles.split(","):
+        profile = DECODING_PROFILES[name]
+        latencies, scores = [], []
+        for path, truth in samples:
+            start = time.perf_counter()
+            result = scanner.scan_image(path.read_bytes(), path.name, profile)
+            latencies.append(time.perf_counter() - start)
+            scores.append(score(result, truth) if "error" not in result else score({}, truth))
+        latencies.sort()
+        acc = summarize(scores)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(
+            f"{name:>10}{sum(latencies) / len(latencies):>8.2f}{p95:>8.2f}"
+            f"{acc['merchant']:>10.0%}{acc['date']:>8.0%}{acc['total']:>8.0%}{acc['items']:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compares the Donut receipt model in fp32 with dynamic int8 decoder quantization
+(RECEIPT_SCAN_QUANTIZE=int8): load time, per-receipt latency, peak RSS and field accuracy
+on the labelled test split.
+
+Each mode runs in its own subprocess so RSS numbers are not mixed up.
+
+Ausführen mit: python benchmarks/receipt_quantization.py [--modes none,int8] [--images 20] [--profile accurate] [--threads 4]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from receipt_testset import load_test_set, score, summarize
+
+
+def measure(images: int, profile_name: str) -> dict:
+    from services.receipt_scanner import DECODING_PROFILES, scanner
+
+    start = time.perf_counter()
+    scanner.ensure_loaded()
+    load_s = time.perf_counter() - start
+
+    profile = DECODING_PROFILES[profile_name]
+    samples = load_test_set(images or None)
+
+    # Warm-up, damit Lazy-Init nicht mitgemessen wird
+    scanner.scan_image(samples[0][0].read_bytes(), samples[0][0].name, profile)
+
+    latencies, scores, totals = [], [], []
+    for path, truth in samples:
+        t0 = time.perf_counter()
+        result = scanner.scan_image(path.read_bytes(), path.name, profile)
+        latencies.append(time.perf_counter() - t0)
+        result = result if "error" not in result else {}
+        scores.append(score(result, truth))
+        totals.append(result.get("total"))
+
+    latencies.sort()
+    return {
+        "load_s": load_s,
+        "avg_s": sum(latencies) / len(latencies),
+        "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "accuracy": summarize(scores),
+        "totals": totals,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="none,int8")
+    parser.add_argument("--images", type=int, default=20, help="0 = ganzer Test-Split")
+    parser.add_argument("--profile", default="accurate")
+    parser.add_argument("--threads", type=int, default=0, help="RECEIPT_SCAN_TORCH_THREADS, 0 = torch default")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.images, args.profile)))
+        return
+
+    results = {}
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        env = os.environ.copy()
+        env["RECEIPT_SCAN_QUANTIZE"] = mode
+        env["RECEIPT_SCAN_TORCH_THREADS"] = str(args.threads)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", "--images", str(args.images), "--profile", args.profile],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if proc.returncode != 0:
+            print(f"❌ {mode}: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}")
+            continue
+        results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    reference = results.get("none")
+    print(f"{'mode':<8}{'load s':>8}{'avg s':>8}{'p95 s':>8}{'RSS MB':>9}{'merchant':>10}{'date':>7}{'total':>7}{'items':>7}{'=fp32':>7}")
+    for mode, r in results.items():
+        agreement = "n/a"
+        if reference:
+            same = sum(a == b for a, b in zip(r["totals"], reference["totals"]))
+            agreement = f"{same / len(reference['totals']):.0%}"
+        acc = r["accuracy"]
+        print(
+            f"{mode:<8}{r['load_s']:>8.1f}{r['avg_s']:>8.2f}{r['p95_s']:>8.2f}{r['peak_rss_mb']:>9.0f}"
+            f"{acc['merchant']:>10.0%}{acc['date']:>7.0%}{acc['total']:>7.0%}{acc['items']:>7.0%}{agreement:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
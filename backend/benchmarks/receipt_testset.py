@@ -0,0 +1,50 @@
+"""Shared helpers for the receipt scanner benchmarks: test split and field scoring."""
+
+import json
+import re
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent.parent / "ai_models" / "data" / "test"
+FIELDS = ("merchant", "date", "total", "items")
+
+
+def load_test_set(limit: int | None = None) -> list[tuple[Path, dict]]:
+    """(image path, ground truth "data" dict) for every labelled test receipt."""
+    samples = []
+    with open(TEST_DIR / "metadata.jsonl", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            path = TEST_DIR / "images" / entry["file_name"]
+            if path.exists():
+                samples.append((path, json.loads(entry["ground_truth"])["data"]))
+    return samples[:limit] if limit else samples
+
+
+def _date_parts(value: str) -> tuple:
+    # 2016-01-09 und 01/09/16 sollen als gleich gelten
+    parts = [int(p) for p in re.findall(r"\d+", value or "")]
+    return tuple(sorted(p % 100 for p in parts))
+
+
+def _amount(value) -> float | None:
+    try:
+        return round(float(str(value).replace(",", ".").replace("$", "").strip()), 2)
+    except ValueError:
+        return None
+
+
+def score(prediction: dict, truth: dict) -> dict:
+    """Per-field correctness of a `scan_image` result; `items` is the recall of item prices."""
+    truth_prices = [_amount(m.get("Total")) for m in truth.get("menu", [])]
+    predicted_prices = [_amount(i.get("price")) for i in prediction.get("items", [])]
+    matched = sum(1 for p in truth_prices if p is not None and p in predicted_prices)
+    return {
+        "merchant": (prediction.get("merchant") or "").strip().casefold() == (truth.get("merchant") or "").strip().casefold(),
+        "date": bool(truth.get("date")) and _date_parts(prediction.get("date")) == _date_parts(truth.get("date")),
+        "total": _amount(prediction.get("total")) == _amount(truth.get("total")),
+        "items": matched / len(truth_prices) if truth_prices else 1.0,
+    }
+
+
+def summarize(scores: list[dict]) -> dict:
+    return {field: sum(float(s[field]) for s in scores) / len(scores) if scores else 0.0 for field in FIELDS}
@@ -0,0 +1,80 @@
+"""
+Transaction export: peak Python memory while streaming N rows through
+`TransactionRepository.export_rows` and the CSV / NDJSON / Parquet writers.
+
+The peak should stay flat with growing N, because rows are fetched with yield_per and
+written out chunk by chunk.
+
+Ausführen mit: python benchmarks/transaction_export.py [--rows 20000 200000]
+"""
+
+import argparse
+import datetime
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from sqlalchemy import insert
+
+from db_fixtures import make_user, memory_session
+from models.account import Account
+from models.transaction import Transaction
+from repository.transaction import TransactionRepository
+from schemas.transaction import TransactionFilter
+from services.transaction_export import FORMAT_PARQUET, FORMATS, parquet_available, stream_export
+
+
+def seed(db, user, rows: int) -> None:
+    account = Account(user_id=user.id, name="Konto", type="asset", currency_code="CHF")
+    db.add(account)
+    db.flush()
+    rnd = random.Random(42)
+    for start in range(0, rows, 50000):
+        db.execute(insert(Transaction), [
+            {
+                "user_id": user.id,
+                "account_id": account.id,
+                "date": datetime.date(2015, 1, 1) + datetime.timedelta(days=rnd.randrange(3650)),
+                "description": rnd.choice(["Migros", "Coop", "SBB", "Miete", "Lohn"]),
+                "amount_cents": rnd.randrange(-50000, 50000),
+                "currency_code": "CHF",
+            }
+            for _ in range(min(50000, rows - start))
+        ])
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[20000, 200000])
+    args = parser.parse_args()
+
+    formats = [f for f in FORMATS if f != FORMAT_PARQUET or parquet_available()]
+    if len(formats) < len(FORMATS):
+        print("⚠️  pyarrow nicht installiert, Parquet wird übersprungen")
+
+    print(f"{'Zeilen':>8} {'Format':>8} {'MB out':>8} {'Peak MB':>8} {'Zeit s':>7}")
+    for rows in args.rows:
+        db = memory_session()
+        user = make_user(db)
+        seed(db, user, rows)
+        for fmt in formats:
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = sum(len(chunk) for chunk in stream_export(
+                TransactionRepository(db).export_rows(user, TransactionFilter()), fmt
+            ))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{rows:>8} {fmt:>8} {size / 1e6:>8.1f} {peak / 1e6:>8.2f} {elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
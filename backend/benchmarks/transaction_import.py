@@ -0,0 +1,72 @@
+"""
+Statement import throughput: parses a synthetic CSV (or a given CSV/camt.053 file) and
+imports it with `TransactionRepository.import_transactions` into an in-memory SQLite
+database. Prints rows/sec and the number of SQL statements used.
+
+Without categories for the benchmark user no embedding model is loaded, so this
+measures parsing, category memory lookups and the chunked inserts.
+
+Ausführen mit: python benchmarks/transaction_import.py [--rows 100000] [--file auszug.xml]
+"""
+
+import argparse
+import io
+import random
+import sys
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from db_fixtures import count_statements, make_user, memory_session
+from models.account import Account
+from repository.transaction import TransactionRepository
+from services.statement_import import detect_format, iter_statement_rows
+
+MERCHANTS = ("Migros", "Coop", "SBB", "Denner", "Swisscom", "Miete", "Lohn", "Galaxus")
+
+
+def synthetic_csv(rows: int) -> bytes:
+    rnd = random.Random(42)
+    lines = ["Datum;Buchungstext;Betrag;Währung"]
+    for i in range(rows):
+        day = f"{rnd.randrange(1, 29):02d}.{rnd.randrange(1, 13):02d}.2024"
+        amount = f"{rnd.randrange(-50000, 50000) / 100:.2f}".replace(".", ",")
+        lines.append(f"{day};{rnd.choice(MERCHANTS)} {rnd.randrange(200)};{amount};CHF")
+    return "\n".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--file", type=Path)
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+
+    content = args.file.read_bytes() if args.file else synthetic_csv(args.rows)
+    fmt = detect_format(args.file.name if args.file else "auszug.csv", content[:512])
+
+    db = memory_session()
+    user = make_user(db)
+    account = Account(user_id=user.id, name="Konto", type="asset", currency_code="CHF")
+    db.add(account)
+    db.commit()
+
+    with count_statements(db) as counter:
+        result = TransactionRepository(db).import_transactions(
+            user, account.id, iter_statement_rows(io.BytesIO(content), fmt), args.chunk_size
+        )
+    if not hasattr(result, "imported"):
+        print(f"❌ {result.state}: {result.detail}")
+        sys.exit(1)
+    print(
+        f"✅ {result.imported} Zeilen ({fmt}) in {result.seconds:.2f}s = {result.rows_per_second:.0f} Zeilen/s, "
+        f"{result.failed} fehlerhaft, {result.duplicates} Duplikate, {counter.count} SQL-Statements"
+    )
+    for error in result.errors[:5]:
+        print(f"   Zeile {error.line}: {error.message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Deep paging through transactions: OFFSET vs. keyset cursor on (date, id).
+
+Seeds N transactions for one user into an in-memory SQLite database and times fetching
+one page at increasing depth. With OFFSET the page cost grows with the depth, with the
+cursor of `TransactionRepository.filter_transactions` it should stay flat.
+
+Ausführen mit: python benchmarks/transaction_paging.py [--rows 100000] [--page 100]
+"""
+
+import argparse
+import datetime
+import random
+import sys
+import time
+from pathlib import Path
+
+# Füge app-Verzeichnis zum Python-Path hinzu
+app_dir = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(app_dir))
+
+from sqlalchemy import insert
+
+from db_fixtures import make_user, memory_session
+from models.account import Account
+from models.transaction import Transaction
+from repository.transaction import TransactionRepository, encode_cursor
+from schemas.transaction import TransactionFilter
+
+REPEATS = 5
+
+
+def seed(db, user, rows: int) -> None:
+    account = Account(user_id=user.id, name="Konto", type="asset", currency_code="CHF")
+    db.add(account)
+    db.flush()
+    rnd = random.Random(42)
+    start = datetime.date(2015, 1, 1)
+    batch = []
+    for _ in range(rows):
+        batch.append({
+            "user_id": user.id,
+            "account_id": account.id,
+            "date": start + datetime.timedelta(days=rnd.randrange(3650)),
+            "description": rnd.choice(["Migros", "Coop", "SBB", "Miete", "Lohn"]),
+            "amount_cents": rnd.randrange(-50000, 50000),
+            "currency_code": "CHF",
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Transaction), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Transaction), batch)
+    db.commit()
+
+
+def timed_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--page", type=int, default=100)
+    args = parser.parse_args()
+
+    db = memory_session()
+    user = make_user(db)
+    print(f"📦 Erzeuge {args.rows} Transaktionen...")
+    seed(db, user, args.rows)
+    repo = TransactionRepository(db)
+    ordered = db.query(Transaction).filter(Transaction.user_id == user.id).order_by(
+        Transaction.date.desc(), Transaction.id.desc()
+    )
+
+    print(f"{'Tiefe':>8} {'OFFSET ms':>10} {'Cursor ms':>10}")
+    for depth in (0, args.rows // 10, args.rows // 2, args.rows - args.page - 1):
+        cursor = encode_cursor(ordered.offset(depth - 1).first()) if depth else None
+
+        def with_offset():
+            TransactionRepository.convert_to_response(ordered.offset(depth).limit(args.page).all())
+            db.expunge_all()
+
+        def with_cursor():
+            repo.filter_transactions(user, TransactionFilter(), args.page, cursor)
+            db.expunge_all()
+
+        print(f"{depth:>8} {timed_ms(with_offset):>10.2f} {timed_ms(with_cursor):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
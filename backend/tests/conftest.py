@@ -0,0 +1,31 @@
+"""Shared fixtures: throwaway in-memory databases and SQL statement counting."""
+
+import pytest
+
+import db_fixtures
+
+
+@pytest.fixture
+def memory_session():
+    """Factory for fresh in-memory SQLite sessions; all of them are closed after the test."""
+    sessions = []
+
+    def create():
+        session = db_fixtures.memory_session()
+        sessions.append(session)
+        return session
+
+    yield create
+    for session in sessions:
+        session.close()
+
+
+@pytest.fixture
+def count_statements():
+    """`with count_statements(db) as counter:` counts the SQL statements run in the block."""
+    return db_fixtures.count_statements
+
+
+@pytest.fixture
+def make_user():
+    return db_fixtures.make_user
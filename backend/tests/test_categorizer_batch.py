@@ -0,0 +1,56 @@
+"""Parity of the vectorized batch categorizer with the per-item path."""
+
+import hashlib
+import math
+import random
+
+import numpy as np
+import pytest
+
+import services.transaction_categorizer as categorizer
+from benchmarks_common import SAMPLE_DESCRIPTIONS, build_candidates
+from services.embedding_backends import EmbeddingBackend
+
+
+class HashEncoder(EmbeddingBackend):
+    """Deterministic stand-in for the embedding model: one seeded unit vector per text."""
+
+    name = "hash"
+
+    def encode(self, texts):
+        vectors = np.stack([
+            np.random.default_rng(int.from_bytes(hashlib.sha256(t.encode()).digest()[:8], "big")).standard_normal(32)
+            for t in texts
+        ]) if texts else np.zeros((0, 32))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture(autouse=True)
+def hash_encoder(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_STORE_PATH", "")
+    monkeypatch.setattr(categorizer, "_get_model", lambda: HashEncoder())
+    monkeypatch.setattr(categorizer, "_description_store", None)
+    categorizer.category_embedding_cache.clear()
+    yield
+    categorizer.category_embedding_cache.clear()
+
+
+def test_batch_matches_single_suggestions():
+    rng = random.Random(42)
+    candidates = build_candidates()
+    descriptions = [rng.choice(SAMPLE_DESCRIPTIONS) for _ in range(200)]
+    amounts = [rng.choice([-1, -1, -1, 1, 0]) * rng.randint(100, 50000) for _ in range(200)]
+
+    single = [
+        categorizer.suggest_category_for_transaction(categories=candidates, description=d, amount_cents=a)
+        for d, a in zip(descriptions, amounts)
+    ]
+    batch = categorizer.suggest_categories_batch(
+        categories=candidates, descriptions=descriptions, amount_cents_list=amounts
+    )
+
+    assert len(batch) == len(single)
+    for a, b in zip(single, batch):
+        assert (a.category_id, a.best_category_id) == (b.category_id, b.best_category_id)
+        assert math.isclose(a.score, b.score, abs_tol=1e-5)
+        assert math.isclose(a.margin, b.margin, abs_tol=1e-5)
@@ -0,0 +1,42 @@
+"""Listing receipts needs a constant number of SQL statements, however many receipts,
+line items and tags a user has."""
+
+import pytest
+
+from models.receipt import Receipt, ReceiptLineItem
+from models.tag import ReceiptLineItemTag, Tag
+from repository.receipt import ReceiptRepository
+
+SIZES = (1, 10, 50)
+ITEMS_PER_RECEIPT = 5
+
+
+def seed(db, user, receipts: int) -> None:
+    tags = [Tag(user_id=user.id, name=f"tag-{i}", color="#888888") for i in range(3)]
+    db.add_all(tags)
+    db.flush()
+    for _ in range(receipts):
+        receipt = Receipt(user_id=user.id, purchase_date="2024-01-01", total_cents=1000)
+        db.add(receipt)
+        db.flush()
+        for i in range(ITEMS_PER_RECEIPT):
+            item = ReceiptLineItem(receipt_id=receipt.id, product_name=f"Item {i}", total_price_cents=200)
+            db.add(item)
+            db.flush()
+            db.add(ReceiptLineItemTag(line_item_id=item.id, tag_id=tags[i % len(tags)].id))
+    db.commit()
+
+
+@pytest.mark.parametrize("include_line_items", [True, False])
+def test_receipt_list_statement_count_is_constant(memory_session, make_user, count_statements, include_line_items):
+    counts = {}
+    for n in SIZES:
+        db = memory_session()
+        user = make_user(db)
+        seed(db, user, n)
+        db.expire_all()
+        with count_statements(db) as counter:
+            receipts = ReceiptRepository(db).get_receipts(user, include_line_items=include_line_items)
+        assert len(receipts) == n
+        counts[n] = counter.count
+    assert len(set(counts.values())) == 1, counts
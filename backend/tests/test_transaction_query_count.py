@@ -0,0 +1,64 @@
+"""The transaction list, filter and account views need a constant number of SQL
+statements, however many transactions and tags a user has."""
+
+import datetime
+
+import pytest
+
+from models.account import Account
+from models.tag import Tag, TransactionTag
+from models.transaction import Transaction
+from repository.account import AccountRepository
+from repository.transaction import TransactionRepository
+from schemas.transaction import TransactionFilter
+
+SIZES = (1, 10, 50)
+ACCOUNTS = 3
+
+
+def seed(db, user, transactions: int) -> list[Account]:
+    accounts = [Account(user_id=user.id, name=f"Konto {i}", type="asset") for i in range(ACCOUNTS)]
+    tags = [Tag(user_id=user.id, name=f"tag-{i}", color="#888888") for i in range(3)]
+    db.add_all(accounts + tags)
+    db.flush()
+    for i in range(transactions):
+        transaction = Transaction(
+            user_id=user.id,
+            account_id=accounts[i % ACCOUNTS].id,
+            date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i),
+            description=f"Einkauf {i}",
+            amount_cents=-100 * (i + 1),
+        )
+        db.add(transaction)
+        db.flush()
+        db.add(TransactionTag(transaction_id=transaction.id, tag_id=tags[i % len(tags)].id))
+    db.commit()
+    return accounts
+
+
+VIEWS = {
+    "list": lambda db, user, accounts: TransactionRepository(db).filter_transactions(user, TransactionFilter()).items,
+    "filter": lambda db, user, accounts: TransactionRepository(db).filter_transactions(
+        user, TransactionFilter(description="einkauf"), limit=1000
+    ).items,
+    "all_transactions": lambda db, user, accounts: TransactionRepository(db).get_userspecific_transaction(user),
+    "accounts": lambda db, user, accounts: AccountRepository(db).get_userspecific_accounts(user),
+    "account": lambda db, user, accounts: [AccountRepository(db).get_account(user, accounts[0].id)],
+    "account_transactions": lambda db, user, accounts: AccountRepository(db).get_transactions_by_account_id(
+        user, accounts[0].id
+    ),
+}
+
+
+@pytest.mark.parametrize("view", VIEWS.values(), ids=VIEWS.keys())
+def test_statement_count_is_constant(memory_session, make_user, count_statements, view):
+    counts = {}
+    for n in SIZES:
+        db = memory_session()
+        user = make_user(db)
+        accounts = seed(db, user, n)
+        db.expire_all()
+        with count_statements(db) as counter:
+            assert view(db, user, accounts)
+        counts[n] = counter.count
+    assert len(set(counts.values())) == 1, counts